@@ -0,0 +1,54 @@
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.bulk import bulk_upsert
+
+
+class BulkUpsertAPIView(APIView):
+    """
+    Base of the API endpoints creating or replacing many rows of `model` in one request.
+
+    Body:
+        A JSON list of at most `max_batch_size` objects with the fields of the model (foreign keys as the id of the
+        related row). An object with the 'id' of a stored row replaces it, all its fields, the others are created.
+
+    The rows are validated a chunk at a time, with the checks and messages of the model validation but a single query
+    per foreign key and per unique field and chunk, duplicates within the body included, and written with bulk upserts
+    (see `apps.core.bulk`). Invalid rows are reported without preventing the valid ones from being written.
+
+    Returns:
+        - 400 Bad request: If the body is not a list of at most `max_batch_size` items, or if no row is valid.
+        - 200 OK: If at least one row was written.
+        Both with 'created' and 'updated' (number of rows written), 'ids' (their ids, in the order of the body) and
+        'errors', a list of JSON objects with the 'index' of an invalid row in the body and its 'errors' per field.
+    """
+    http_method_names = ['post']
+    model = None
+    max_batch_size = 10000
+
+    def post(self, request: Request) -> Response:
+        if not isinstance(request.data, list) or len(request.data) > self.max_batch_size:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': (
+                        f'The body must be a list of at most {self.max_batch_size} '
+                        f'{self.model._meta.verbose_name_plural}.'
+                    ),
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = bulk_upsert(self.model, request.data)
+
+        return Response(
+            {
+                'created': result.created,
+                'updated': result.updated,
+                'ids': result.pks,
+                'errors': [{'index': index, 'errors': errors} for index, errors in sorted(result.errors.items())],
+            },
+            status=status.HTTP_200_OK if result.pks else status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,251 @@
+"""
+Validation and writes of many model instances at once.
+
+The models call `full_clean()` in `save()`, which validates one instance at a time: `clean_fields` (types,
+max_length, validators...) and one query per foreign key and per unique field. The helpers here check the same things
+for a whole batch of instances, with one `IN` query per foreign key and per unique field, and report the errors per
+instance, with the messages of `full_clean`.
+
+`bulk_upsert` uses them to create or replace many rows of a model with `bulk_create`. As `bulk_create` sends no
+`post_save` signal, it sends `post_bulk_upsert` instead.
+"""
+from collections import defaultdict
+from typing import Iterable, Iterator, NamedTuple
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, models, transaction
+from django.dispatch import Signal
+
+CHUNK_SIZE = 500
+
+# Sent after each chunk written by `bulk_upsert`, inside its transaction, with the `instances` written and the pks of
+# those which replaced an existing row (`updated_pks`).
+post_bulk_upsert = Signal()
+
+
+class BulkResult(NamedTuple):
+    # pks of the instances written, in the order of the input rows
+    pks: list
+    created: int
+    updated: int
+    # index of the input row: field -> error messages
+    errors: dict[int, dict[str, list[str]]]
+
+
+def _relation_fields(model: type[models.Model]) -> list[models.Field]:
+    return [field for field in model._meta.concrete_fields if field.is_relation]
+
+
+def clean_fields_errors(instance: models.Model) -> dict[str, list[str]]:
+    """
+    Runs `clean_fields` on the instance, without its foreign keys (see `foreign_key_errors`), and returns the errors.
+    """
+    try:
+        instance.clean_fields(exclude={field.name for field in _relation_fields(type(instance))})
+    except ValidationError as error:
+        return error.message_dict
+    return {}
+
+
+def foreign_key_error_messages(instance: models.Model, field_name: str, value) -> list[str]:
+    """
+    The messages of `ForeignKey.validate` (run by `full_clean`) for a missing related row.
+    """
+    field = instance._meta.get_field(field_name)
+    error = ValidationError(
+        field.error_messages['invalid'],
+        code='invalid',
+        params={
+            'model': field.remote_field.model._meta.verbose_name,
+            'pk': value,
+            'field': field.remote_field.field_name,
+            'value': value,
+        },
+    )
+    return error.messages
+
+
+def foreign_key_errors(instances: list[models.Model], field_name: str, batch_pks: Iterable = ()) -> dict:
+    """
+    Checks that the rows referenced by the `field_name` foreign key of the instances exist, with one query, and returns
+    the errors per position in `instances`. `batch_pks` are the pks written with the instances, which can be referenced
+    too (e.g. a manager in the same batch as their reports).
+    """
+    if not instances:
+        return {}
+    field = instances[0]._meta.get_field(field_name)
+    values = {getattr(instance, field.attname) for instance in instances} - {None}
+    if not values:
+        return {}
+
+    target = field.remote_field.model._base_manager.filter(**{f'{field.target_field.name}__in': values})
+    existing = set(target.values_list(field.target_field.name, flat=True)) | set(batch_pks)
+
+    return {
+        position: {field_name: foreign_key_error_messages(instance, field_name, getattr(instance, field.attname))}
+        for position, instance in enumerate(instances)
+        if getattr(instance, field.attname) is not None and getattr(instance, field.attname) not in existing
+    }
+
+
+def unique_errors(instances: list[models.Model]) -> dict:
+    """
+    Checks the unique fields (other than the pk) of the instances with one query per field, against the stored rows
+    (other than the row an instance replaces) and against the instances before them, and returns the errors per
+    position in `instances`. Empty values (None) are not checked, as in `full_clean`.
+    """
+    if not instances:
+        return {}
+    model = type(instances[0])
+    errors = defaultdict(dict)
+
+    for field in model._meta.concrete_fields:
+        if not field.unique or field.primary_key:
+            continue
+
+        values = {getattr(instance, field.attname) for instance in instances} - {None}
+        stored = defaultdict(set)
+        for value, pk in model._base_manager.filter(**{f'{field.name}__in': values}).values_list(field.name, 'pk'):
+            stored[value].add(pk)
+
+        seen = set()
+        for position, instance in enumerate(instances):
+            value = getattr(instance, field.attname)
+            if value is None:
+                continue
+            if value in seen or stored[value] - {instance.pk}:
+                errors[position][field.name] = instance.unique_error_message(model, (field.name,)).messages
+            seen.add(value)
+
+    return dict(errors)
+
+
+def validate_batch(instances: list[models.Model], batch_pks: Iterable = ()) -> dict[int, dict[str, list[str]]]:
+    """
+    What `full_clean` checks (fields, foreign keys and unique fields), for all the instances at once. Returns the
+    errors per position in `instances`.
+    """
+    if not instances:
+        return {}
+
+    errors = defaultdict(dict)
+    for position, instance in enumerate(instances):
+        field_errors = clean_fields_errors(instance)
+        if field_errors:
+            errors[position].update(field_errors)
+
+    checks = [foreign_key_errors(instances, field.name, batch_pks) for field in _relation_fields(type(instances[0]))]
+    for check in [*checks, unique_errors(instances)]:
+        for position, field_errors in check.items():
+            errors[position].update(field_errors)
+
+    return dict(errors)
+
+
+def build_instance(model: type[models.Model], row, errors: dict) -> models.Model | None:
+    """
+    Builds an unsaved instance from a dict of field names (foreign keys given by the pk of the related row). Adds the
+    errors of the values that can't be converted (or of the fields that don't exist) to `errors`.
+    """
+    if not isinstance(row, dict):
+        errors[NON_FIELD_ERRORS] = [f'Expected an object with the {model._meta.verbose_name} fields.']
+        return None
+
+    fields = {field.name: field for field in model._meta.concrete_fields}
+    unknown = sorted(set(row) - set(fields))
+    if unknown:
+        errors[NON_FIELD_ERRORS] = [f'Unknown fields: {", ".join(unknown)}.']
+
+    values = {}
+    for name, value in row.items():
+        field = fields.get(name)
+        if field is None:
+            continue
+        # JSON numbers are read as floats, their shortest repr is the decimal value that was sent
+        value = str(value) if isinstance(value, float) else value
+        if field.is_relation or field.primary_key:
+            target_field = field.target_field if field.is_relation else field
+            try:
+                value = None if value is None else target_field.to_python(value)
+            except ValidationError as error:
+                errors[name] = error.messages
+                continue
+        values[field.attname] = value
+
+    return model(**values)
+
+
+def chunked(rows: Iterable, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_upsert(model: type[models.Model], rows: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> BulkResult:
+    """
+    Creates or replaces rows of `model` from dicts of its field names: a row with the pk of a stored row replaces it
+    (all its fields, the missing ones get their default), the others are created.
+
+    Each chunk of rows is validated with `validate_batch` and its valid rows written with one `bulk_create` (an
+    upsert on the pk), in a transaction. Invalid rows are reported and don't stop the others from being written.
+    """
+    pks, errors = [], {}
+    created = updated = 0
+    for chunk in chunked(enumerate(rows), chunk_size):
+        result = _upsert_chunk(model, chunk)
+        pks += result.pks
+        created += result.created
+        updated += result.updated
+        errors.update(result.errors)
+
+    return BulkResult(pks, created, updated, errors)
+
+
+def _upsert_chunk(model: type[models.Model], chunk: list[tuple[int, dict]]) -> BulkResult:
+    errors = {}
+    built = []
+    seen_pks = set()
+    for index, row in chunk:
+        row_errors = {}
+        instance = build_instance(model, row, row_errors)
+        if instance is not None and instance.pk is not None:
+            # one statement can't write a row twice
+            if instance.pk in seen_pks:
+                row_errors[model._meta.pk.name] = instance.unique_error_message(model, (model._meta.pk.name,)).messages
+            seen_pks.add(instance.pk)
+        if row_errors:
+            errors[index] = row_errors
+        else:
+            built.append((index, instance))
+
+    instances = [instance for index, instance in built]
+    batch_pks = {instance.pk for instance in instances} - {None}
+    for position, instance_errors in validate_batch(instances, batch_pks).items():
+        errors[built[position][0]] = instance_errors
+    valid = [(index, instance) for index, instance in built if index not in errors]
+    if not valid:
+        return BulkResult([], 0, 0, errors)
+
+    instances = [instance for index, instance in valid]
+    updated_pks = set(model._base_manager.filter(pk__in=batch_pks).values_list('pk', flat=True))
+    try:
+        with transaction.atomic():
+            model._base_manager.bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=[model._meta.pk.name],
+                update_fields=[field.name for field in model._meta.concrete_fields if not field.primary_key]
+            )
+            post_bulk_upsert.send(sender=model, instances=instances, updated_pks=updated_pks)
+    except IntegrityError as error:
+        for index, instance in valid:
+            errors[index] = {NON_FIELD_ERRORS: [f'The {model._meta.verbose_name} could not be written: {error}']}
+        return BulkResult([], 0, 0, errors)
+
+    updated = sum(1 for instance in instances if instance.pk in updated_pks)
+    return BulkResult([instance.pk for instance in instances], len(instances) - updated, updated, errors)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.replica import refresh_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Copies the database to the read-only replica the reports read from (ANALYTICS_REPLICA_PATH), with the SQLite '
+        'online backup API, and atomically replaces the previous copy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Refresh the replica every INTERVAL seconds until interrupted, instead of once.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            path = refresh_replica()
+            self.stdout.write(
+                self.style.SUCCESS(f'Refreshed the analytics replica {path} in {time.monotonic() - start:.2f}s.')
+            )
+
+            if not options['interval']:
+                return
+            time.sleep(max(options['interval'] - (time.monotonic() - start), 0))
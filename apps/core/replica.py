@@ -0,0 +1,161 @@
+"""
+Read-only replica of the database for the reports.
+
+Long reporting reads on `data.db` hold SQLite read locks (with a rollback journal they block the writer, with WAL they
+pin old pages and delay checkpoints). The replica is a copy of the database, written with SQLite's online backup API
+(a consistent snapshot, taken without blocking the writer in WAL mode) to a temporary file which then atomically
+replaces ANALYTICS_REPLICA_PATH. The `analytics` database of `DATABASES` opens it with `mode=ro&immutable=1`, so
+readers take no lock at all. A connection keeps reading the copy it opened until it is closed: at the end of the
+request, or when `analytics_reads()` finds that the replica was replaced since.
+
+Each copy is identified by the inode and modification time of its file (`replica_identity`), stamped by the refresh
+strictly after the previous copy's. Anything derived from the replica (cached responses, ETags) is keyed on it rather
+than on `replica_refreshed`, which only reaches the process that ran the refresh (usually the management command, not
+the web workers).
+
+Reads are routed to the replica by `apps.core.routers.AnalyticsReplicaRouter` inside `analytics_reads()`, e.g. the
+`get` of a reporting view, as long as the replica exists. The replica lags behind `data.db` until its next refresh
+(`python manage.py refresh_analytics_replica [--interval SECONDS]`); `replica_refreshed` is sent after each refresh.
+Writes always go to the default database.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import Signal
+
+ANALYTICS_DATABASE = 'analytics'
+
+# Sent after the replica has been replaced by a new copy, with its `path`.
+replica_refreshed = Signal()
+
+# database the reads of the current context are routed to, None for the default one
+_read_database = ContextVar('read_database', default=None)
+_END = object()
+
+
+def get_replica_path() -> Path:
+    return Path(settings.ANALYTICS_REPLICA_PATH)
+
+
+def replica_identity() -> tuple[int, int] | None:
+    """
+    Returns the (inode, modification time in nanoseconds) of the current copy of the replica, None if there is none.
+    """
+    if ANALYTICS_DATABASE not in settings.DATABASES:
+        return None
+    try:
+        stat = os.stat(get_replica_path())
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def open_replica() -> bool:
+    """
+    Returns whether there is a replica to read from. Closes the connection of the thread to the replica if it was
+    replaced since (connections outliving a request, e.g. with CONN_MAX_AGE, would keep reading the old copy).
+    """
+    identity = replica_identity()
+    if identity is None:
+        return False
+
+    replica = connections[ANALYTICS_DATABASE]
+    if replica.connection is not None and getattr(replica, 'replica_identity', None) != identity:
+        replica.close()
+    replica.replica_identity = identity
+    return True
+
+
+def current_read_database() -> str | None:
+    return _read_database.get()
+
+
+def current_read_source() -> str:
+    """
+    Names the data the reads of the current context see: the default database, or the copy of the replica they are
+    routed to, which changes on every refresh.
+    """
+    if current_read_database() != ANALYTICS_DATABASE:
+        return DEFAULT_DB_ALIAS
+    # the copy `open_replica` found, which the connection of the thread reads
+    inode, modified = getattr(connections[ANALYTICS_DATABASE], 'replica_identity', None) or replica_identity()
+    return f'{ANALYTICS_DATABASE}:{inode}:{modified}'
+
+
+@contextmanager
+def using_read_database(database: str | None) -> Iterator[None]:
+    token = _read_database.set(database)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+@contextmanager
+def analytics_reads() -> Iterator[None]:
+    """
+    Routes the reads of the block (or of the decorated function) to the replica, if there is one.
+    """
+    with using_read_database(ANALYTICS_DATABASE if open_replica() else None):
+        yield
+
+
+def bind_read_database(rows: Iterable) -> Iterator:
+    """
+    Iterates over `rows` with the reads routed as they are where this is called, e.g. for the rows of a response
+    streamed after the view returned.
+    """
+    # captured now, not when the iteration starts
+    database = current_read_database()
+
+    def iterate(rows: Iterator) -> Iterator:
+        while True:
+            with using_read_database(database):
+                row = next(rows, _END)
+            if row is _END:
+                return
+            yield row
+
+    return iterate(iter(rows))
+
+
+def refresh_replica(using: str = DEFAULT_DB_ALIAS) -> Path:
+    """
+    Copies the database `using` to the replica and returns its path.
+    """
+    path = get_replica_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    connection = connections[using]
+    connection.ensure_connection()
+    descriptor, temporary_path = tempfile.mkstemp(prefix=f'.{path.name}.', dir=path.parent)
+    os.close(descriptor)
+    try:
+        replica = sqlite3.connect(temporary_path)
+        try:
+            # at once rather than in steps, which would start over on every write to the source meanwhile
+            connection.connection.backup(replica)
+            # readers open the replica read only, without the -wal file a WAL database would need
+            replica.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            replica.close()
+        # Stamps the copy after the one it replaces, at the resolution of the clock rather than of the file system
+        # timestamps, so that its identity differs even if the inode is reused.
+        previous = replica_identity()
+        stamp = max(time.time_ns(), previous[1] + 1 if previous else 0)
+        os.utime(temporary_path, ns=(stamp, stamp))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+    replica_refreshed.send(sender=refresh_replica, path=path)
+    return path
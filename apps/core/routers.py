@@ -0,0 +1,27 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.core.replica import ANALYTICS_DATABASE, current_read_database
+
+
+class AnalyticsReplicaRouter:
+    """
+    Routes the reads made inside `apps.core.replica.analytics_reads()` to the read-only replica of the database, and
+    every write to the default database. The replica is never migrated, it is a copy of the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_read_database()
+
+    def db_for_write(self, model, **hints):
+        # also for instances read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, ANALYTICS_DATABASE}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ANALYTICS_DATABASE:
+            return False
+        return None
@@ -0,0 +1,157 @@
+"""
+Profiles of the pragmas applied to the SQLite connections.
+
+SQLite's defaults suit an embedded database with a single user: a rollback journal (readers and the writer block each
+other), an fsync on every commit, a 2 MB page cache per connection and no wait for a locked database. The profiles
+here tune a connection for how a process uses it, and are applied on connect through the `init_command` option of the
+`sqlite3` backend (`sqlite_options`), or to an open connection with `apply_profile` (`sqlite_profile` for a block):
+
+- 'serving': the web workers. Fewer fsyncs, a bigger page cache, memory mapped reads, and write transactions that take
+  the write lock when they start (`BEGIN IMMEDIATE`) and wait for it up to 5 seconds, rather than failing with
+  `database is locked` when a read transaction can't be upgraded. Transactions that only read use `read_transaction`,
+  which doesn't take the write lock.
+- 'ingest': bulk loads (e.g. `manage.py ingest_invoices`). As 'serving', without fsync (a crash of the machine, not of
+  the process, can lose the last transactions, which the load can write again) and with a bigger cache and a longer
+  wait for the write lock.
+- 'analytics': long reports and exports. Read only, with a bigger memory map and cache, and temporary b-trees (sorts,
+  group by) in memory.
+
+The write-ahead log (readers don't block the writer, nor the writer the readers, and an fsync per checkpoint instead of
+per commit) is opt-in, with `sqlite_options(name, journal_mode='WAL')` (`SQLITE_JOURNAL_MODE` in the settings), and
+not part of the profiles: `journal_mode` is stored in the database file, once a connection switched it to WAL every
+connection uses WAL, so it is a choice of the deployment for its database (not of the committed sample `data.db`).
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# pragma -> value, in the order they are applied. Every profile sets the same pragmas, so that applying one to an open
+# connection replaces the previous one.
+PROFILES = {
+    'serving': {
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        # negative: in KiB, 64 MB
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'query_only': 'OFF',
+    },
+    'ingest': {
+        'synchronous': 'OFF',
+        'busy_timeout': 30000,
+        'cache_size': -256000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'query_only': 'OFF',
+    },
+    'analytics': {
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -256000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'query_only': 'ON',
+    },
+}
+
+# `BEGIN` of the transactions of each profile, None for SQLite's default (DEFERRED), see also `read_transaction`
+TRANSACTION_MODES = {
+    'serving': 'IMMEDIATE',
+    'ingest': 'IMMEDIATE',
+    'analytics': None,
+}
+
+
+def get_profile(name: str) -> dict:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ImproperlyConfigured(f'Unknown SQLite profile "{name}", use one of: {", ".join(PROFILES)}.') from None
+
+
+def pragma_statements(pragmas: dict) -> list[str]:
+    return [f'PRAGMA {pragma} = {value}' for pragma, value in pragmas.items()]
+
+
+def sqlite_options(name: str, journal_mode: str | None = None) -> dict:
+    """
+    The `OPTIONS` of a `sqlite3` database of `DATABASES` applying the profile `name` to its connections, and switching
+    the database to `journal_mode` (e.g. 'WAL') if given.
+    """
+    pragmas = get_profile(name) if journal_mode is None else {'journal_mode': journal_mode, **get_profile(name)}
+    options = {'init_command': ';'.join(pragma_statements(pragmas))}
+    if TRANSACTION_MODES[name]:
+        options['transaction_mode'] = TRANSACTION_MODES[name]
+    return options
+
+
+def _set_pragmas(connection, pragmas: dict) -> None:
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
+
+
+def apply_profile(connection, name: str) -> None:
+    """
+    Applies the profile `name` to an open (or opened here) Django SQLite connection, until it is closed.
+    """
+    _set_pragmas(connection, get_profile(name))
+    connection.transaction_mode = TRANSACTION_MODES[name]
+
+
+@contextmanager
+def sqlite_profile(connection, name: str) -> Iterator[None]:
+    """
+    Applies the profile `name` to the connection for the duration of the block, e.g. 'ingest' for a management
+    command run on a web worker's settings, and restores the previous values of its pragmas afterwards.
+
+    Inside a transaction, where `journal_mode` and `synchronous` can't be changed, the connection is left as it is.
+    """
+    if connection.in_atomic_block:
+        yield
+        return
+
+    previous = {}
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        for pragma in get_profile(name):
+            # no value for the pragmas that don't apply (e.g. mmap_size of an in-memory database)
+            row = cursor.execute(f'PRAGMA {pragma}').fetchone()
+            if row is not None:
+                previous[pragma] = row[0]
+    previous_transaction_mode = connection.transaction_mode
+
+    apply_profile(connection, name)
+    try:
+        yield
+    finally:
+        _set_pragmas(connection, previous)
+        connection.transaction_mode = previous_transaction_mode
+
+
+@contextmanager
+def read_transaction(using: str | None = None) -> Iterator[None]:
+    """
+    `transaction.atomic()` for a block that only reads, e.g. several tables from the same state of the database. On
+    SQLite, it begins DEFERRED whatever the transaction mode of the connection: it takes a read lock (a snapshot, with
+    WAL) rather than the write lock, and doesn't hold off the other writers. Inside a transaction, it is a savepoint.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    transaction_mode = connection.transaction_mode
+    connection.transaction_mode = None
+    try:
+        with transaction.atomic(using=using):
+            # `BEGIN` was run, nested transactions are savepoints
+            connection.transaction_mode = transaction_mode
+            yield
+    finally:
+        connection.transaction_mode = transaction_mode
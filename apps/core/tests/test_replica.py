@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from django.core.management import call_command
+from django.db import router
+
+from apps.core.replica import (
+    analytics_reads,
+    bind_read_database,
+    current_read_source,
+    refresh_replica,
+    replica_identity,
+    replica_refreshed
+)
+from apps.music.models import Artist
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def replica_path(settings, tmp_path):
+    settings.ANALYTICS_REPLICA_PATH = tmp_path / 'replica' / 'analytics.db'
+    return settings.ANALYTICS_REPLICA_PATH
+
+
+class TestAnalyticsReplicaRouter:
+    def test_reads_are_routed_to_the_replica_inside_analytics_reads(self, replica_path):
+        replica_path.parent.mkdir()
+        replica_path.touch()
+
+        with analytics_reads():
+            assert router.db_for_read(Artist) == 'analytics'
+            assert router.db_for_write(Artist) == 'default'
+        assert router.db_for_read(Artist) == 'default'
+
+    def test_without_replica_reads_stay_on_the_default_database(self, replica_path):
+        with analytics_reads():
+            assert router.db_for_read(Artist) == 'default'
+
+    def test_bound_rows_are_read_with_the_routing_of_their_creation(self, replica_path):
+        replica_path.parent.mkdir()
+        replica_path.touch()
+
+        with analytics_reads():
+            rows = bind_read_database(router.db_for_read(Artist) for _ in range(2))
+
+        assert list(rows) == ['analytics', 'analytics']
+
+    def test_replica_is_never_migrated(self):
+        assert router.allow_migrate('analytics', 'music') is False
+        assert router.allow_migrate('default', 'music') is True
+
+
+class TestRefreshReplica:
+    @pytest.mark.django_db(transaction=True)
+    def test_copies_the_database(self, replica_path):
+        Artist.objects.create(name='AC/DC')
+        refreshed = []
+        replica_refreshed.connect(lambda sender, path, **kwargs: refreshed.append(path), weak=False, dispatch_uid='t')
+        try:
+            assert refresh_replica() == replica_path
+        finally:
+            replica_refreshed.disconnect(dispatch_uid='t')
+
+        replica = sqlite3.connect(f'file:{replica_path}?mode=ro&immutable=1', uri=True)
+        try:
+            assert replica.execute('SELECT Name FROM Artist').fetchall() == [('AC/DC',)]
+            assert replica.execute('PRAGMA journal_mode').fetchone() == ('delete',)
+        finally:
+            replica.close()
+        assert refreshed == [replica_path]
+        assert list(replica_path.parent.iterdir()) == [replica_path]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_every_copy_has_a_new_identity(self, replica_path):
+        assert replica_identity() is None
+        assert current_read_source() == 'default'
+
+        identities = []
+        for _ in range(5):
+            refresh_replica()
+            identities.append(replica_identity())
+            with analytics_reads():
+                assert current_read_source() == 'analytics:{}:{}'.format(*identities[-1])
+
+        assert [modified for _, modified in identities] == sorted({modified for _, modified in identities})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_command(self, replica_path, capsys):
+        call_command('refresh_analytics_replica')
+
+        assert replica_path.exists()
+        assert 'Refreshed the analytics replica' in capsys.readouterr().out
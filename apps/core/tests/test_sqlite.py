@@ -0,0 +1,100 @@
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.sqlite import PROFILES, read_transaction, sqlite_options, sqlite_profile
+from apps.music.models import Artist
+
+pytestmark = pytest.mark.django_db
+
+
+def pragmas(database: DatabaseWrapper) -> dict:
+    with database.cursor() as cursor:
+        return {
+            pragma: cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+            for pragma in ['journal_mode', *PROFILES['serving']]
+        }
+
+
+def file_database(path, options: dict) -> DatabaseWrapper:
+    # a file database of its own, the test database is in memory and inside the transaction of the test
+    database = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path), 'OPTIONS': options}, alias='profile')
+    with database.cursor() as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS item (id INTEGER PRIMARY KEY)')
+    return database
+
+
+class TestSQLiteProfiles:
+    @pytest.fixture
+    def database(self, tmp_path):
+        database = file_database(tmp_path / 'profile.db', sqlite_options('serving', journal_mode='WAL'))
+        yield database
+        database.close()
+
+    def test_profile_is_applied_on_connect(self, database):
+        assert pragmas(database) == {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 2,
+            'query_only': 0,
+        }
+        assert database.transaction_mode == 'IMMEDIATE'
+
+    def test_journal_mode_is_left_as_it_is_by_default(self, tmp_path):
+        for options in [sqlite_options('serving'), sqlite_options('analytics')]:
+            database = file_database(tmp_path / 'sample.db', options)
+            try:
+                assert pragmas(database)['journal_mode'] == 'delete'
+            finally:
+                database.close()
+
+    def test_profile_for_a_block(self, database):
+        serving = pragmas(database)
+
+        with sqlite_profile(database, 'analytics'):
+            assert pragmas(database)['query_only'] == 1
+            assert database.transaction_mode is None
+            with pytest.raises(OperationalError, match='readonly'):
+                with database.cursor() as cursor:
+                    cursor.execute('INSERT INTO item DEFAULT VALUES')
+
+        assert pragmas(database) == serving
+        assert database.transaction_mode == 'IMMEDIATE'
+        with database.cursor() as cursor:
+            cursor.execute('INSERT INTO item DEFAULT VALUES')
+
+    def test_ingest_profile(self, database):
+        with sqlite_profile(database, 'ingest'):
+            assert (pragmas(database)['synchronous'], pragmas(database)['busy_timeout']) == (0, 30000)
+
+    def test_unknown_profile(self):
+        with pytest.raises(ImproperlyConfigured, match='Unknown SQLite profile "fast"'):
+            sqlite_options('fast')
+
+
+
+class TestReadTransaction:
+    @pytest.mark.django_db(transaction=True)
+    def test_begins_deferred(self):
+        assert connection.transaction_mode == 'IMMEDIATE'
+
+        with CaptureQueriesContext(connection) as context:
+            with read_transaction():
+                with transaction.atomic():
+                    Artist.objects.count()
+            with transaction.atomic():
+                Artist.objects.count()
+
+        begins = [query['sql'] for query in context.captured_queries if query['sql'].startswith('BEGIN')]
+        assert begins == ['BEGIN', 'BEGIN IMMEDIATE']
+        assert connection.transaction_mode == 'IMMEDIATE'
+
+    def test_inside_a_transaction(self):
+        with read_transaction():
+            assert connection.in_atomic_block
@@ -0,0 +1,10 @@
+from apps.core.api.views import BulkUpsertAPIView
+from apps.customers.models import Customer
+
+
+class CustomerBulkUpsertAPIView(BulkUpsertAPIView):
+    """
+    API endpoint to create or replace many customers in one request, see `BulkUpsertAPIView`. 'phone' and 'email' must
+    be unique among the stored customers and the body.
+    """
+    model = Customer
@@ -0,0 +1,123 @@
+import pytest
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.bulk import bulk_upsert, validate_batch
+from apps.customers.models import Customer
+
+pytestmark = pytest.mark.django_db
+
+
+def customer_row(index: int, **fields) -> dict:
+    return {
+        'first_name': f'First{index}',
+        'last_name': f'Last{index}',
+        'city': 'Lisbon',
+        'state': 'Lisbon',
+        'country': 'Portugal',
+        'phone': f'+351 {index:09d}',
+        'email': f'customer{index}@example.com',
+        **fields,
+    }
+
+
+class TestCustomerBulkUpsert:
+    client = APIClient()
+
+    def test_creates_and_replaces(self, customer_factory, employee_factory):
+        stored = customer_factory(phone='+351 000000001', email='old@example.com')
+        employee = employee_factory()
+
+        result = bulk_upsert(Customer, [
+            customer_row(1, id=stored.id, support_representative=employee.id),
+            customer_row(2),
+        ])
+
+        assert result.errors == {}
+        assert (result.created, result.updated) == (1, 1)
+        assert result.pks[0] == stored.id
+        stored.refresh_from_db()
+        assert (stored.first_name, stored.email, stored.support_representative) == (
+            'First1', 'customer1@example.com', employee
+        )
+        assert Customer.objects.get(pk=result.pks[1]).phone == '+351 000000002'
+
+    def test_unique_errors_match_full_clean(self, customer_factory):
+        customer_factory(phone='+351 000000001', email='taken@example.com')
+        rows = [customer_row(1), customer_row(2, email='taken@example.com'), customer_row(3)]
+
+        result = bulk_upsert(Customer, rows)
+
+        assert list(result.errors) == [0, 1]
+        for index in result.errors:
+            with pytest.raises(ValidationError) as error:
+                Customer(**rows[index]).full_clean()
+            assert result.errors[index] == error.value.message_dict
+        assert result.errors[0] == {'phone': ['Customer with this Phone number already exists.']}
+
+    def test_duplicates_within_the_batch(self):
+        result = bulk_upsert(Customer, [
+            customer_row(1), customer_row(2, phone='+351 000000001'), customer_row(3, email='customer1@example.com'),
+            customer_row(4, phone=None, email=None), customer_row(5, phone=None, email=None),
+        ])
+
+        assert result.errors == {
+            1: {'phone': ['Customer with this Phone number already exists.']},
+            2: {'email': ['Customer with this Email already exists.']},
+        }
+        assert result.created == 3
+
+    def test_field_and_foreign_key_errors(self, employee_factory):
+        missing_employee_id = employee_factory().id + 1
+
+        result = bulk_upsert(Customer, [
+            customer_row(1, first_name='x' * 65, support_representative=missing_employee_id),
+            customer_row(2, phone='phone', fax='12'),
+            customer_row(3, id='abc', nickname='x'),
+        ])
+
+        assert result.pks == []
+        assert result.errors[0] == {
+            'first_name': ['Ensure this value has at most 64 characters (it has 65).'],
+            'support_representative': [f'employee instance with id {missing_employee_id} is not a valid choice.'],
+        }
+        assert set(result.errors[1]) == {'phone', 'fax'}
+        assert result.errors[2] == {
+            '__all__': ['Unknown fields: nickname.'], 'id': ['“abc” value must be an integer.']
+        }
+
+    def test_one_query_per_unique_field(self, employee_factory):
+        employee = employee_factory()
+        instances = [Customer(**customer_row(index, support_representative_id=employee.id)) for index in range(50)]
+
+        # support representative, phone and email
+        with CaptureQueriesContext(connection) as queries:
+            assert validate_batch(instances) == {}
+        assert len(queries) == 3
+
+    def test_endpoint(self, customer_factory):
+        customer_factory(email='taken@example.com')
+
+        response = self.client.post(
+            reverse('api-customer-bulk-upsert'),
+            [customer_row(1), customer_row(2, email='taken@example.com')],
+            format='json'
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'created': 1,
+            'updated': 0,
+            'ids': [Customer.objects.get(email='customer1@example.com').id],
+            'errors': [{'index': 1, 'errors': {'email': ['Customer with this Email already exists.']}}],
+        }
+
+    def test_endpoint_nothing_valid(self):
+        response = self.client.post(reverse('api-customer-bulk-upsert'), [customer_row(1, city='')], format='json')
+
+        assert response.status_code == 400
+        assert response.json()['errors'] == [{'index': 0, 'errors': {'city': ['This field cannot be blank.']}}]
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .api.views import CustomerBulkUpsertAPIView
+
+urlpatterns = [
+    path('api/v1/customers/bulk', CustomerBulkUpsertAPIView.as_view(), name='api-customer-bulk-upsert'),
+]
@@ -0,0 +1,10 @@
+from apps.core.api.views import BulkUpsertAPIView
+from apps.employees.models import Employee
+
+
+class EmployeeBulkUpsertAPIView(BulkUpsertAPIView):
+    """
+    API endpoint to create or replace many employees in one request, see `BulkUpsertAPIView`. 'phone' and 'email' must
+    be unique among the stored employees and the body. 'reports_to' can be the 'id' of an employee of the body.
+    """
+    model = Employee
@@ -0,0 +1,69 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.bulk import bulk_upsert
+from apps.employees.models import Employee
+
+pytestmark = pytest.mark.django_db
+
+
+def employee_row(index: int, **fields) -> dict:
+    return {
+        'first_name': f'First{index}',
+        'last_name': f'Last{index}',
+        'title': 'Sales Support Agent',
+        'hire_date': '2020-01-01T00:00:00Z',
+        'address': f'Street {index}',
+        'city': 'Calgary',
+        'state': 'AB',
+        'country': 'Canada',
+        'postal_code': 'T2P 2T3',
+        'phone': f'+1 {index:09d}',
+        'email': f'employee{index}@example.com',
+        **fields,
+    }
+
+
+class TestEmployeeBulkUpsert:
+    client = APIClient()
+
+    def test_reports_to_an_employee_of_the_batch(self):
+        result = bulk_upsert(Employee, [
+            employee_row(1, id=1001),
+            employee_row(2, reports_to=1001),
+            employee_row(3, reports_to=1002),
+        ])
+
+        assert result.errors == {2: {'reports_to': ['employee instance with id 1002 is not a valid choice.']}}
+        assert Employee.objects.get(pk=result.pks[1]).reports_to_id == 1001
+
+    def test_replaced_row_keeps_its_unique_values(self, employee_factory):
+        employee = employee_factory(phone='+1 000000001', email='employee1@example.com')
+
+        result = bulk_upsert(Employee, [employee_row(1, id=employee.id, first_name='Jane')])
+
+        assert (result.created, result.updated, result.errors) == (0, 1, {})
+        employee.refresh_from_db()
+        assert employee.first_name == 'Jane'
+
+    def test_same_id_twice(self):
+        result = bulk_upsert(Employee, [employee_row(1, id=1001), employee_row(2, id=1001)])
+
+        assert result.errors == {1: {'id': ['Employee with this Id already exists.']}}
+
+    def test_endpoint(self, employee_factory):
+        employee = employee_factory()
+
+        response = self.client.post(
+            reverse('api-employee-bulk-upsert'), [employee_row(1, id=employee.id), employee_row(2)], format='json'
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'created': 1,
+            'updated': 1,
+            'ids': [employee.id, Employee.objects.get(email='employee2@example.com').id],
+            'errors': [],
+        }
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .api.views import EmployeeBulkUpsertAPIView
+
+urlpatterns = [
+    path('api/v1/employees/bulk', EmployeeBulkUpsertAPIView.as_view(), name='api-employee-bulk-upsert'),
+]
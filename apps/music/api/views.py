@@ -0,0 +1,192 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.music.models import TrackCatalogEntry
+from apps.music.search import KINDS, match_expression, search_catalog
+
+# query parameter -> TrackCatalogEntry field the catalog listing can be filtered on
+CATALOG_FILTERS = {
+    'genre': 'genre_id',
+    'artist': 'artist_id',
+    'media_type': 'media_type_id',
+}
+
+
+class CatalogSearchAPIView(APIView):
+    """
+    API endpoint to search the catalog (tracks, albums and artists) by name.
+
+    Query Parameters:
+        - q (str): The words to search for. Every word must match, as a whole word or as the start of one, in the
+        name, composer, album or artist of a track, the title or artist of an album, or the name of an artist. Case
+        and accents are ignored.
+        - type (str): Optional comma separated list of the kinds of results, any of 'track', 'album' and 'artist'.
+        Defaults to all of them.
+        - page (str): Page number, from 1. Defaults to 1.
+        - page_size (str): Number of results per page, between 1 and 100. Defaults to 20.
+
+    Results are ranked by relevance (BM25 over the full-text index of `apps.music.search`, a match on the name weighing
+    most), the best first.
+
+    Returns:
+        - 400 Bad request: if "q" has no word, or any other query parameter has an invalid value.
+        - 200 OK: JSON object with 'results', a list of JSON objects containing 'Type', 'Id', 'Name', 'Composer',
+        'Album' and 'Artist' (null when they don't apply), and 'next_page' (null on the last page).
+        - 204 No Content: If nothing matches, or the page is past the last one.
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request) -> Response:
+        query = request.GET.get('q') or ''
+        kinds = tuple((request.GET.get('type') or ','.join(KINDS)).split(','))
+        page = request.GET.get('page') or '1'
+        page_size = request.GET.get('page_size') or '20'
+
+        if (
+                match_expression(query) is None
+                or not set(kinds) <= set(KINDS)
+                or not page.isdigit() or not 1 <= int(page) <= 10000
+                or not page_size.isdigit() or not 1 <= int(page_size) <= 100
+        ):
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Invalid "q", "type", "page" and/or "page_size" chosen.',
+                    'accepted values for "q"': 'text with at least one word.',
+                    'accepted values for "type"': 'comma separated list of track; album; artist.',
+                    'accepted values for "page"': 'integer between 1 and 10000.',
+                    'accepted values for "page_size"': 'integer between 1 and 100.',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page, page_size = int(page), int(page_size)
+        # one extra row tells whether there is a next page
+        rows = search_catalog(query, kinds, limit=page_size + 1, offset=(page - 1) * page_size)
+
+        if rows:
+            results = [
+                {
+                    'Type': row.kind,
+                    'Id': row.id,
+                    'Name': row.name,
+                    'Composer': row.composer,
+                    'Album': row.album,
+                    'Artist': row.artist,
+                }
+                for row in rows[:page_size]
+            ]
+            next_page = page + 1 if len(rows) > page_size else None
+
+            return Response({'results': results, 'next_page': next_page}, status=status.HTTP_200_OK)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def encode_cursor(entry: TrackCatalogEntry) -> str:
+    payload = json.dumps([entry.name, entry.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Returns the (name, track id) keyset encoded in a cursor, raising ValueError if it is invalid.
+    """
+    try:
+        name, track_id = json.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(name, str):
+            raise TypeError('name is not a string')
+        return name, int(track_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as error:
+        raise ValueError('invalid cursor') from error
+
+
+class TrackCatalogAPIView(APIView):
+    """
+    API endpoint to list the tracks of the catalog with their album, artist, genre and media type.
+
+    The tracks are read from the `TrackCatalogEntry` read model alone (one query per page, no join), ordered by name
+    and track id, and paginated with a cursor (keyset) on those values, so deep pages are as fast as the first one.
+    Each filter is answered by an index on the filtered id and the name.
+
+    Query Parameters:
+        - genre / artist / media_type (str): Optional id of the genre, artist or media type to list the tracks of.
+        - page_size (str): Number of results per page, between 1 and 1000. Defaults to 100.
+        - cursor (str): The 'next_cursor' of the previous page.
+
+    Returns:
+        - 400 Bad request: if any query parameter has an invalid value.
+        - 200 OK: JSON object with 'results', a list of JSON objects containing 'Id', 'Name', 'Composer', 'Album',
+        'Artist', 'Genre', 'Media Type', 'Milliseconds', 'Bytes' and 'Unit Price', and 'next_cursor' (null on the
+        last page).
+        - 204 No Content: If no track is available to fulfill the request.
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request) -> Response:
+        filters = {field: request.GET.get(parameter) for parameter, field in CATALOG_FILTERS.items()}
+        filters = {field: value for field, value in filters.items() if value is not None}
+        page_size = request.GET.get('page_size') or '100'
+        cursor = request.GET.get('cursor')
+
+        if (
+                not all(value.isdigit() for value in filters.values())
+                or not page_size.isdigit() or not 1 <= int(page_size) <= 1000
+        ):
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Invalid "genre", "artist", "media_type" and/or "page_size" chosen.',
+                    'accepted values for "genre", "artist" and "media_type"': 'id (digits only).',
+                    'accepted values for "page_size"': 'integer between 1 and 1000.',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response(
+                {'status': 'error', 'message': 'Invalid "cursor", use the "next_cursor" of the previous page.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page_size = int(page_size)
+        entries = TrackCatalogEntry.objects.filter(**{field: int(value) for field, value in filters.items()})
+        if after:
+            name, track_id = after
+            # name__gte starts the index range at the keyset, the OR only drops the rows of that name before it
+            entries = entries.filter(Q(name__gte=name), Q(name__gt=name) | Q(id__gt=track_id))
+        # one extra row tells whether there is a next page
+        entries = list(entries.order_by('name', 'id')[:page_size + 1])
+
+        if entries:
+            page = entries[:page_size]
+            results = [self.catalog_row(entry) for entry in page]
+            next_cursor = encode_cursor(page[-1]) if len(entries) > page_size else None
+
+            return Response({'results': results, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def catalog_row(entry: TrackCatalogEntry) -> dict:
+        return {
+            'Id': entry.id,
+            'Name': entry.name,
+            'Composer': entry.composer,
+            'Album': entry.album_title,
+            'Artist': entry.artist_name,
+            'Genre': entry.genre_name,
+            'Media Type': entry.media_type_name,
+            'Milliseconds': entry.milliseconds,
+            'Bytes': entry.bytes,
+            'Unit Price': entry.unit_price,
+        }
@@ -5,3 +5,7 @@ class MusicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.music'
     verbose_name = 'music'
+
+    def ready(self):
+        # connect the signal handlers that invalidate the reference data cache
+        from apps.music import signals  # noqa: F401
@@ -0,0 +1,118 @@
+# Full-text index of the catalog, see apps/music/search.py.
+
+from django.db import migrations
+
+# rowid of the CatalogSearch row of a track, an album or an artist: id * 3 + 0, 1 or 2
+TRACK_DOCUMENT = """
+    INSERT INTO CatalogSearch (rowid, name, composer, album, artist, kind)
+    SELECT new.TrackId * 3, new.Name, new.Composer, Album.Title, Artist.Name, 'track'
+    FROM (SELECT 1) LEFT JOIN Album ON Album.AlbumId = new.AlbumId LEFT JOIN Artist ON Artist.ArtistId = Album.ArtistId;
+"""
+ALBUM_DOCUMENT = """
+    INSERT INTO CatalogSearch (rowid, name, artist, kind)
+    SELECT new.AlbumId * 3 + 1, new.Title, Artist.Name, 'album'
+    FROM (SELECT 1) LEFT JOIN Artist ON Artist.ArtistId = new.ArtistId;
+"""
+ARTIST_DOCUMENT = """
+    INSERT INTO CatalogSearch (rowid, name, kind) VALUES (new.ArtistId * 3 + 2, new.Name, 'artist');
+"""
+
+CREATE_CATALOG_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE CatalogSearch USING fts5(
+        name, composer, album, artist, kind UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # bm25 weights of name, composer, album and artist, used by ORDER BY rank
+    "INSERT INTO CatalogSearch (CatalogSearch, rank) VALUES ('rank', 'bm25(10.0, 2.0, 4.0, 4.0)')",
+
+    f"CREATE TRIGGER catalog_search_track_insert AFTER INSERT ON Track BEGIN {TRACK_DOCUMENT} END",
+    f"""
+    CREATE TRIGGER catalog_search_track_update AFTER UPDATE OF TrackId, Name, Composer, AlbumId ON Track
+    WHEN old.TrackId IS NOT new.TrackId OR old.Name IS NOT new.Name OR old.Composer IS NOT new.Composer
+        OR old.AlbumId IS NOT new.AlbumId
+    BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.TrackId * 3;
+        {TRACK_DOCUMENT}
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_search_track_delete AFTER DELETE ON Track BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.TrackId * 3;
+    END
+    """,
+
+    f"CREATE TRIGGER catalog_search_album_insert AFTER INSERT ON Album BEGIN {ALBUM_DOCUMENT} END",
+    f"""
+    CREATE TRIGGER catalog_search_album_update AFTER UPDATE OF AlbumId, Title, ArtistId ON Album
+    WHEN old.AlbumId IS NOT new.AlbumId OR old.Title IS NOT new.Title OR old.ArtistId IS NOT new.ArtistId
+    BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.AlbumId * 3 + 1;
+        {ALBUM_DOCUMENT}
+        UPDATE CatalogSearch
+        SET album = new.Title, artist = (SELECT Name FROM Artist WHERE ArtistId = new.ArtistId)
+        WHERE rowid IN (SELECT TrackId * 3 FROM Track WHERE AlbumId = new.AlbumId);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_search_album_delete AFTER DELETE ON Album BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.AlbumId * 3 + 1;
+    END
+    """,
+
+    f"CREATE TRIGGER catalog_search_artist_insert AFTER INSERT ON Artist BEGIN {ARTIST_DOCUMENT} END",
+    f"""
+    CREATE TRIGGER catalog_search_artist_update AFTER UPDATE OF ArtistId, Name ON Artist
+    WHEN old.ArtistId IS NOT new.ArtistId OR old.Name IS NOT new.Name
+    BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.ArtistId * 3 + 2;
+        {ARTIST_DOCUMENT}
+        UPDATE CatalogSearch SET artist = new.Name
+        WHERE rowid IN (
+            SELECT AlbumId * 3 + 1 FROM Album WHERE ArtistId = new.ArtistId
+            UNION ALL
+            SELECT Track.TrackId * 3 FROM Track JOIN Album ON Album.AlbumId = Track.AlbumId
+            WHERE Album.ArtistId = new.ArtistId
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_search_artist_delete AFTER DELETE ON Artist BEGIN
+        DELETE FROM CatalogSearch WHERE rowid = old.ArtistId * 3 + 2;
+    END
+    """,
+
+    # the catalog already stored
+    """
+    INSERT INTO CatalogSearch (rowid, name, composer, album, artist, kind)
+    SELECT Track.TrackId * 3, Track.Name, Track.Composer, Album.Title, Artist.Name, 'track'
+    FROM Track LEFT JOIN Album ON Album.AlbumId = Track.AlbumId LEFT JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    """,
+    """
+    INSERT INTO CatalogSearch (rowid, name, artist, kind)
+    SELECT Album.AlbumId * 3 + 1, Album.Title, Artist.Name, 'album'
+    FROM Album LEFT JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    """,
+    "INSERT INTO CatalogSearch (rowid, name, kind) SELECT ArtistId * 3 + 2, Name, 'artist' FROM Artist",
+]
+
+DROP_CATALOG_SEARCH = [
+    *(
+        f'DROP TRIGGER catalog_search_{model}_{operation}'
+        for model in ('track', 'album', 'artist') for operation in ('insert', 'update', 'delete')
+    ),
+    'DROP TABLE CatalogSearch',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_CATALOG_SEARCH, DROP_CATALOG_SEARCH),
+    ]
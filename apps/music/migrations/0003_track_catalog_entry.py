@@ -0,0 +1,116 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:04
+
+from django.db import migrations, models
+
+# Triggers keeping TrackCatalogEntry (apps/music/models.py) up to date with the tables it is read from.
+TRACK_ENTRY = """
+    INSERT OR REPLACE INTO TrackCatalogEntry (
+        TrackId, Name, Composer, Milliseconds, Bytes, UnitPrice, AlbumId, AlbumTitle, ArtistId, ArtistName, GenreId,
+        GenreName, MediaTypeId, MediaTypeName
+    )
+    SELECT
+        new.TrackId, new.Name, new.Composer, new.Milliseconds, new.Bytes, new.UnitPrice, new.AlbumId, Album.Title,
+        Album.ArtistId, Artist.Name, new.GenreId, Genre.Name, new.MediaTypeId, MediaType.Name
+    FROM (SELECT 1)
+    LEFT JOIN Album ON Album.AlbumId = new.AlbumId
+    LEFT JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    LEFT JOIN Genre ON Genre.GenreId = new.GenreId
+    LEFT JOIN MediaType ON MediaType.MediaTypeId = new.MediaTypeId;
+"""
+# The entries of an album, artist, genre or media type, on insert too: with deferred foreign keys, a track can be
+# written before them in the same transaction.
+ALBUM_ENTRIES = """
+    UPDATE TrackCatalogEntry
+    SET
+        AlbumTitle = new.Title,
+        ArtistId = new.ArtistId,
+        ArtistName = (SELECT Name FROM Artist WHERE ArtistId = new.ArtistId)
+    WHERE AlbumId = new.AlbumId;
+"""
+ARTIST_ENTRIES = 'UPDATE TrackCatalogEntry SET ArtistName = new.Name WHERE ArtistId = new.ArtistId;'
+GENRE_ENTRIES = 'UPDATE TrackCatalogEntry SET GenreName = new.Name WHERE GenreId = new.GenreId;'
+MEDIA_TYPE_ENTRIES = 'UPDATE TrackCatalogEntry SET MediaTypeName = new.Name WHERE MediaTypeId = new.MediaTypeId;'
+
+CREATE_TRIGGERS = [
+    f'CREATE TRIGGER track_catalog_entry_track_insert AFTER INSERT ON Track BEGIN {TRACK_ENTRY} END',
+    f"""
+    CREATE TRIGGER track_catalog_entry_track_update AFTER UPDATE ON Track BEGIN
+        DELETE FROM TrackCatalogEntry WHERE TrackId = old.TrackId AND old.TrackId IS NOT new.TrackId;
+        {TRACK_ENTRY}
+    END
+    """,
+    'CREATE TRIGGER track_catalog_entry_track_delete AFTER DELETE ON Track BEGIN '
+    'DELETE FROM TrackCatalogEntry WHERE TrackId = old.TrackId; END',
+    *(
+        f'CREATE TRIGGER track_catalog_entry_{name}_{event.lower()} AFTER {event} {columns} ON {table} '
+        f'BEGIN {entries} END'
+        for name, table, update_columns, entries in [
+            ('album', 'Album', 'OF Title, ArtistId', ALBUM_ENTRIES),
+            ('artist', 'Artist', 'OF Name', ARTIST_ENTRIES),
+            ('genre', 'Genre', 'OF Name', GENRE_ENTRIES),
+            ('media_type', 'MediaType', 'OF Name', MEDIA_TYPE_ENTRIES),
+        ]
+        for event, columns in [('INSERT', ''), ('UPDATE', update_columns)]
+    ),
+    # the tracks already stored
+    """
+    INSERT INTO TrackCatalogEntry (
+        TrackId, Name, Composer, Milliseconds, Bytes, UnitPrice, AlbumId, AlbumTitle, ArtistId, ArtistName, GenreId,
+        GenreName, MediaTypeId, MediaTypeName
+    )
+    SELECT
+        Track.TrackId, Track.Name, Track.Composer, Track.Milliseconds, Track.Bytes, Track.UnitPrice, Track.AlbumId,
+        Album.Title, Album.ArtistId, Artist.Name, Track.GenreId, Genre.Name, Track.MediaTypeId, MediaType.Name
+    FROM Track
+    LEFT JOIN Album ON Album.AlbumId = Track.AlbumId
+    LEFT JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    LEFT JOIN Genre ON Genre.GenreId = Track.GenreId
+    LEFT JOIN MediaType ON MediaType.MediaTypeId = Track.MediaTypeId
+    """,
+]
+
+DROP_TRIGGERS = [
+    f'DROP TRIGGER track_catalog_entry_{name}_{event}'
+    for name, events in [
+        ('track', ('insert', 'update', 'delete')),
+        *((name, ('insert', 'update')) for name in ('album', 'artist', 'genre', 'media_type')),
+    ]
+    for event in events
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0002_catalog_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackCatalogEntry',
+            fields=[
+                ('id', models.IntegerField(db_column='TrackId', primary_key=True, serialize=False)),
+                ('name', models.CharField(db_column='Name', max_length=255, verbose_name='name')),
+                ('composer', models.CharField(db_column='Composer', max_length=128, null=True, verbose_name='composer')),
+                ('milliseconds', models.PositiveIntegerField(db_column='Milliseconds', verbose_name='duration')),
+                ('bytes', models.PositiveIntegerField(db_column='Bytes', verbose_name='size')),
+                ('unit_price', models.DecimalField(db_column='UnitPrice', decimal_places=2, max_digits=5, verbose_name='price')),
+                ('album_id', models.IntegerField(db_column='AlbumId', null=True, verbose_name='album')),
+                ('album_title', models.CharField(db_column='AlbumTitle', max_length=128, null=True, verbose_name='album title')),
+                ('artist_id', models.IntegerField(db_column='ArtistId', null=True, verbose_name='artist')),
+                ('artist_name', models.CharField(db_column='ArtistName', max_length=128, null=True, verbose_name='artist name')),
+                ('genre_id', models.IntegerField(db_column='GenreId', null=True, verbose_name='genre')),
+                ('genre_name', models.CharField(db_column='GenreName', max_length=128, null=True, verbose_name='genre name')),
+                ('media_type_id', models.IntegerField(db_column='MediaTypeId', verbose_name='media type')),
+                ('media_type_name', models.CharField(db_column='MediaTypeName', max_length=128, null=True, verbose_name='media type name')),
+            ],
+            options={
+                'verbose_name': 'track catalog entry',
+                'verbose_name_plural': 'track catalog entries',
+                'db_table': 'TrackCatalogEntry',
+                'ordering': ['name', 'id'],
+                'indexes': [models.Index(fields=['name'], name='catalog_entry_name_idx'), models.Index(fields=['genre_id', 'name'], name='catalog_entry_genre_idx'), models.Index(fields=['artist_id', 'name'], name='catalog_entry_artist_idx'), models.Index(fields=['media_type_id', 'name'], name='catalog_entry_media_type_idx'), models.Index(fields=['album_id'], name='catalog_entry_album_idx')],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0003_track_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(db_column='Version', default=0, verbose_name='version')),
+            ],
+            options={
+                'verbose_name': 'reference data version',
+                'db_table': 'ReferenceDataVersion',
+            },
+        ),
+    ]
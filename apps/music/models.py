@@ -189,3 +189,125 @@ class MediaType(models.Model):
         # other field constraints at the database level.
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+# Read model of the catalog: a track with the names of its album, artist, genre and media type, so that listings read
+# a single table instead of joining five. Its rows are written by the triggers of migration 0003 on every write to
+# Track, Album, Artist, Genre and MediaType (bulk writes and QuerySet.update() included), never by the application.
+class TrackCatalogEntry(models.Model):
+    id = models.IntegerField(
+        db_column='TrackId',
+        primary_key=True
+    )
+    name = models.CharField(
+        max_length=255,
+        verbose_name='name',
+        db_column='Name',
+    )
+    composer = models.CharField(
+        max_length=128,
+        verbose_name='composer',
+        db_column='Composer',
+        null=True
+    )
+    milliseconds = models.PositiveIntegerField(
+        verbose_name='duration',
+        db_column='Milliseconds'
+    )
+    bytes = models.PositiveIntegerField(
+        verbose_name='size',
+        db_column='Bytes',
+    )
+    unit_price = models.DecimalField(
+        verbose_name='price',
+        db_column='UnitPrice',
+        max_digits=5,
+        decimal_places=2,
+    )
+    # Ids of the related rows, without foreign keys: the triggers keep them, and the names, up to date. The composer,
+    # album and genre are nullable, as they are in the Track table of the Chinook database.
+    album_id = models.IntegerField(
+        verbose_name='album',
+        db_column='AlbumId',
+        null=True
+    )
+    album_title = models.CharField(
+        max_length=128,
+        verbose_name='album title',
+        db_column='AlbumTitle',
+        null=True
+    )
+    artist_id = models.IntegerField(
+        verbose_name='artist',
+        db_column='ArtistId',
+        null=True
+    )
+    artist_name = models.CharField(
+        max_length=128,
+        verbose_name='artist name',
+        db_column='ArtistName',
+        null=True
+    )
+    genre_id = models.IntegerField(
+        verbose_name='genre',
+        db_column='GenreId',
+        null=True
+    )
+    genre_name = models.CharField(
+        max_length=128,
+        verbose_name='genre name',
+        db_column='GenreName',
+        null=True
+    )
+    media_type_id = models.IntegerField(
+        verbose_name='media type',
+        db_column='MediaTypeId',
+    )
+    media_type_name = models.CharField(
+        max_length=128,
+        verbose_name='media type name',
+        db_column='MediaTypeName',
+        null=True
+    )
+
+    class Meta:
+        db_table = 'TrackCatalogEntry'
+        ordering = ['name', 'id']
+        verbose_name = 'track catalog entry'
+        verbose_name_plural = 'track catalog entries'
+        indexes = [
+            # The listings are ordered by name and track id (the rowid, implicitly at the end of every index), whole
+            # or filtered by genre, artist or media type, and paginated with a keyset on (name, track id).
+            models.Index(fields=['name'], name='catalog_entry_name_idx'),
+            models.Index(fields=['genre_id', 'name'], name='catalog_entry_genre_idx'),
+            models.Index(fields=['artist_id', 'name'], name='catalog_entry_artist_idx'),
+            models.Index(fields=['media_type_id', 'name'], name='catalog_entry_media_type_idx'),
+            # for the triggers updating the entries of a renamed album
+            models.Index(fields=['album_id'], name='catalog_entry_album_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ReferenceDataVersion(models.Model):
+    """
+    Version stamp of the genre, media type and artist names, in a single row.
+
+    Moved forward by the signal handlers in `apps.music.signals` on every write to those tables, and read by every
+    process to tell whether the names it loaded (`apps.music.reference`) are still current.
+    """
+    SINGLETON_ID = 1
+
+    version = models.PositiveBigIntegerField(
+        verbose_name='version',
+        db_column='Version',
+        default=0
+    )
+
+    class Meta:
+        db_table = 'ReferenceDataVersion'
+        verbose_name = 'reference data version'
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,83 @@
+"""
+Process-local cache of the catalog reference data: the names of the genres, media types and artists by id.
+
+Those tables are small and written far less often than they are read, so each process loads them whole on first use
+(one query per table) into read-only mappings, and resolves names from them without querying nor joining.
+
+The loaded data is tagged with a version stamp stored in the database (`ReferenceDataVersion`), which moves forward
+on every write to those tables (see `apps.music.signals`). Every use compares the stamp with the version loaded, one
+primary key lookup, and reloads when it moved, so a write in one worker is seen by the others on their next use.
+Writes that send no signal (`QuerySet.update()`, `bulk_create`, raw SQL) must call `bump_reference_data_version()`.
+"""
+import threading
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from django.db import connections, models, router
+from django.db.models import F
+
+from apps.music.models import Artist, Genre, MediaType, ReferenceDataVersion
+
+VERSION_SQL = 'SELECT Version FROM ReferenceDataVersion WHERE id = %s'
+
+
+class ReferenceData(NamedTuple):
+    version: int
+    genres: Mapping[int, str]
+    media_types: Mapping[int, str]
+    artists: Mapping[int, str]
+
+
+_lock = threading.Lock()
+_loaded: ReferenceData | None = None
+
+
+def reference_data_version() -> int:
+    # run on every use: a plain cursor, the ORM would take longer than the lookup itself
+    with connections[router.db_for_read(ReferenceDataVersion)].cursor() as cursor:
+        cursor.execute(VERSION_SQL, [ReferenceDataVersion.SINGLETON_ID])
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def bump_reference_data_version() -> None:
+    """
+    Tells every process to reload the reference data. The stamp is written in the current transaction, so the other
+    processes see it move when the write commits, and it moves back if the write is rolled back (which reloads the
+    process that read the rolled back data, since its version no longer matches).
+    """
+    stamp = ReferenceDataVersion.objects.filter(pk=ReferenceDataVersion.SINGLETON_ID)
+    if not stamp.update(version=F('version') + 1):
+        ReferenceDataVersion.objects.create(pk=ReferenceDataVersion.SINGLETON_ID, version=1)
+
+
+def _names(model: type[models.Model]) -> Mapping[int, str]:
+    return MappingProxyType(dict(model.objects.order_by().values_list('id', 'name')))
+
+
+def reference_data() -> ReferenceData:
+    """
+    Returns the reference data, loading it if this process has not yet or if it changed since.
+
+    The result is immutable and consistent: keep it rather than calling again to resolve many names at once.
+    """
+    global _loaded
+
+    version = reference_data_version()
+    loaded = _loaded
+    if loaded is not None and loaded.version == version:
+        return loaded
+
+    with _lock:
+        if _loaded is None or _loaded.version != version:
+            # The version is read before the rows: a write in between moves it forward, and the next use reloads.
+            _loaded = ReferenceData(version, _names(Genre), _names(MediaType), _names(Artist))
+        return _loaded
+
+
+def clear_reference_data() -> None:
+    """
+    Drops the reference data loaded by this process, the next use loads it again.
+    """
+    global _loaded
+    _loaded = None
@@ -0,0 +1,81 @@
+"""
+Full-text search over the catalog: tracks (by name, composer, album and artist), albums (by title and artist) and
+artists (by name).
+
+The `CatalogSearch` FTS5 table (migration 0002) holds one row per track, album and artist, its rowid being the id of
+the row times 3 plus 0, 1 or 2 respectively. Triggers on `Track`, `Album` and `Artist` keep it in sync with every
+write to those tables, `bulk_create`, `QuerySet.update()` and raw SQL included: renaming an artist or an album
+rewrites the rows of its albums and tracks. Terms are tokenized without case nor diacritics, and the prefixes of 2 and
+3 characters are indexed so that prefix queries don't scan the term list.
+
+A query matches the rows containing every one of its words, as a whole word or as a prefix (words of one character
+only as a whole word), ranked with BM25, a match on the name weighing more than one on the album or the artist, and on
+the composer least.
+"""
+import re
+from typing import NamedTuple
+
+from django.db import connection
+
+KINDS = ('track', 'album', 'artist')
+MAX_TERMS = 10
+MIN_PREFIX_LENGTH = 2
+
+WORD = re.compile(r'\w+')
+
+
+class SearchResult(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    composer: str | None
+    album: str | None
+    artist: str | None
+    rank: float
+
+
+def match_expression(query: str) -> str | None:
+    """
+    Returns the FTS5 query matching every word of `query` (at most MAX_TERMS), as prefixes, or None if it has no word.
+
+    The words are quoted, so that the query syntax of FTS5 (operators, column filters...) is not available to the
+    caller: a search for 'NOT' or 'name:x' matches those words.
+    """
+    terms = WORD.findall(query)[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' if len(term) >= MIN_PREFIX_LENGTH else f'"{term}"' for term in terms)
+
+
+def search_catalog(query: str, kinds: tuple[str, ...] = KINDS, limit: int = 20, offset: int = 0) -> list[SearchResult]:
+    """
+    Returns the rows of `kinds` matching `query`, best ranked first, from `offset` and at most `limit` of them.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+
+    # The matches are ranked from the index alone (rowid and rank, the kind being encoded in the rowid), and the
+    # columns are only read for the rows of the page.
+    conditions = ''
+    params = [expression]
+    if set(kinds) != set(KINDS):
+        conditions = f" AND rowid %% 3 IN ({', '.join(['%s'] * len(kinds))})"
+        params.extend(KINDS.index(kind) for kind in kinds)
+    params.extend([limit, offset])
+
+    sql = f"""
+        WITH page AS (
+            SELECT rowid, rank FROM CatalogSearch
+            WHERE CatalogSearch MATCH %s{conditions}
+            ORDER BY rank, rowid
+            LIMIT %s OFFSET %s
+        )
+        SELECT CatalogSearch.kind, page.rowid / 3, CatalogSearch.name, CatalogSearch.composer, CatalogSearch.album,
+            CatalogSearch.artist, page.rank
+        FROM page JOIN CatalogSearch ON CatalogSearch.rowid = page.rowid
+        ORDER BY page.rank, page.rowid
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [SearchResult(*row) for row in cursor.fetchall()]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.core.bulk import post_bulk_upsert
+from apps.music.models import Artist, Genre, MediaType
+from apps.music.reference import bump_reference_data_version
+
+
+def bump_reference_data_version_on_write(sender, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        bump_reference_data_version()
+
+
+for model in (Genre, MediaType, Artist):
+    post_save.connect(
+        bump_reference_data_version_on_write, sender=model, dispatch_uid=f'reference_data_save_{model.__name__}'
+    )
+    post_delete.connect(
+        bump_reference_data_version_on_write, sender=model, dispatch_uid=f'reference_data_delete_{model.__name__}'
+    )
+    post_bulk_upsert.connect(
+        bump_reference_data_version_on_write, sender=model, dispatch_uid=f'reference_data_bulk_upsert_{model.__name__}'
+    )
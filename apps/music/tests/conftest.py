@@ -1,3 +1,5 @@
+import pytest
+
 from pytest_factoryboy import register
 
 from apps.music.factories import (
@@ -7,9 +9,18 @@ from apps.music.factories import (
     TrackFactory,
     MediaTypeFactory
 )
+from apps.music.reference import clear_reference_data
 
 register(AlbumFactory)
 register(ArtistFactory)
 register(GenreFactory)
 register(TrackFactory)
 register(MediaTypeFactory)
+
+
+@pytest.fixture(autouse=True)
+def music_reference_data():
+    # The reference data loaded by the process outlives the test database.
+    clear_reference_data()
+    yield
+    clear_reference_data()
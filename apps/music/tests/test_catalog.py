@@ -0,0 +1,210 @@
+import importlib
+import pytest
+import sqlite3
+
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.music.models import Album, Artist, Genre, Track, TrackCatalogEntry
+
+pytestmark = pytest.mark.django_db
+
+catalog_migration = importlib.import_module('apps.music.migrations.0003_track_catalog_entry')
+
+# The catalog tables as in the Chinook database (data.db), where a track may have no composer, album nor genre.
+CHINOOK_TABLES = [
+    'CREATE TABLE Artist (ArtistId INTEGER PRIMARY KEY, Name NVARCHAR(120))',
+    'CREATE TABLE Album (AlbumId INTEGER PRIMARY KEY, Title NVARCHAR(160) NOT NULL, ArtistId INTEGER NOT NULL)',
+    'CREATE TABLE Genre (GenreId INTEGER PRIMARY KEY, Name NVARCHAR(120))',
+    'CREATE TABLE MediaType (MediaTypeId INTEGER PRIMARY KEY, Name NVARCHAR(120))',
+    '''
+    CREATE TABLE Track (
+        TrackId INTEGER PRIMARY KEY, Name NVARCHAR(200) NOT NULL, AlbumId INTEGER, MediaTypeId INTEGER NOT NULL,
+        GenreId INTEGER, Composer NVARCHAR(220), Milliseconds INTEGER NOT NULL, Bytes INTEGER,
+        UnitPrice NUMERIC(10,2) NOT NULL
+    )
+    ''',
+]
+
+
+def query_plan(sql: str, params=()) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class TestTrackCatalog:
+    client = APIClient()
+
+    @pytest.fixture
+    def catalog(self, artist_factory, album_factory, genre_factory, media_type_factory, track_factory):
+        rock, blues = genre_factory(name='Rock'), genre_factory(name='Blues')
+        mpeg = media_type_factory(name='MPEG audio file')
+        zeppelin, muddy = artist_factory(name='Led Zeppelin'), artist_factory(name='Muddy Waters')
+        iv = album_factory(title='Led Zeppelin IV', artist=zeppelin)
+        hard_again = album_factory(title='Hard Again', artist=muddy)
+        tracks = [
+            track_factory(name=name, album=album, genre=genre, media_type=mpeg, unit_price=Decimal('0.99'))
+            for name, album, genre in [
+                ('Stairway to Heaven', iv, rock),
+                ('Black Dog', iv, rock),
+                ('When the Levee Breaks', iv, blues),
+                ('Mannish Boy', hard_again, blues),
+                ('Black Dog', hard_again, blues),
+            ]
+        ]
+        return {'rock': rock, 'blues': blues, 'zeppelin': zeppelin, 'iv': iv, 'tracks': tracks}
+
+    def test_entries_are_written_with_the_tracks(self, catalog):
+        stairway = catalog['tracks'][0]
+        entry = TrackCatalogEntry.objects.get(pk=stairway.pk)
+
+        assert (
+            entry.name, entry.composer, entry.unit_price, entry.album_id, entry.album_title, entry.artist_id,
+            entry.artist_name, entry.genre_name, entry.media_type_name
+        ) == (
+            'Stairway to Heaven', stairway.composer, Decimal('0.99'), catalog['iv'].pk, 'Led Zeppelin IV',
+            catalog['zeppelin'].pk, 'Led Zeppelin', 'Rock', 'MPEG audio file'
+        )
+        assert TrackCatalogEntry.objects.count() == 5
+
+    def test_entries_follow_writes_to_every_table(self, catalog, artist_factory):
+        stairway, levee = catalog['tracks'][0], catalog['tracks'][2]
+        Artist.objects.filter(pk=catalog['zeppelin'].pk).update(name='The Yardbirds')
+        Genre.objects.filter(pk=catalog['rock'].pk).update(name='Hard Rock')
+        catalog['iv'].title = 'Untitled'
+        catalog['iv'].save()
+        stairway.name = 'Stairway'
+        stairway.save()
+        levee.delete()
+
+        entry = TrackCatalogEntry.objects.get(pk=stairway.pk)
+        assert (entry.name, entry.album_title, entry.artist_name, entry.genre_name) == (
+            'Stairway', 'Untitled', 'The Yardbirds', 'Hard Rock'
+        )
+        assert not TrackCatalogEntry.objects.filter(pk=levee.pk).exists()
+
+        other = artist_factory(name='Jimmy Page')
+        Album.objects.filter(pk=catalog['iv'].pk).update(artist=other)
+        entries = TrackCatalogEntry.objects.filter(album_id=catalog['iv'].pk)
+        assert set(entries.values_list('artist_id', 'artist_name')) == {(other.pk, 'Jimmy Page')}
+
+    def test_bulk_created_tracks_have_entries(self, catalog):
+        track = catalog['tracks'][0]
+        track.pk = None
+        track.name = 'Stairway to Heaven (Live)'
+        Track.objects.bulk_create([track])
+
+        entry = TrackCatalogEntry.objects.get(name='Stairway to Heaven (Live)')
+        assert (entry.id, entry.album_title) == (track.pk, 'Led Zeppelin IV')
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='the migration triggers are specific to SQLite')
+    def test_chinook_tracks_without_composer_album_or_genre(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'TrackCatalogEntry'")
+            catalog_table = cursor.fetchone()[0]
+
+        chinook = sqlite3.connect(':memory:')
+        for statement in [*CHINOOK_TABLES, catalog_table]:
+            chinook.execute(statement)
+        chinook.execute("INSERT INTO MediaType VALUES (1, 'MPEG audio file')")
+        chinook.execute("INSERT INTO Track VALUES (1, 'Stored', NULL, 1, NULL, NULL, 240000, 8000000, 0.99)")
+        # the backfill and the triggers of the migration
+        for statement in catalog_migration.CREATE_TRIGGERS:
+            chinook.execute(statement)
+        chinook.execute("INSERT INTO Track VALUES (2, 'Written', NULL, 1, NULL, NULL, 180000, 6000000, 0.99)")
+
+        assert chinook.execute(
+            'SELECT TrackId, Name, Composer, AlbumId, AlbumTitle, GenreId, GenreName, MediaTypeName '
+            'FROM TrackCatalogEntry ORDER BY TrackId'
+        ).fetchall() == [
+            (1, 'Stored', None, None, None, None, None, 'MPEG audio file'),
+            (2, 'Written', None, None, None, None, None, 'MPEG audio file'),
+        ]
+
+    def test_endpoint_row_without_composer(self, catalog):
+        mannish_boy = catalog['tracks'][3]
+        # as the entry of a Chinook track without composer, album nor genre
+        TrackCatalogEntry.objects.filter(pk=mannish_boy.pk).update(
+            composer=None, album_id=None, album_title=None, genre_id=None, genre_name=None
+        )
+
+        response = self.client.get(reverse('api-track-catalog'), {'page_size': 3})
+
+        row = response.json()['results'][2]
+        assert (row['Id'], row['Composer'], row['Album'], row['Genre']) == (mannish_boy.pk, None, None, None)
+
+    def test_endpoint_pages(self, catalog, django_assert_num_queries):
+        names, cursor = [], None
+        while True:
+            with django_assert_num_queries(1):
+                params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+                response = self.client.get(reverse('api-track-catalog'), params)
+            assert response.status_code == status.HTTP_200_OK
+            names += [(row['Name'], row['Artist']) for row in response.json()['results']]
+            cursor = response.json()['next_cursor']
+            if cursor is None:
+                break
+
+        assert names == [
+            ('Black Dog', 'Led Zeppelin'), ('Black Dog', 'Muddy Waters'), ('Mannish Boy', 'Muddy Waters'),
+            ('Stairway to Heaven', 'Led Zeppelin'), ('When the Levee Breaks', 'Led Zeppelin'),
+        ]
+
+    def test_endpoint_row(self, catalog):
+        black_dog = catalog['tracks'][1]
+
+        response = self.client.get(reverse('api-track-catalog'), {'genre': catalog['rock'].pk, 'page_size': 1})
+
+        assert response.json()['results'] == [{
+            'Id': black_dog.pk, 'Name': 'Black Dog', 'Composer': black_dog.composer, 'Album': 'Led Zeppelin IV',
+            'Artist': 'Led Zeppelin', 'Genre': 'Rock', 'Media Type': 'MPEG audio file',
+            'Milliseconds': black_dog.milliseconds, 'Bytes': black_dog.bytes, 'Unit Price': 0.99,
+        }]
+        assert response.json()['next_cursor'] is not None
+
+    @pytest.mark.parametrize('parameter, key, expected', [
+        ('genre', 'blues', ['Black Dog', 'Mannish Boy', 'When the Levee Breaks']),
+        ('artist', 'zeppelin', ['Black Dog', 'Stairway to Heaven', 'When the Levee Breaks']),
+    ])
+    def test_endpoint_filters(self, catalog, parameter, key, expected):
+        response = self.client.get(reverse('api-track-catalog'), {parameter: catalog[key].pk})
+
+        assert [row['Name'] for row in response.json()['results']] == expected
+
+    def test_endpoint_no_results(self, catalog):
+        response = self.client.get(reverse('api-track-catalog'), {'media_type': 999999})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    @pytest.mark.parametrize('params', [
+        {'genre': 'rock'},
+        {'page_size': '0'},
+        {'page_size': '1001'},
+        {'cursor': 'not-a-cursor'},
+    ])
+    def test_endpoint_invalid_parameters(self, params):
+        response = self.client.get(reverse('api-track-catalog'), params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is specific to SQLite')
+    @pytest.mark.parametrize('params, index', [
+        ({}, 'catalog_entry_name_idx'),
+        ({'genre': 1}, 'catalog_entry_genre_idx'),
+        ({'artist': 1}, 'catalog_entry_artist_idx'),
+        ({'media_type': 1}, 'catalog_entry_media_type_idx'),
+    ])
+    def test_listing_reads_an_index_in_order(self, catalog, params, index):
+        cursor = self.client.get(reverse('api-track-catalog'), {'page_size': 1}).json()['next_cursor']
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('api-track-catalog'), {**params, 'cursor': cursor})
+
+        plan = query_plan(context.captured_queries[-1]['sql'])
+        assert any(f'USING INDEX {index}' in step for step in plan), plan
+        assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -0,0 +1,88 @@
+import pytest
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from apps.music.models import Artist, Genre, MediaType, ReferenceDataVersion
+from apps.music.reference import bump_reference_data_version, reference_data
+
+pytestmark = pytest.mark.django_db
+
+
+class TestReferenceData:
+
+    @pytest.fixture
+    def names(self, genre_factory, media_type_factory, artist_factory):
+        return {
+            'rock': genre_factory(name='Rock'),
+            'mpeg': media_type_factory(name='MPEG audio file'),
+            'zeppelin': artist_factory(name='Led Zeppelin'),
+        }
+
+    def test_names_by_id(self, names):
+        reference = reference_data()
+
+        assert reference.genres[names['rock'].pk] == 'Rock'
+        assert reference.media_types[names['mpeg'].pk] == 'MPEG audio file'
+        assert reference.artists[names['zeppelin'].pk] == 'Led Zeppelin'
+        assert len(reference.genres) == Genre.objects.count()
+        assert len(reference.artists) == Artist.objects.count()
+
+    def test_loaded_once(self, names, django_assert_num_queries):
+        # the version stamp, then each table
+        with django_assert_num_queries(4):
+            reference = reference_data()
+        with django_assert_num_queries(1):
+            assert reference_data() is reference
+
+    def test_read_only(self, names):
+        with pytest.raises(TypeError):
+            reference_data().genres[names['rock'].pk] = 'Jazz'
+
+    def test_reloaded_after_writes(self, names, media_type_factory):
+        before = reference_data()
+        names['rock'].name = 'Hard Rock'
+        names['rock'].save()
+        names['zeppelin'].delete()
+        aac = media_type_factory(name='AAC audio file')
+
+        reference = reference_data()
+        assert reference.version > before.version
+        assert reference.genres[names['rock'].pk] == 'Hard Rock'
+        assert names['zeppelin'].pk not in reference.artists
+        assert reference.media_types[aac.pk] == 'AAC audio file'
+        assert before.genres[names['rock'].pk] == 'Rock'
+
+    def test_reloaded_after_a_rolled_back_write(self, names):
+        reference_data()
+        with pytest.raises(RuntimeError), transaction.atomic():
+            names['rock'].name = 'Hard Rock'
+            names['rock'].save()
+            assert reference_data().genres[names['rock'].pk] == 'Hard Rock'
+            raise RuntimeError
+
+        assert reference_data().genres[names['rock'].pk] == 'Rock'
+
+    def test_writes_without_signals_need_a_bump(self, names):
+        reference_data()
+        MediaType.objects.filter(pk=names['mpeg'].pk).update(name='MPEG-4 video file')
+        assert reference_data().media_types[names['mpeg'].pk] == 'MPEG audio file'
+
+        bump_reference_data_version()
+        assert reference_data().media_types[names['mpeg'].pk] == 'MPEG-4 video file'
+
+    def test_reloaded_when_another_process_moves_the_version(self, names, django_assert_num_queries):
+        reference_data()
+        ReferenceDataVersion.objects.update(version=F('version') + 1)
+
+        with django_assert_num_queries(4):
+            reference_data()
+
+    def test_version_is_not_kept_in_the_cache(self, names, django_assert_num_queries):
+        reference = reference_data()
+        for cache in caches.all():
+            cache.clear()
+
+        with django_assert_num_queries(1):
+            assert reference_data() is reference
@@ -0,0 +1,139 @@
+import pytest
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.music.models import Album, Track
+from apps.music.search import match_expression, search_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+def indexed_rows() -> list[tuple]:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT kind, rowid / 3, name, composer, album, artist FROM CatalogSearch ORDER BY rowid')
+        return cursor.fetchall()
+
+
+class TestCatalogSearch:
+    client = APIClient()
+
+    @pytest.fixture
+    def catalog(self, artist_factory, album_factory, track_factory):
+        zeppelin = artist_factory(name='Led Zeppelin')
+        beyonce = artist_factory(name='Beyoncé')
+        iv = album_factory(title='Led Zeppelin IV', artist=zeppelin)
+        lemonade = album_factory(title='Lemonade', artist=beyonce)
+        return {
+            'zeppelin': zeppelin,
+            'beyonce': beyonce,
+            'iv': iv,
+            'lemonade': lemonade,
+            'stairway': track_factory(name='Stairway to Heaven', composer='Jimmy Page, Robert Plant', album=iv),
+            'levee': track_factory(name='When the Levee Breaks', composer='Memphis Minnie', album=iv),
+            'formation': track_factory(name='Formation', composer='Beyoncé Knowles', album=lemonade),
+        }
+
+    def test_writes_are_indexed(self, catalog):
+        assert (
+            'track', catalog['stairway'].pk, 'Stairway to Heaven', 'Jimmy Page, Robert Plant', 'Led Zeppelin IV',
+            'Led Zeppelin'
+        ) in indexed_rows()
+        assert ('album', catalog['iv'].pk, 'Led Zeppelin IV', None, None, 'Led Zeppelin') in indexed_rows()
+        assert ('artist', catalog['beyonce'].pk, 'Beyoncé', None, None, None) in indexed_rows()
+
+    def test_renames_are_propagated(self, catalog):
+        catalog['zeppelin'].name = 'The Yardbirds'
+        catalog['zeppelin'].save()
+        catalog['lemonade'].title = 'Renaissance'
+        catalog['lemonade'].save()
+
+        assert {row.id for row in search_catalog('yardbirds', ('track',))} == {
+            catalog['stairway'].pk, catalog['levee'].pk
+        }
+        assert [(row.kind, row.id) for row in search_catalog('yardbirds', ('album', 'artist'))] == [
+            ('artist', catalog['zeppelin'].pk), ('album', catalog['iv'].pk)
+        ]
+        assert search_catalog('lemonade') == []
+        assert [row.album for row in search_catalog('formation')] == ['Renaissance']
+
+    def test_bulk_writes_and_deletes_are_indexed(self, catalog):
+        Track.objects.filter(pk=catalog['levee'].pk).update(name='Black Dog')
+        catalog['stairway'].delete()
+
+        assert [row.id for row in search_catalog('black dog')] == [catalog['levee'].pk]
+        assert search_catalog('stairway') == []
+        Album.objects.bulk_create([Album(title='Physical Graffiti', artist=catalog['zeppelin'])])
+        assert [row.kind for row in search_catalog('graffiti')] == ['album']
+
+    def test_prefixes_case_and_accents(self, catalog):
+        assert [row.id for row in search_catalog('STAIR hea', ('track',))] == [catalog['stairway'].pk]
+        assert {row.kind for row in search_catalog('beyonce')} == {'artist', 'album', 'track'}
+        assert search_catalog('stairs') == []
+
+    def test_name_matches_rank_first(self, catalog, track_factory):
+        track_factory(name='Dancing Days', composer='Formation Dance Band', album=catalog['iv'])
+
+        assert [row.name for row in search_catalog('formation', ('track',))] == ['Formation', 'Dancing Days']
+
+    @pytest.mark.parametrize('query, expression', [
+        ('led zep', '"led"* "zep"*'),
+        ('AC/DC', '"AC"* "DC"*'),
+        ('a NOT name:x', '"a" "NOT"* "name"* "x"'),
+        ('"*()', None),
+    ])
+    def test_match_expression(self, query, expression):
+        assert match_expression(query) == expression
+
+    def test_endpoint(self, catalog):
+        response = self.client.get(reverse('api-catalog-search'), {'q': 'zeppelin', 'type': 'album,artist'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'results': [
+                {
+                    'Type': 'artist', 'Id': catalog['zeppelin'].pk, 'Name': 'Led Zeppelin', 'Composer': None,
+                    'Album': None, 'Artist': None,
+                },
+                {
+                    'Type': 'album', 'Id': catalog['iv'].pk, 'Name': 'Led Zeppelin IV', 'Composer': None,
+                    'Album': None, 'Artist': 'Led Zeppelin',
+                },
+            ],
+            'next_page': None,
+        }
+
+    def test_endpoint_pagination(self, catalog):
+        pages = []
+        page = 1
+        while page:
+            response = self.client.get(reverse('api-catalog-search'), {'q': 'led', 'page': page, 'page_size': 2})
+            assert response.status_code == status.HTTP_200_OK
+            pages.append([(row['Type'], row['Id']) for row in response.json()['results']])
+            page = response.json()['next_page']
+
+        assert [len(results) for results in pages] == [2, 2]
+        assert sorted(row for results in pages for row in results) == sorted([
+            ('album', catalog['iv'].pk), ('artist', catalog['zeppelin'].pk),
+            ('track', catalog['stairway'].pk), ('track', catalog['levee'].pk),
+        ])
+
+    def test_endpoint_no_results(self, catalog):
+        response = self.client.get(reverse('api-catalog-search'), {'q': 'metallica'})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'q': '?!'},
+        {'q': 'led', 'type': 'playlist'},
+        {'q': 'led', 'page': '0'},
+        {'q': 'led', 'page_size': '101'},
+        {'q': 'led', 'page_size': 'x'},
+    ])
+    def test_endpoint_invalid_parameters(self, params):
+        response = self.client.get(reverse('api-catalog-search'), params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
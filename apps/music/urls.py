@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .api.views import CatalogSearchAPIView, TrackCatalogAPIView
+
+urlpatterns = [
+    path('api/v1/catalog/search', CatalogSearchAPIView.as_view(), name='api-catalog-search'),
+    path('api/v1/catalog/tracks', TrackCatalogAPIView.as_view(), name='api-track-catalog'),
+]
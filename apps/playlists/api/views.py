@@ -0,0 +1,178 @@
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.music.models import Track
+from apps.playlists.membership import (
+    PlaylistRef,
+    add_tracks,
+    playlist_track_ids,
+    remove_tracks,
+    replace_tracks,
+    track_playlists
+)
+from apps.playlists.models import Playlist
+
+
+class PlaylistTracksAPIView(APIView):
+    """
+    API endpoint to read and change the tracks of a playlist, many at a time.
+
+    Body (POST, PUT and DELETE):
+        A JSON object with 'track_ids', a list of at most `max_batch_size` track ids.
+
+    POST adds the tracks to the playlist (those already in it are skipped), DELETE removes them, and PUT makes them the
+    tracks of the playlist, writing only the difference. Each request is one transaction, with set-based checks and
+    writes (see `apps.playlists.membership`): the change is refused as a whole if any track doesn't exist.
+
+    Returns:
+        - 404 Not found: If the playlist doesn't exist.
+        - 400 Bad request: If the body is invalid, or with 'unknown_track_ids' if any track doesn't exist.
+        - 200 OK: GET: JSON object with 'Id', 'Name' and 'Track Ids' (ordered) of the playlist. Otherwise: JSON object
+        with 'added' and 'removed' (number of tracks) and 'track_count', the number of tracks of the playlist.
+    """
+    http_method_names = ['get', 'post', 'put', 'delete']
+    max_batch_size = 10000
+
+    def get(self, request: Request, playlist_id: int) -> Response:
+        playlist = Playlist.objects.filter(pk=playlist_id).first()
+        if playlist is None:
+            return self.not_found(playlist_id)
+
+        return Response(
+            {'Id': playlist.id, 'Name': playlist.name, 'Track Ids': sorted(playlist_track_ids(playlist))},
+            status=status.HTTP_200_OK
+        )
+
+    def post(self, request: Request, playlist_id: int) -> Response:
+        return self.change_tracks(request, playlist_id, add_tracks)
+
+    def put(self, request: Request, playlist_id: int) -> Response:
+        return self.change_tracks(request, playlist_id, replace_tracks)
+
+    def delete(self, request: Request, playlist_id: int) -> Response:
+        return self.change_tracks(request, playlist_id, remove_tracks)
+
+    def change_tracks(self, request: Request, playlist_id: int, change) -> Response:
+        track_ids = request.data.get('track_ids') if isinstance(request.data, dict) else None
+        if (
+                not isinstance(track_ids, list) or len(track_ids) > self.max_batch_size
+                or not all(isinstance(track_id, int) and not isinstance(track_id, bool) for track_id in track_ids)
+        ):
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Invalid body.',
+                    'accepted values for "track_ids"': f'list of at most {self.max_batch_size} track ids (integers).',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        playlist = Playlist.objects.filter(pk=playlist_id).first()
+        if playlist is None:
+            return self.not_found(playlist_id)
+
+        result = change(playlist, track_ids)
+        if result.unknown_track_ids:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Unknown tracks, the playlist was not changed.',
+                    'unknown_track_ids': result.unknown_track_ids,
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                'added': result.added,
+                'removed': result.removed,
+                'track_count': playlist.tracks.count(),
+            },
+            status=status.HTTP_200_OK
+        )
+
+    @staticmethod
+    def not_found(playlist_id: int) -> Response:
+        return Response(
+            {'status': 'error', 'message': f'Playlist {playlist_id} not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+
+def playlist_row(playlist: PlaylistRef) -> dict:
+    return {'Id': playlist.id, 'Name': playlist.name}
+
+
+class TrackPlaylistsAPIView(APIView):
+    """
+    API endpoint to retrieve the playlists containing a track, read from the index on (track, playlist) of
+    `PlaylistTrack`.
+
+    Returns:
+        - 404 Not found: If the track doesn't exist.
+        - 200 OK: JSON object with the 'Id' of the track and 'Playlists', a list of JSON objects containing 'Id' and
+        'Name', ordered by name.
+        - 204 No Content: If the track is in no playlist.
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request, track_id: int) -> Response:
+        playlists = track_playlists([track_id]).get(track_id)
+
+        if playlists:
+            return Response(
+                {'Id': track_id, 'Playlists': [playlist_row(playlist) for playlist in playlists]},
+                status=status.HTTP_200_OK
+            )
+
+        if not Track.objects.filter(pk=track_id).exists():
+            return Response(
+                {'status': 'error', 'message': f'Track {track_id} not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TrackPlaylistsBatchAPIView(APIView):
+    """
+    API endpoint to retrieve the playlists of many tracks at once, in one query, e.g. for a page of the catalog.
+
+    Query Parameters:
+        - track_ids (str): Comma separated list of at most `max_batch_size` track ids.
+
+    Returns:
+        - 400 Bad request: If "track_ids" is missing or invalid.
+        - 200 OK: JSON object with 'results', a list of JSON objects containing the 'Id' of a track and its
+        'Playlists' (as in `TrackPlaylistsAPIView`), in the order of "track_ids", for the tracks in a playlist.
+        - 204 No Content: If none of the tracks is in a playlist.
+    """
+    http_method_names = ['get']
+    max_batch_size = 1000
+
+    def get(self, request: Request) -> Response:
+        track_ids = (request.GET.get('track_ids') or '').split(',')
+
+        if not all(track_id.isdigit() for track_id in track_ids) or len(track_ids) > self.max_batch_size:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Invalid "track_ids" chosen.',
+                    'accepted values for "track_ids"': f'comma separated list of at most {self.max_batch_size} ids.',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        track_ids = list(dict.fromkeys(int(track_id) for track_id in track_ids))
+        playlists = track_playlists(track_ids)
+
+        if playlists:
+            results = [
+                {'Id': track_id, 'Playlists': [playlist_row(playlist) for playlist in playlists[track_id]]}
+                for track_id in track_ids if track_id in playlists
+            ]
+            return Response({'results': results}, status=status.HTTP_200_OK)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
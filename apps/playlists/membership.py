@@ -0,0 +1,131 @@
+"""
+Bulk changes to the tracks of a playlist.
+
+`PlaylistTrack.save()` validates one row at a time (`full_clean`: one query for the playlist, one for the track and one
+for the primary key), so adding thousands of tracks one by one runs thousands of queries and inserts. The functions
+here change the tracks of a playlist as a set, in one transaction:
+    - the track ids are checked against `Track` with one `IN` query per chunk, and the whole change is refused if any
+    is unknown;
+    - the tracks already in the playlist are read with one query (a range of the primary key);
+    - the new rows are written with `bulk_create(ignore_conflicts=True)`, so that rows added concurrently don't fail
+    the batch, and the removed ones with one `DELETE` per chunk;
+    - replacing the tracks only writes the difference between the current and the requested ones.
+
+The other way around, `track_playlists` reads the playlists of many tracks at once from the index on (track, playlist).
+"""
+import json
+from collections import defaultdict
+from typing import Iterable, NamedTuple
+
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+
+from apps.music.models import Track
+from apps.playlists.models import Playlist, PlaylistTrack
+
+CHUNK_SIZE = 500
+
+
+class MembershipResult(NamedTuple):
+    added: int
+    removed: int
+    # ids of the requested tracks that don't exist, nothing is written when there is any
+    unknown_track_ids: list[int]
+
+
+class PlaylistRef(NamedTuple):
+    id: int
+    name: str
+
+
+def _chunks(ids: list[int]) -> Iterable[list[int]]:
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def unknown_track_ids(track_ids: Iterable[int]) -> list[int]:
+    """
+    Returns the ids of `track_ids` without a track, in their order.
+    """
+    track_ids = list(dict.fromkeys(track_ids))
+    known = set()
+    for chunk in _chunks(track_ids):
+        known.update(Track.objects.filter(id__in=chunk).values_list('id', flat=True))
+    return [track_id for track_id in track_ids if track_id not in known]
+
+
+def playlist_track_ids(playlist: Playlist) -> set[int]:
+    return set(PlaylistTrack.objects.filter(playlist=playlist).values_list('track_id', flat=True))
+
+
+def _add(playlist: Playlist, track_ids: list[int]) -> int:
+    PlaylistTrack.objects.bulk_create(
+        (PlaylistTrack(playlist=playlist, track_id=track_id) for track_id in track_ids),
+        batch_size=CHUNK_SIZE, ignore_conflicts=True
+    )
+    return len(track_ids)
+
+
+def _remove(playlist: Playlist, track_ids: list[int]) -> int:
+    removed = 0
+    for chunk in _chunks(track_ids):
+        removed += PlaylistTrack.objects.filter(playlist=playlist, track_id__in=chunk).delete()[0]
+    return removed
+
+
+def add_tracks(playlist: Playlist, track_ids: Iterable[int]) -> MembershipResult:
+    """
+    Adds the tracks of `track_ids` to the playlist, skipping those already in it.
+    """
+    track_ids = list(dict.fromkeys(track_ids))
+    with transaction.atomic():
+        unknown = unknown_track_ids(track_ids)
+        if unknown:
+            return MembershipResult(0, 0, unknown)
+
+        current = playlist_track_ids(playlist)
+        return MembershipResult(_add(playlist, [track_id for track_id in track_ids if track_id not in current]), 0, [])
+
+
+def remove_tracks(playlist: Playlist, track_ids: Iterable[int]) -> MembershipResult:
+    """
+    Removes the tracks of `track_ids` from the playlist. Ids of tracks not in the playlist are ignored, unknown
+    tracks included.
+    """
+    with transaction.atomic():
+        return MembershipResult(0, _remove(playlist, list(dict.fromkeys(track_ids))), [])
+
+
+def replace_tracks(playlist: Playlist, track_ids: Iterable[int]) -> MembershipResult:
+    """
+    Makes the tracks of `track_ids` the tracks of the playlist, adding and removing only the difference.
+    """
+    track_ids = list(dict.fromkeys(track_ids))
+    with transaction.atomic():
+        unknown = unknown_track_ids(track_ids)
+        if unknown:
+            return MembershipResult(0, 0, unknown)
+
+        current = playlist_track_ids(playlist)
+        requested = set(track_ids)
+        added = _add(playlist, [track_id for track_id in track_ids if track_id not in current])
+        removed = _remove(playlist, sorted(current - requested))
+        return MembershipResult(added, removed, [])
+
+
+def track_playlists(track_ids: Iterable[int]) -> dict[int, list[PlaylistRef]]:
+    """
+    Returns the playlists of each track of `track_ids` (by name), in one query whatever their number. Tracks in no
+    playlist are left out.
+    """
+    # The ids are passed as one JSON array parameter, so that their number is not bound by the SQLite variable limit.
+    track_ids = RawSQL('SELECT value FROM json_each(%s)', [json.dumps(list(track_ids))])
+    rows = (
+        PlaylistTrack.objects.filter(track_id__in=track_ids)
+        .order_by('track_id', 'playlist__name')
+        .values_list('track_id', 'playlist_id', 'playlist__name')
+    )
+    playlists = defaultdict(list)
+    for track_id, playlist_id, name in rows:
+        playlists[track_id].append(PlaylistRef(playlist_id, name))
+    return dict(playlists)
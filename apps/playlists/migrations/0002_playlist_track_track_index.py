@@ -0,0 +1,27 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# On SQLite, altering the track foreign key rebuilds PlaylistTrack, which also drops the index of the Chinook data
+# (IFK_PlaylistTrackTrackId, on TrackId alone): the index on (TrackId, PlaylistId) replaces both.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0003_track_catalog_entry'),
+        ('playlists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playlisttrack',
+            name='track',
+            field=models.ForeignKey(db_column='TrackId', db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='playlists', to='music.track', verbose_name='track'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['track', 'playlist'], name='playlist_track_track_idx'),
+        ),
+    ]
@@ -48,10 +48,17 @@ class PlaylistTrack(models.Model):
         on_delete=models.PROTECT,
         verbose_name='track',
         db_column='TrackId',
+        # indexed with the playlist below
+        db_index=False,
     )
 
     class Meta:
         db_table = 'PlaylistTrack'
+        indexes = [
+            # Reverse lookups (the playlists of a track, and the PROTECT check when deleting tracks) read this index
+            # alone, the primary key starting with the playlist.
+            models.Index(fields=['track', 'playlist'], name='playlist_track_track_idx'),
+        ]
 
     def __str__(self):
         return f'{self.playlist} - {self.track}'
@@ -0,0 +1,114 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.playlists.membership import add_tracks, playlist_track_ids, remove_tracks, replace_tracks
+from apps.playlists.models import PlaylistTrack
+
+pytestmark = pytest.mark.django_db
+
+
+class TestPlaylistMembership:
+    client = APIClient()
+
+    @pytest.fixture
+    def tracks(self, track_factory):
+        return track_factory.create_batch(6)
+
+    @pytest.fixture
+    def playlist(self, playlist_factory, playlist_track_factory, tracks):
+        playlist = playlist_factory(name='Classics')
+        for track in tracks[:3]:
+            playlist_track_factory(playlist=playlist, track=track)
+        return playlist
+
+    def test_add_skips_tracks_already_in_the_playlist(self, playlist, tracks, django_assert_max_num_queries):
+        ids = [track.pk for track in tracks]
+
+        # tracks check, current tracks and insert, within a transaction
+        with django_assert_max_num_queries(5):
+            result = add_tracks(playlist, [ids[4], ids[0], ids[3], ids[4]])
+
+        assert (result.added, result.removed, result.unknown_track_ids) == (2, 0, [])
+        assert playlist_track_ids(playlist) == {ids[0], ids[1], ids[2], ids[3], ids[4]}
+
+    def test_unknown_tracks_change_nothing(self, playlist, tracks):
+        ids = [track.pk for track in tracks]
+
+        assert add_tracks(playlist, [ids[5], 999999, 999998]).unknown_track_ids == [999999, 999998]
+        assert replace_tracks(playlist, [ids[5], 999999]).unknown_track_ids == [999999]
+        assert playlist_track_ids(playlist) == {ids[0], ids[1], ids[2]}
+
+    def test_remove(self, playlist, tracks):
+        ids = [track.pk for track in tracks]
+
+        result = remove_tracks(playlist, [ids[0], ids[4], 999999])
+
+        assert (result.added, result.removed) == (0, 1)
+        assert playlist_track_ids(playlist) == {ids[1], ids[2]}
+
+    def test_replace_writes_the_difference(self, playlist, playlist_factory, tracks):
+        ids = [track.pk for track in tracks]
+        other = playlist_factory()
+        add_tracks(other, ids)
+
+        result = replace_tracks(playlist, [ids[1], ids[2], ids[3]])
+
+        assert (result.added, result.removed) == (1, 1)
+        assert playlist_track_ids(playlist) == {ids[1], ids[2], ids[3]}
+        assert playlist_track_ids(other) == set(ids)
+
+    def test_many_tracks_are_chunked(self, playlist, track_factory, monkeypatch):
+        monkeypatch.setattr('apps.playlists.membership.CHUNK_SIZE', 4)
+        ids = [track.pk for track in track_factory.create_batch(10)]
+
+        assert add_tracks(playlist, ids).added == 10
+        assert remove_tracks(playlist, ids).removed == 10
+        assert PlaylistTrack.objects.filter(playlist=playlist).count() == 3
+
+    def test_endpoint(self, playlist, tracks):
+        url = reverse('api-playlist-tracks', args=[playlist.pk])
+        ids = [track.pk for track in tracks]
+
+        response = self.client.post(url, {'track_ids': ids[2:5]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'added': 2, 'removed': 0, 'track_count': 5}
+
+        response = self.client.delete(url, {'track_ids': [ids[0]]}, format='json')
+        assert response.json() == {'added': 0, 'removed': 1, 'track_count': 4}
+
+        response = self.client.put(url, {'track_ids': [ids[5], ids[1]]}, format='json')
+        assert response.json() == {'added': 1, 'removed': 3, 'track_count': 2}
+
+        response = self.client.get(url)
+        assert response.json() == {'Id': playlist.pk, 'Name': 'Classics', 'Track Ids': sorted([ids[1], ids[5]])}
+
+    def test_endpoint_unknown_tracks(self, playlist, tracks):
+        url = reverse('api-playlist-tracks', args=[playlist.pk])
+
+        response = self.client.put(url, {'track_ids': [tracks[0].pk, 999999]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['unknown_track_ids'] == [999999]
+        assert len(playlist_track_ids(playlist)) == 3
+
+    def test_endpoint_unknown_playlist(self):
+        url = reverse('api-playlist-tracks', args=[999999])
+
+        assert self.client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert self.client.post(url, {'track_ids': []}, format='json').status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('body', [
+        [1, 2],
+        {},
+        {'track_ids': 1},
+        {'track_ids': ['1']},
+        {'track_ids': [True]},
+        {'track_ids': list(range(10001))},
+    ])
+    def test_endpoint_invalid_body(self, playlist, body):
+        response = self.client.post(reverse('api-playlist-tracks', args=[playlist.pk]), body, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
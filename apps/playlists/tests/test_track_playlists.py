@@ -0,0 +1,114 @@
+import pytest
+
+from django.db import connection
+from django.db.models import ProtectedError
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.playlists.membership import PlaylistRef, add_tracks, track_playlists
+
+pytestmark = pytest.mark.django_db
+
+
+def query_plan(sql: str, params=()) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class TestTrackPlaylists:
+    client = APIClient()
+
+    @pytest.fixture
+    def tracks(self, track_factory, playlist_factory):
+        tracks = track_factory.create_batch(4)
+        rock, grunge = playlist_factory(name='Rock'), playlist_factory(name='Grunge')
+        add_tracks(rock, [track.pk for track in tracks[:2]])
+        add_tracks(grunge, [tracks[1].pk, tracks[2].pk])
+        return {'tracks': tracks, 'rock': rock, 'grunge': grunge}
+
+    def test_many_tracks_in_one_query(self, tracks, django_assert_num_queries):
+        first, second, third, fourth = tracks['tracks']
+        rock, grunge = PlaylistRef(tracks['rock'].pk, 'Rock'), PlaylistRef(tracks['grunge'].pk, 'Grunge')
+
+        with django_assert_num_queries(1):
+            playlists = track_playlists([fourth.pk, third.pk, second.pk, first.pk, 999999])
+
+        assert playlists == {first.pk: [rock], second.pk: [grunge, rock], third.pk: [grunge]}
+
+    def test_more_ids_than_sqlite_variables(self, tracks, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            playlists = track_playlists(range(1, 40000))
+
+        assert set(playlists) == {track.pk for track in tracks['tracks'][:3]}
+
+    def test_tracks_in_a_playlist_are_protected(self, tracks):
+        with pytest.raises(ProtectedError):
+            tracks['tracks'][0].delete()
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is specific to SQLite')
+    def test_reverse_lookups_read_the_track_index_alone(self, tracks, track_factory):
+        with CaptureQueriesContext(connection) as context:
+            track_playlists([tracks['tracks'][0].pk])
+            # the PROTECT check of a track deletion
+            track_factory().delete()
+
+        playlists_plan = query_plan(context.captured_queries[0]['sql'])
+        assert any('COVERING INDEX playlist_track_track_idx' in step for step in playlists_plan), playlists_plan
+        lookups = [query['sql'] for query in context.captured_queries if 'FROM "PlaylistTrack"' in query['sql']]
+        protect_plan = query_plan(lookups[1])
+        assert any('INDEX playlist_track_track_idx' in step for step in protect_plan), protect_plan
+
+    def test_endpoint(self, tracks):
+        track = tracks['tracks'][1]
+
+        response = self.client.get(reverse('api-track-playlists', args=[track.pk]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'Id': track.pk,
+            'Playlists': [
+                {'Id': tracks['grunge'].pk, 'Name': 'Grunge'}, {'Id': tracks['rock'].pk, 'Name': 'Rock'}
+            ],
+        }
+
+    def test_endpoint_track_in_no_playlist(self, tracks):
+        response = self.client.get(reverse('api-track-playlists', args=[tracks['tracks'][3].pk]))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    def test_endpoint_unknown_track(self):
+        response = self.client.get(reverse('api-track-playlists', args=[999999]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_batch_endpoint(self, tracks, django_assert_num_queries):
+        first, second, third, fourth = tracks['tracks']
+
+        with django_assert_num_queries(1):
+            response = self.client.get(
+                reverse('api-track-playlists-batch'), {'track_ids': f'{third.pk},{fourth.pk},{first.pk},{third.pk}'}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'results': [
+                {'Id': third.pk, 'Playlists': [{'Id': tracks['grunge'].pk, 'Name': 'Grunge'}]},
+                {'Id': first.pk, 'Playlists': [{'Id': tracks['rock'].pk, 'Name': 'Rock'}]},
+            ],
+        }
+
+    def test_batch_endpoint_no_playlists(self, tracks):
+        response = self.client.get(reverse('api-track-playlists-batch'), {'track_ids': tracks['tracks'][3].pk})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    @pytest.mark.parametrize('track_ids', [None, '', '1,x', '1,,2', ','.join(['1'] * 1001)])
+    def test_batch_endpoint_invalid_track_ids(self, track_ids):
+        params = {} if track_ids is None else {'track_ids': track_ids}
+
+        response = self.client.get(reverse('api-track-playlists-batch'), params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
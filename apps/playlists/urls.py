@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .api.views import PlaylistTracksAPIView, TrackPlaylistsAPIView, TrackPlaylistsBatchAPIView
+
+urlpatterns = [
+    path('api/v1/playlists/<int:playlist_id>/tracks', PlaylistTracksAPIView.as_view(), name='api-playlist-tracks'),
+    path('api/v1/tracks/playlists', TrackPlaylistsBatchAPIView.as_view(), name='api-track-playlists-batch'),
+    path('api/v1/tracks/<int:track_id>/playlists', TrackPlaylistsAPIView.as_view(), name='api-track-playlists'),
+]
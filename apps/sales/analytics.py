@@ -0,0 +1,226 @@
+"""
+In-memory analytics engine over the invoice facts, enabled with `SALES_ANALYTICS_ENGINE = 'numpy'`.
+
+The invoices are held in columnar NumPy arrays (id, day, total in cents, customer and sales rep), and rankings are
+computed with vectorized group-by and sort instead of SQL. Requires NumPy, see `requirements/analytics.txt`.
+
+The arrays follow the database this way:
+    - the current snapshot of `apps.sales.snapshot`, if any, is memory mapped and shared with the other processes, and
+    only the invoices written after it are loaded by the process;
+    - new invoices are appended on the next use, by reading the ids greater than the last one loaded (SQLite commits
+    one writer at a time, so ids become visible in increasing order);
+    - invoice updates and deletes move a counter stored in the database (`InvoiceRewriteCounter`), in their
+    transaction, and recorded in each snapshot. When it changed, the arrays are reloaded, from the database alone if the
+    snapshot predates the change.
+"""
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F
+
+from apps.employees.models import Employee
+from apps.sales.models import Invoice, InvoiceRewriteCounter
+from apps.sales.ranking import PERIOD_COLUMNS, LeaderboardRow
+from apps.sales.snapshot import (
+    INVOICE_DTYPES,
+    NO_ID,
+    InvoiceColumns,
+    current_version,
+    empty_columns,
+    invoice_columns,
+    np,
+    open_snapshot,
+    require_numpy
+)
+
+YEAR_LOOKUPS = {
+    'year': lambda years, value: years == value,
+    'year__in': lambda years, value: np.isin(years, list(value)),
+    'year__gte': lambda years, value: years >= value,
+    'year__lte': lambda years, value: years <= value,
+}
+
+
+def invoice_rewrites() -> int:
+    """
+    Returns the number of invoice updates and deletes, the same in every process.
+    """
+    counter = InvoiceRewriteCounter.objects.filter(pk=InvoiceRewriteCounter.SINGLETON_ID)
+    return counter.values_list('count', flat=True).first() or 0
+
+
+def bump_invoice_rewrites() -> None:
+    """
+    Tells the engines of every process that invoices were updated or deleted. The counter is written in the current
+    transaction, so it moves when the change commits, and not at all if it is rolled back.
+    """
+    counter = InvoiceRewriteCounter.objects.filter(pk=InvoiceRewriteCounter.SINGLETON_ID)
+    if not counter.update(count=F('count') + 1):
+        InvoiceRewriteCounter.objects.create(pk=InvoiceRewriteCounter.SINGLETON_ID, count=1)
+
+
+class InvoiceFacts:
+    """
+    Columnar copy of the invoices, in two parts: `snapshot_columns`, memory mapped from the current snapshot (empty
+    without one), and `columns`, the invoices loaded by this process. Both are replaced as a whole on refresh, so a
+    ranking always reads a consistent state while other threads refresh.
+    """
+
+    def __init__(self):
+        require_numpy()
+
+        self._lock = threading.Lock()
+        self._state = None
+        self.snapshot_version = None
+        self.snapshot_columns = self.columns = empty_columns(InvoiceColumns, INVOICE_DTYPES)
+
+    def __len__(self) -> int:
+        return len(self.snapshot_columns.ids) + len(self.columns.ids)
+
+    def refresh(self) -> tuple[InvoiceColumns, InvoiceColumns]:
+        """
+        Brings the columns up to date with the database and returns (`snapshot_columns`, `columns`).
+        """
+        with self._lock:
+            state = invoice_rewrites(), current_version()
+            if state != self._state:
+                self._state = state
+                self._open_snapshot(*state)
+
+            loaded_ids = self.columns.ids if len(self.columns.ids) else self.snapshot_columns.ids
+            new_invoices = Invoice.objects.filter(id__gt=int(loaded_ids[-1]) if len(loaded_ids) else 0)
+            rows = list(
+                new_invoices.order_by('id').values_list('id', 'invoice_date', 'total', 'customer_id', 'sales_rep_id')
+            )
+            if rows:
+                self.columns = InvoiceColumns(*(
+                    np.concatenate([column, new_column])
+                    for column, new_column in zip(self.columns, invoice_columns(rows))
+                ))
+
+            return self.snapshot_columns, self.columns
+
+    def _open_snapshot(self, rewrites: int, version: str | None) -> None:
+        self.snapshot_version = None
+        self.snapshot_columns = self.columns = empty_columns(InvoiceColumns, INVOICE_DTYPES)
+        if version is None:
+            return
+
+        try:
+            snapshot = open_snapshot(version)
+        except FileNotFoundError:
+            # replaced and removed since CURRENT was read, the next refresh opens the new one
+            self._state = None
+            return
+
+        # invoices updated or deleted after the snapshot was written: it can't be used
+        if snapshot.invoice_rewrites == rewrites:
+            self.snapshot_version = version
+            self.snapshot_columns = snapshot.invoices
+
+    def top_sales_reps_per_period(
+            self,
+            period: str = 'year',
+            top: int = 1,
+            years_filter: dict | None = None
+    ) -> list[LeaderboardRow]:
+        """
+        Same results as `apps.sales.ranking.top_sales_reps_per_period` (without the pagination): the `top` sales reps
+        of each period, ties at the last rank included, ordered by period, descending total sales and employee id.
+        """
+        for lookup in years_filter or {}:
+            if lookup not in YEAR_LOOKUPS:
+                raise ValueError(f'Unsupported years filter lookup: {lookup}')
+
+        # the selected rows of both parts (copies, the memory mapped columns are only read)
+        selected = []
+        for columns in self.refresh():
+            mask = columns.sales_rep_ids != NO_ID
+            for lookup, value in (years_filter or {}).items():
+                mask &= YEAR_LOOKUPS[lookup](columns.years, value)
+            selected.append(
+                (columns.years[mask], columns.months[mask], columns.sales_rep_ids[mask], columns.cents[mask])
+            )
+        years, months, sales_rep_ids, cents = (np.concatenate(parts).astype(np.int64) for parts in zip(*selected))
+
+        if PERIOD_COLUMNS[period] == 'month':
+            sub_periods = months
+        elif PERIOD_COLUMNS[period] == 'quarter':
+            sub_periods = (months - 1) // 3 + 1
+        else:
+            sub_periods = np.zeros(len(years), dtype=np.int64)
+        if not len(cents):
+            return []
+
+        # group by (period, sales rep) on a single int64 key: sort it, then sum the totals of each run of equal keys
+        rep_base = int(sales_rep_ids.max()) + 1
+        keys = (years * 100 + sub_periods) * rep_base + sales_rep_ids
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(sorted_keys)) + 1])
+        group_cents = np.add.reduceat(cents[order], starts)
+        group_periods, group_reps = np.divmod(sorted_keys[starts], rep_base)
+
+        # order by period, descending total and sales rep, then RANK() within each period
+        ranked = np.lexsort((group_reps, -group_cents, group_periods))
+        group_periods, group_reps, group_cents = group_periods[ranked], group_reps[ranked], group_cents[ranked]
+        positions = np.arange(len(group_periods))
+        new_period = np.concatenate([[True], group_periods[1:] != group_periods[:-1]])
+        new_total = new_period | np.concatenate([[True], group_cents[1:] != group_cents[:-1]])
+        period_starts = np.maximum.accumulate(np.where(new_period, positions, 0))
+        total_starts = np.maximum.accumulate(np.where(new_total, positions, 0))
+        ranks = total_starts - period_starts + 1
+
+        kept = ranks <= top
+        group_periods, group_reps, group_cents, ranks = (
+            group_periods[kept], group_reps[kept], group_cents[kept], ranks[kept]
+        )
+
+        names = {
+            employee_id: f'{first_name} {last_name}'
+            for employee_id, first_name, last_name in Employee.objects.filter(
+                pk__in=np.unique(group_reps).tolist()
+            ).values_list('id', 'first_name', 'last_name')
+        }
+        return [
+            LeaderboardRow(
+                period_key // 100, period_key % 100, employee_id, names[employee_id], Decimal(cents).scaleb(-2), rank
+            )
+            for period_key, employee_id, cents, rank in zip(
+                group_periods.tolist(), group_reps.tolist(), group_cents.tolist(), ranks.tolist()
+            )
+        ]
+
+    def top_sales_reps_per_year(
+            self,
+            years_filter: dict | None = None,
+            order_by: tuple[str, ...] = ('year',)
+    ) -> list[LeaderboardRow]:
+        """
+        Same results as `apps.sales.ranking.top_sales_reps_per_year`: the sales reps ranked first in each year, ordered
+        by `order_by` ('year', 'total_sales' or 'sales_rep', optionally prefixed with '-').
+        """
+        rows = self.top_sales_reps_per_period('year', 1, years_filter)
+        for field in reversed(order_by):
+            rows.sort(key=lambda row: getattr(row, field.lstrip('-')), reverse=field.startswith('-'))
+        return rows
+
+
+_facts = None
+_facts_lock = threading.Lock()
+
+
+def get_invoice_facts() -> InvoiceFacts:
+    """
+    Returns the process wide `InvoiceFacts`, loading it on first use.
+    """
+    global _facts
+    with _facts_lock:
+        if _facts is None:
+            _facts = InvoiceFacts()
+    return _facts
+
+
+def numpy_engine_enabled() -> bool:
+    return settings.SALES_ANALYTICS_ENGINE == 'numpy'
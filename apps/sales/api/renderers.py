@@ -0,0 +1,58 @@
+import csv
+import json
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class RowsRenderer(BaseRenderer, ABC):
+    """
+    Base of the renderers writing a response as rows, which can also be streamed one row at a time with
+    `render_rows`.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        return b''.join(self.render_rows(rows, fields))
+
+    @abstractmethod
+    def render_rows(self, rows: Iterable[dict], fields: list[str]) -> Iterator[bytes]:
+        ...
+
+
+class NDJSONRenderer(RowsRenderer):
+    """
+    Newline delimited JSON: one JSON object per row.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_rows(self, rows: Iterable[dict], fields: list[str]) -> Iterator[bytes]:
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False).encode(self.charset) + b'\n'
+
+
+class CSVRenderer(RowsRenderer):
+    """
+    CSV with a header line of the `fields`.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    class _Line:
+        # file-like object handing back what the csv writer writes, so that each row is encoded on its own
+        def write(self, value: str) -> str:
+            return value
+
+    def render_rows(self, rows: Iterable[dict], fields: list[str]) -> Iterator[bytes]:
+        writer = csv.writer(self._Line())
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([row.get(field) for field in fields]).encode(self.charset)
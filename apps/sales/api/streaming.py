@@ -0,0 +1,57 @@
+import re
+
+from typing import Iterable
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.core.replica import bind_read_database
+from apps.sales.api.renderers import CSVRenderer, NDJSONRenderer, RowsRenderer
+from apps.sales.export import gzip_chunks
+
+# Renderers of the report endpoints: the default ones, plus the row formats, which are streamed.
+REPORT_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer, CSVRenderer]
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def is_streaming_request(request: Request) -> bool:
+    """
+    Whether the response negotiated for the request ("format=ndjson"/"format=csv" or the Accept header) is streamed.
+    """
+    return isinstance(getattr(request, 'accepted_renderer', None), RowsRenderer)
+
+
+def streaming_response(
+        request: Request,
+        rows: Iterable[dict],
+        fields: list[str],
+        filename: str,
+        compress: bool = False
+) -> StreamingHttpResponse:
+    """
+    Streams `rows` in the format negotiated for the request. `rows` should be lazy (e.g. read from a queryset
+    `.iterator()`), so that rows are sent while the following ones are read and the memory used does not depend on the
+    number of rows. They are read from the database the reads of the view are routed to (see `apps.core.replica`).
+
+    With `compress`, the content is gzip compressed while it is sent (`Content-Encoding: gzip`) if the request accepts
+    it.
+    """
+    renderer = request.accepted_renderer
+    # read while the response is sent, after the view returned
+    content = renderer.render_rows(bind_read_database(rows), fields)
+    gzip = compress and ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')) is not None
+
+    response = StreamingHttpResponse(
+        gzip_chunks(content) if gzip else content,
+        content_type=f'{renderer.media_type}; charset={renderer.charset}'
+    )
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    if compress:
+        patch_vary_headers(response, ['Accept-Encoding'])
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{renderer.format}"'
+    return response
@@ -1,14 +1,100 @@
+import base64
+import binascii
+import json
+
+from datetime import date, datetime
 from decimal import Decimal
-from django.db.models import Sum, F, Window, Value
-from django.db.models.functions import ExtractYear, Rank, Concat
+from typing import Iterator
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.employees.models import Employee
+from apps.core.replica import analytics_reads
+from apps.sales.analytics import get_invoice_facts, numpy_engine_enabled
+from apps.sales.api.renderers import CSVRenderer, NDJSONRenderer
+from apps.sales.api.streaming import REPORT_RENDERER_CLASSES, is_streaming_request, streaming_response
+from apps.sales.cache import OVERALL_SCOPE, cache_stats, cached_response, year_scope
+from apps.sales.export import (
+    INVOICE_LINE_ROW_FIELDS,
+    INVOICE_RECORD_FIELDS,
+    iter_invoice_line_rows,
+    iter_invoice_records
+)
+from apps.sales.partitions import partitioned_top_sales_reps_per_year, partitions_are_current
+from apps.sales.ranking import (
+    PERIOD_COLUMNS,
+    LeaderboardRow,
+    iter_top_sales_reps_per_period,
+    top_sales_reps_between,
+    top_sales_reps_per_period,
+    top_sales_reps_per_year
+)
+from apps.sales.watermark import sales_read_state
+from apps.sales.write_queue import invoice_write_queue, write_invoices
+
+def request_sales_read_state(request) -> tuple[str, datetime]:
+    # read once per request, for both the ETag and Last-Modified
+    if not hasattr(request, '_sales_read_state'):
+        request._sales_read_state = sales_read_state()
+    return request._sales_read_state
+
+
+# Conditional GET on the sales data version (and the copy of the analytics replica the reports read): pollers
+# sending back the ETag (or Last-Modified) they got get a 304 Not Modified until the data changes, with a single query
+# (the version) being run.
+sales_data_condition = condition(
+    etag_func=lambda request, *args, **kwargs: f'"sales-{request_sales_read_state(request)[0]}"',
+    last_modified_func=lambda request, *args, **kwargs: request_sales_read_state(request)[1],
+)
+
+# The reporting views below read from the analytics replica when there is one (see `apps.core.replica`), and are
+# invalidated when it is refreshed.
+
+
+def parse_years_filter(request: Request) -> dict:
+    """
+    Returns the lookups restricting the results to the years requested with the "years" or "year_from"/"year_to"
+    query parameters, raising ValueError if they are invalid.
+    """
+    def to_year(value: str) -> int:
+        value = value.strip()
+        if not value.isdigit() or int(value) >= 10000 or int(value) == 0:
+            raise ValueError(value)
+        return int(value)
+
+    years = request.GET.get('years')
+    year_from = request.GET.get('year_from')
+    year_to = request.GET.get('year_to')
+
+    if years and (year_from or year_to):
+        raise ValueError('"years" cannot be combined with a year range')
 
+    years_filter = {}
+    if years:
+        years_filter['year__in'] = sorted({to_year(year) for year in years.split(',')})
+    if year_from:
+        years_filter['year__gte'] = to_year(year_from)
+    if year_to:
+        years_filter['year__lte'] = to_year(year_to)
 
+    return years_filter
+
+
+INVALID_YEARS_FILTER_MESSAGE = {
+    'status': 'error',
+    'message': (
+        'Invalid years filter. Use either "years" (comma separated years) or "year_from" and/or '
+        '"year_to". Years must contain only digits, and be less than 9999.'
+    ),
+}
+
+
+@method_decorator(sales_data_condition, name='get')
+@method_decorator(analytics_reads(), name='get')
 class TopSalesRepByYearAPIView(APIView):
     """
     API view that returns the top sales representative and their total sales for a given year.
@@ -20,6 +106,11 @@ class TopSalesRepByYearAPIView(APIView):
         - 400 Bad request: if the year does not contain only digits, or is greater than 9999.
         - 200 OK: JSON objects containing 'Sales Rep' (sales representative name) and 'Total Sales'.
         - 204 No Content: If no data is available to fulfill the request.
+        - 304 Not Modified: If the sales data did not change since the ETag/Last-Modified sent by the client.
+
+    Responses are cached until the sales data of the year changes (see `apps.sales.cache`). With the
+    SALES_ANALYTICS_ENGINE setting 'partitions', the ranking reads the partition of the year alone while the partitions
+    are current (see `apps.sales.partitions`).
     """
     http_method_names = ['get']
 
@@ -30,39 +121,97 @@ class TopSalesRepByYearAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        top_sales_reps = (
-            Employee.objects.filter(customers__invoices__invoice_date__year=int(year))
-            .annotate(total_sales=Sum('customers__invoices__total'))
-            .order_by('-total_sales')
-        )
+        return cached_response(year_scope(int(year)), request.path, lambda: self.top_sales_reps(int(year)))
 
-        if top_sales_reps:
-            top_sales_reps_list = []
-            # get top value
-            top_value = top_sales_reps[0].total_sales
-            # Filter reps who have the same top sales value
-            top_sales_reps = top_sales_reps.filter(total_sales=top_value)
+    def top_sales_reps(self, year: int) -> Response:
+        if partitions_are_current():
+            top_sales_reps = partitioned_top_sales_reps_per_year({'year': year}, order_by=('sales_rep',))
+        else:
+            top_sales_reps = list(top_sales_reps_per_year({'year': year}, order_by=('sales_rep',)))
 
+        if top_sales_reps:
             if len(top_sales_reps) > 1:
-                for rep in top_sales_reps:
+                top_sales_reps_list = []
+                for top_sales_rep in top_sales_reps:
                     top_sales_reps_list.append(
-                        {'Sales Rep': str(rep.first_name + ' ' + rep.last_name),
-                         'Total Sales': Decimal(rep.total_sales)}
+                        {'Sales Rep': top_sales_rep.sales_rep, 'Total Sales': Decimal(top_sales_rep.total_sales)}
                     )
 
                 return Response(top_sales_reps_list, status=status.HTTP_200_OK)
 
             else:
-                top_sales_reps = top_sales_reps.first()
+                top_sales_rep = top_sales_reps[0]
 
                 return Response(
-                    {'Sales Rep': str(top_sales_reps), 'Total Sales': Decimal(top_sales_reps.total_sales)},
+                    {'Sales Rep': top_sales_rep.sales_rep, 'Total Sales': Decimal(top_sales_rep.total_sales)},
                     status=status.HTTP_200_OK
                 )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@method_decorator(sales_data_condition, name='get')
+@method_decorator(analytics_reads(), name='get')
+class TopSalesRepBetweenDatesAPIView(APIView):
+    """
+    API view that returns the top sales representative and their total sales between two dates.
+
+    Query Parameters:
+        - from (str): First day of the range, as YYYY-MM-DD.
+        - to (str): Last day of the range, as YYYY-MM-DD. Invoices of that day are included.
+
+    The totals are read from the per sales representative running totals (`SalesRepDailyCumulative`), so any range is
+    answered in the same time. As in the single year endpoint, every sales representative tied at the top value is
+    returned.
+
+    Returns:
+        - 400 Bad request: if "from" or "to" is missing or not a valid date, or "from" is after "to".
+        - 200 OK: JSON objects containing 'Sales Rep' (sales representative name) and 'Total Sales'.
+        - 204 No Content: If no data is available to fulfill the request.
+        - 304 Not Modified: If the sales data did not change since the ETag/Last-Modified sent by the client.
+
+    Responses are cached until any sales data changes (see `apps.sales.cache`).
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request) -> Response:
+        try:
+            date_from = date.fromisoformat(request.GET.get('from', ''))
+            date_to = date.fromisoformat(request.GET.get('to', ''))
+        except ValueError:
+            date_from = date_to = None
+
+        if date_from is None or date_from > date_to:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': '"from" and "to" must be dates formatted as YYYY-MM-DD, and "from" not after "to".',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return cached_response(
+            OVERALL_SCOPE,
+            f'{request.path}?from={date_from}&to={date_to}',
+            lambda: self.top_sales_reps(date_from, date_to)
+        )
+
+    def top_sales_reps(self, date_from: date, date_to: date) -> Response:
+        top_sales_reps = list(top_sales_reps_between(date_from, date_to))
+
+        if top_sales_reps:
+            results = [
+                {'Sales Rep': top_sales_rep.sales_rep, 'Total Sales': top_sales_rep.total_sales}
+                for top_sales_rep in top_sales_reps
+            ]
+
+            return Response(results if len(results) > 1 else results[0], status=status.HTTP_200_OK)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@method_decorator(sales_data_condition, name='get')
+@method_decorator(analytics_reads(), name='get')
 class TopSalesRepsOverallAPIView(APIView):
     """
     API endpoint to retrieve the top sales representative per year with their total sales.
@@ -70,14 +219,31 @@ class TopSalesRepsOverallAPIView(APIView):
     Query Parameters:
         - order_by (str): Field to order by. One of 'sales_rep', 'total_sales', or 'year'. Defaults to 'year'.
         - order (str): Sorting order. Either 'asc' for ascending or 'desc' for descending. Defaults to 'asc'.
+        - years (str): Optional comma separated list of years to restrict the results to, e.g. '2009,2010,2011'.
+        - year_from / year_to (str): Optional inclusive year range to restrict the results to. Either bound can be
+        omitted. Cannot be combined with 'years'.
+        - format (str): 'ndjson' or 'csv' to stream the results (also negotiated from the Accept header) instead of
+        returning a JSON list.
+
+    All the requested years are answered by a single query. As in the single year endpoint, every sales
+    representative tied at the top value of a year is returned.
 
     Returns:
         - 400 Bad request: if "order_by" and/or "order" have invalid values — not "sales_rep", "total_sales", or "year"
-        for "order_by", and not "asc" or "desc" for "order".
+        for "order_by", and not "asc" or "desc" for "order". Or if the years filter is invalid.
         - 200 OK: List of JSON objects containing 'Sales Rep' (sales representative name), 'Total Sales', and 'Year'.
-        - 204 No Content: If no data is available to fulfill the request.
+        Streamed as one line per object (ndjson) or per row after a header (csv), without caching, for those formats.
+        - 204 No Content: If no data is available to fulfill the request (not for the streamed formats).
+        - 304 Not Modified: If the sales data did not change since the ETag/Last-Modified sent by the client.
+
+    Responses are cached, per ordering, until any sales data changes (see `apps.sales.cache`). The rankings are
+    computed by the database, by the in-memory engine of `apps.sales.analytics` when the SALES_ANALYTICS_ENGINE
+    setting is 'numpy', or from the yearly partitions of `apps.sales.partitions`, read in parallel, when it is
+    'partitions' and they are current.
     """
     http_method_names = ['get']
+    renderer_classes = REPORT_RENDERER_CLASSES
+    fields = ['Sales Rep', 'Total Sales', 'Year']
 
     def get(self, request: Request) -> Response:
         order_by = request.GET.get('order_by')
@@ -99,31 +265,307 @@ class TopSalesRepsOverallAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        try:
+            years_filter = parse_years_filter(request)
+        except ValueError:
+            return Response(INVALID_YEARS_FILTER_MESSAGE, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_streaming_request(request):
+            return streaming_response(
+                request, self.top_sales_reps_rows(order_by, order, years_filter), self.fields, 'top-sales-reps'
+            )
+
+        return cached_response(
+            OVERALL_SCOPE,
+            f'{request.path}?order_by={order_by}&order={order}&years={years_filter}',
+            lambda: self.top_sales_reps_per_year(order_by, order, years_filter)
+        )
+
+    def top_sales_reps_per_year(self, order_by: str, order: str, years_filter: dict) -> Response:
+        result_list = list(self.top_sales_reps_rows(order_by, order, years_filter))
+
+        if result_list:
+            return Response(result_list, status=status.HTTP_200_OK)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def top_sales_reps_rows(self, order_by: str, order: str, years_filter: dict) -> Iterator[dict]:
         order = '-' if order == 'desc' else ''
 
         order_parameter = order + order_by
 
-        top_sales_reps_per_year = (
-            Employee.objects.filter(customers__invoices__invoice_date__isnull=False)
-            .annotate(year=ExtractYear('customers__invoices__invoice_date'))
-            .annotate(total_sales=Sum('customers__invoices__total'))
-            .annotate(rank=Window(expression=Rank(), partition_by=[F('year')], order_by=F('total_sales').desc()))
-            .filter(rank=1)
-            .annotate(sales_rep=Concat(F('first_name'), Value(' '), F('last_name')))
-            .order_by(order_parameter)
+        if numpy_engine_enabled():
+            top_sales_reps = get_invoice_facts().top_sales_reps_per_year(years_filter, order_by=(order_parameter,))
+        elif partitions_are_current():
+            top_sales_reps = partitioned_top_sales_reps_per_year(years_filter, order_by=(order_parameter,))
+        else:
+            top_sales_reps = top_sales_reps_per_year(years_filter, order_by=(order_parameter,))
+            top_sales_reps = top_sales_reps.iterator(chunk_size=2000)
+
+        for sales_rep in top_sales_reps:
+            yield {
+                'Sales Rep': sales_rep.sales_rep,
+                'Total Sales': Decimal(sales_rep.total_sales),
+                'Year': int(sales_rep.year)
+            }
+
+
+def format_period(row: LeaderboardRow, period: str) -> str:
+    if period == 'quarter':
+        return f'{row.year}-Q{row.sub_period}'
+    if period == 'month':
+        return f'{row.year}-{row.sub_period:02d}'
+    return str(row.year)
+
+
+def encode_cursor(period: str, row: LeaderboardRow) -> str:
+    year, sub_period, total_sales, employee_id = row.keyset
+    payload = json.dumps([period, year, sub_period, str(total_sales), employee_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(period: str, cursor: str) -> tuple:
+    """
+    Returns the keyset encoded in a cursor, raising ValueError if it is invalid or was issued for another period.
+    """
+    try:
+        cursor_period, year, sub_period, total_sales, employee_id = json.loads(base64.urlsafe_b64decode(cursor))
+        keyset = int(year), int(sub_period), Decimal(total_sales), int(employee_id)
+    except (binascii.Error, ArithmeticError, UnicodeDecodeError, TypeError, ValueError) as error:
+        raise ValueError('invalid cursor') from error
+
+    if cursor_period != period:
+        raise ValueError('cursor issued for another period')
+
+    return keyset
+
+
+@method_decorator(sales_data_condition, name='get')
+@method_decorator(analytics_reads(), name='get')
+class SalesRepLeaderboardAPIView(APIView):
+    """
+    API endpoint to retrieve the top N sales representatives of each year, quarter or month, with their total sales.
+
+    Results are ordered by period, descending total sales and employee, and paginated with a cursor (keyset) on those
+    values instead of an offset, so deep pages are as fast as the first one.
+
+    Query Parameters:
+        - period (str): One of 'year', 'quarter' or 'month'. Defaults to 'year'.
+        - top (str): Number of ranks to return per period, between 1 and 100. Defaults to 3. Sales representatives
+        tied at the last rank are all returned.
+        - page_size (str): Number of results per page, between 1 and 1000. Defaults to 100.
+        - cursor (str): The 'next_cursor' of the previous page.
+        - years / year_from / year_to (str): Optional years filter, as in `TopSalesRepsOverallAPIView`.
+        - format (str): 'ndjson' or 'csv' to stream the results, as in `TopSalesRepsOverallAPIView`. The streamed
+        results are not paginated: every row after "cursor" (all of them without one) is sent, "page_size" is ignored.
+
+    Returns:
+        - 400 Bad request: if any query parameter has an invalid value.
+        - 200 OK: JSON object with 'results', a list of JSON objects containing 'Period', 'Rank', 'Sales Rep' and
+        'Total Sales', and 'next_cursor' (null on the last page). Only the rows for the streamed formats.
+        - 204 No Content: If no data is available to fulfill the request (not for the streamed formats).
+        - 304 Not Modified: If the sales data did not change since the ETag/Last-Modified sent by the client.
+    """
+    http_method_names = ['get']
+    renderer_classes = REPORT_RENDERER_CLASSES
+    fields = ['Period', 'Rank', 'Sales Rep', 'Total Sales']
+
+    def get(self, request: Request) -> Response:
+        period = request.GET.get('period') or 'year'
+        top = request.GET.get('top') or '3'
+        page_size = request.GET.get('page_size') or '100'
+        cursor = request.GET.get('cursor')
+
+        if (
+                period not in PERIOD_COLUMNS
+                or not top.isdigit() or not 1 <= int(top) <= 100
+                or not page_size.isdigit() or not 1 <= int(page_size) <= 1000
+        ):
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Invalid "period", "top" and/or "page_size" chosen.',
+                    'accepted values for "period"': 'year; quarter; month.',
+                    'accepted values for "top"': 'integer between 1 and 100.',
+                    'accepted values for "page_size"': 'integer between 1 and 1000.',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            years_filter = parse_years_filter(request)
+        except ValueError:
+            return Response(INVALID_YEARS_FILTER_MESSAGE, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            after = decode_cursor(period, cursor) if cursor else None
+        except ValueError:
+            return Response(
+                {'status': 'error', 'message': 'Invalid "cursor", use the "next_cursor" of the previous page.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if is_streaming_request(request):
+            rows = iter_top_sales_reps_per_period(period, int(top), years_filter, after=after)
+            return streaming_response(
+                request, (self.leaderboard_row(row, period) for row in rows), self.fields, f'leaderboard-{period}'
+            )
+
+        return cached_response(
+            OVERALL_SCOPE,
+            f'{request.path}?period={period}&top={int(top)}&page_size={int(page_size)}&years={years_filter}'
+            f'&after={after}',
+            lambda: self.leaderboard(period, int(top), int(page_size), years_filter, after)
         )
 
-        if top_sales_reps_per_year:
-            result_list = []
-            for sales_rep in top_sales_reps_per_year:
-                result_list.append(
-                    {
-                        'Sales Rep': f"{sales_rep}",
-                        'Total Sales': Decimal(sales_rep.total_sales),
-                        'Year': int(sales_rep.year)
-                    }
-                )
+    def leaderboard(self, period: str, top: int, page_size: int, years_filter: dict, after: tuple | None) -> Response:
+        # one extra row tells whether there is a next page
+        rows = top_sales_reps_per_period(period, top, years_filter, after=after, limit=page_size + 1)
 
-            return Response(result_list, status=status.HTTP_200_OK)
+        if rows:
+            page = rows[:page_size]
+            results = [self.leaderboard_row(row, period) for row in page]
+
+            next_cursor = encode_cursor(period, page[-1]) if len(rows) > page_size else None
+
+            return Response({'results': results, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def leaderboard_row(row: LeaderboardRow, period: str) -> dict:
+        return {
+            'Period': format_period(row, period),
+            'Rank': row.rank,
+            'Sales Rep': row.sales_rep,
+            'Total Sales': row.total_sales,
+        }
+
+
+class SellersCacheStatsAPIView(APIView):
+    """
+    API endpoint to retrieve the hit/miss counters of the sellers response cache.
+
+    Returns:
+        - 200 OK: JSON object containing 'hits', 'misses' and 'hit_rate' (null until the cache has been used).
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request) -> Response:
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+@method_decorator(analytics_reads(), name='get')
+class InvoiceExportAPIView(APIView):
+    """
+    API endpoint to export all the invoices with their lines and tracks, for downstream systems.
+
+    Query Parameters:
+        - format (str): 'ndjson' (the default) for one JSON object per invoice, its lines nested under 'Lines', or
+        'csv' for one row per invoice line, repeating the invoice columns. Also negotiated from the Accept header.
+
+    The response is streamed while the invoices are read, a chunk at a time with the lines of the whole chunk read
+    by one query (see `apps.sales.export`), so the memory used does not depend on the number of invoices. It is gzip
+    compressed on the fly (`Content-Encoding: gzip`) when the request sends `Accept-Encoding: gzip`.
+
+    Returns:
+        - 200 OK: The invoices, by increasing 'InvoiceId'.
+    """
+    http_method_names = ['get']
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        if request.accepted_renderer.format == 'csv':
+            rows, fields = iter_invoice_line_rows(), INVOICE_LINE_ROW_FIELDS
+        else:
+            rows, fields = iter_invoice_records(), INVOICE_RECORD_FIELDS
+
+        return streaming_response(request, rows, fields, 'invoices', compress=True)
+
+
+class InvoiceBatchAPIView(APIView):
+    """
+    API endpoint to create many invoices, with their lines, in one request.
+
+    Body:
+        A JSON list of at most `max_batch_size` invoices, each an object with 'invoice_date' (ISO 8601), 'customer'
+        (id, optional), 'billing_address', 'billing_city', 'billing_state', 'billing_country', 'billing_postal_code'
+        (optional), 'total' and 'lines', a list of objects with 'track' (id), 'unit_price' and 'quantity'.
+
+    The invoices are validated a chunk at a time, with the checks and messages of the model validation but a single
+    query per foreign key and chunk, and written with bulk inserts (see `apps.sales.ingest`). Invalid invoices are
+    reported without preventing the valid ones from being written. The chunks go through the invoice write queue
+    (see `apps.sales.write_queue`), with the invoices of the concurrent requests.
+
+    Returns:
+        - 400 Bad request: If the body is not a list of at most `max_batch_size` items, or if no invoice is valid.
+        - 201 Created: If at least one invoice was written.
+        Both with 'created' (number of invoices written), 'invoice_ids' (their ids, in the order of the body) and
+        'errors', a list of JSON objects with the 'index' of an invalid invoice in the body and its 'errors' per field
+        ('lines.<index>.<field>' for its lines).
+    """
+    http_method_names = ['post']
+    max_batch_size = 10000
+
+    def post(self, request: Request) -> Response:
+        if not isinstance(request.data, list) or len(request.data) > self.max_batch_size:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': f'The body must be a list of at most {self.max_batch_size} invoices.',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = write_invoices(request.data)
+
+        return Response(
+            {
+                'created': len(result.invoice_ids),
+                'invoice_ids': result.invoice_ids,
+                'errors': [{'index': index, 'errors': errors} for index, errors in result.errors.items()],
+            },
+            status=status.HTTP_201_CREATED if result.invoice_ids else status.HTTP_400_BAD_REQUEST
+        )
+
+
+class InvoiceCreateAPIView(APIView):
+    """
+    API endpoint to create one invoice, with its lines, e.g. from a point of sale.
+
+    Body:
+        A JSON object with the fields of an invoice of `InvoiceBatchAPIView`.
+
+    The invoice is written through the invoice write queue (see `apps.sales.write_queue`): the invoices of concurrent
+    requests are validated and written together, in one transaction, instead of each request waiting for the SQLite
+    write lock in turn.
+
+    Returns:
+        - 400 Bad request: If the invoice is invalid, with its 'errors' per field ('lines.<index>.<field>' for its
+        lines).
+        - 201 Created: With the 'invoice_id' of the invoice written.
+    """
+    http_method_names = ['post']
+
+    def post(self, request: Request) -> Response:
+        result = write_invoices([request.data])
+
+        if result.invoice_ids:
+            return Response({'invoice_id': result.invoice_ids[0]}, status=status.HTTP_201_CREATED)
+
+        return Response({'errors': result.errors[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class InvoiceWriteQueueStatsAPIView(APIView):
+    """
+    API endpoint to retrieve the metrics of the invoice write queue of the process that answers.
+
+    Returns:
+        - 200 OK: JSON object containing 'batches' and 'items' (invoices) written, 'split_batches' (batches that failed
+        and were written again per request), 'average_batch_size' and 'max_batch_size', and 'average_wait_ms' and
+        'max_wait_ms', the time invoices waited in the queue before being written (null until the queue has been used).
+    """
+    http_method_names = ['get']
+
+    def get(self, request: Request) -> Response:
+        return Response(invoice_write_queue.stats(), status=status.HTTP_200_OK)
@@ -5,3 +5,7 @@ class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.sales'
     verbose_name = 'sales'
+
+    def ready(self):
+        # connect the signal handlers that keep the reporting tables up to date
+        from apps.sales import signals  # noqa: F401
@@ -0,0 +1,102 @@
+import hashlib
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from rest_framework.response import Response
+
+from apps.core.replica import current_read_source
+from apps.sales.models import SalesCacheGeneration
+
+CACHE_PREFIX = 'sellers'
+# Scope shared by every cached response, invalidating it drops the whole cache.
+ALL_SCOPE = 'all'
+OVERALL_SCOPE = 'overall'
+# Only successful answers are cached, errors are cheap to produce and depend on the request only.
+CACHEABLE_STATUS_CODES = (200, 204)
+
+# One statement, so that concurrent writers of a new scope don't both insert it.
+BUMP_GENERATION_SQL = """
+    INSERT INTO SalesCacheGeneration (Scope, Generation) VALUES (%s, 1)
+    ON CONFLICT (Scope) DO UPDATE SET Generation = Generation + 1
+"""
+
+
+def get_sellers_cache():
+    return caches[settings.SELLERS_CACHE_ALIAS]
+
+
+def year_scope(year: int) -> str:
+    return f'year:{year}'
+
+
+def _generations(*scopes: str) -> list[int]:
+    """
+    Returns the current generation of each scope, in one query. A scope never invalidated is at generation 0.
+    """
+    # from the default database even when the reports read the analytics replica: the generations are written there
+    generations = dict(
+        SalesCacheGeneration.objects.using(DEFAULT_DB_ALIAS).filter(scope__in=scopes).values_list('scope', 'generation')
+    )
+    return [generations.get(scope, 0) for scope in scopes]
+
+
+def invalidate(*scopes: str) -> None:
+    """
+    Invalidates every cached response stored under the given scopes, in every process.
+
+    The generations are moved forward in the current transaction, so the other processes (and requests) drop their
+    responses when the write commits, and keep them if it is rolled back.
+    """
+    with connections[router.db_for_write(SalesCacheGeneration)].cursor() as cursor:
+        cursor.executemany(BUMP_GENERATION_SQL, [(scope,) for scope in scopes])
+
+
+def _count(counter: str) -> None:
+    cache = get_sellers_cache()
+    key = f'{CACHE_PREFIX}:stats:{counter}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def cache_stats() -> dict:
+    cache = get_sellers_cache()
+    hits = cache.get(f'{CACHE_PREFIX}:stats:hits', 0)
+    misses = cache.get(f'{CACHE_PREFIX}:stats:misses', 0)
+    lookups = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def cached_response(scope: str, key: str, build_response: Callable[[], Response]) -> Response:
+    """
+    Returns the cached response for `key` under `scope`, building and caching it on a miss.
+
+    Responses are also keyed on what the reads see (the default database or a copy of the analytics replica): a
+    replica refreshed by another process, which doesn't bump the generations, misses the cache.
+    """
+    cache = get_sellers_cache()
+    all_generation, scope_generation = _generations(ALL_SCOPE, scope)
+    # hashed, since keys are built from request parameters and may contain characters some backends refuse
+    key_digest = hashlib.md5(f'{current_read_source()}:{key}'.encode()).hexdigest()
+    cache_key = f'{CACHE_PREFIX}:response:{all_generation}:{scope}:{scope_generation}:{key_digest}'
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        _count('hits')
+        data, status_code = cached
+        return Response(data, status=status_code)
+
+    _count('misses')
+    response = build_response()
+    if response.status_code in CACHEABLE_STATUS_CODES:
+        cache.set(cache_key, (response.data, response.status_code), timeout=settings.SELLERS_CACHE_TIMEOUT)
+
+    return response
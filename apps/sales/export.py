@@ -0,0 +1,124 @@
+"""
+Bulk export of the invoices with their lines and tracks, for downstream systems.
+
+The invoices are read in keyset chunks of their id, and the lines of a whole chunk (with their track and album) are
+read by one more query, so the export runs two queries per chunk whatever the number of lines, and holds at most one
+chunk in memory whatever the size of the tables. The genre and media type names are resolved with the reference data
+of `apps.music.reference` instead of being joined. Rows are yielded as they are built, to be written
+(`apps.sales.api.renderers`) and optionally gzip compressed (`gzip_chunks`) while the following chunks are read.
+
+Invoices written while an export runs are included if their id was not passed yet. No invoice is exported twice.
+"""
+import zlib
+from typing import Iterable, Iterator
+
+from django.db.models import Prefetch
+
+from apps.music.reference import ReferenceData, reference_data
+from apps.sales.models import Invoice, InvoiceLine
+
+CHUNK_SIZE = 1000
+
+INVOICE_FIELDS = [
+    'InvoiceId', 'InvoiceDate', 'CustomerId', 'SalesRepId', 'BillingAddress', 'BillingCity', 'BillingState',
+    'BillingCountry', 'BillingPostalCode', 'Total',
+]
+LINE_FIELDS = [
+    'InvoiceLineId', 'TrackId', 'TrackName', 'Composer', 'Album', 'Genre', 'MediaType', 'UnitPrice', 'Quantity',
+]
+# NDJSON: one object per invoice, its lines nested under "Lines"
+INVOICE_RECORD_FIELDS = [*INVOICE_FIELDS, 'Lines']
+# CSV: one row per invoice line, repeating the invoice columns (a single row, without line values, for an invoice
+# without lines)
+INVOICE_LINE_ROW_FIELDS = [*INVOICE_FIELDS, *LINE_FIELDS]
+
+
+def iter_invoice_chunks(chunk_size: int = CHUNK_SIZE) -> Iterator[list[Invoice]]:
+    """
+    Yields the invoices by increasing id, `chunk_size` at a time, with their lines and tracks prefetched.
+    """
+    lines = InvoiceLine.objects.select_related('track__album').order_by('id')
+
+    last_id = 0
+    while True:
+        invoices = list(
+            Invoice.objects.filter(id__gt=last_id).order_by('id').prefetch_related(
+                Prefetch('invoice_lines', queryset=lines)
+            )[:chunk_size]
+        )
+        if not invoices:
+            return
+        yield invoices
+        last_id = invoices[-1].id
+
+
+def invoice_values(invoice: Invoice) -> dict:
+    return {
+        'InvoiceId': invoice.id,
+        'InvoiceDate': invoice.invoice_date.isoformat(),
+        'CustomerId': invoice.customer_id,
+        'SalesRepId': invoice.sales_rep_id,
+        'BillingAddress': invoice.billing_address,
+        'BillingCity': invoice.billing_city,
+        'BillingState': invoice.billing_state,
+        'BillingCountry': invoice.billing_country,
+        'BillingPostalCode': invoice.billing_postal_code,
+        'Total': invoice.total,
+    }
+
+
+def line_values(line: InvoiceLine, reference: ReferenceData) -> dict:
+    return {
+        'InvoiceLineId': line.id,
+        'TrackId': line.track_id,
+        'TrackName': line.track.name,
+        'Composer': line.track.composer,
+        'Album': line.track.album.title,
+        'Genre': reference.genres.get(line.track.genre_id),
+        'MediaType': reference.media_types.get(line.track.media_type_id),
+        'UnitPrice': line.unit_price,
+        'Quantity': line.quantity,
+    }
+
+
+def iter_invoice_records(chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields one dict per invoice (`INVOICE_RECORD_FIELDS`), with the list of its lines under "Lines".
+    """
+    for invoices in iter_invoice_chunks(chunk_size):
+        reference = reference_data()
+        for invoice in invoices:
+            yield {
+                **invoice_values(invoice),
+                'Lines': [line_values(line, reference) for line in invoice.invoice_lines.all()],
+            }
+
+
+def iter_invoice_line_rows(chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields one flat dict per invoice line (`INVOICE_LINE_ROW_FIELDS`), and one without line values per invoice
+    without lines.
+    """
+    no_line = dict.fromkeys(LINE_FIELDS)
+    for invoices in iter_invoice_chunks(chunk_size):
+        reference = reference_data()
+        for invoice in invoices:
+            values = invoice_values(invoice)
+            lines = invoice.invoice_lines.all()
+            if not lines:
+                yield {**values, **no_line}
+            for line in lines:
+                yield {**values, **line_values(line, reference)}
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compresses a stream of bytes to the gzip format on the fly. The compressor emits its output in blocks, so the
+    chunks are not flushed one by one (which would compress each row on its own).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,221 @@
+"""
+Bulk ingestion of invoices with their lines.
+
+`Invoice.save()` and `InvoiceLine.save()` run `full_clean()`, which validates one row at a time and looks up every
+foreign key with its own query. Here a chunk of invoices is validated at once, checking what `full_clean` checks:
+the field validation of `clean_fields` (types, max_length, decimal places, MinValueValidator...) on each row, without
+its foreign keys, and the existence of the customers and tracks referenced by the whole chunk with one `IN` query
+each. The valid rows are then written with `bulk_create`, one transaction per chunk, and the reporting tables that
+`apps.sales.signals` maintains on save (which `bulk_create` bypasses) are updated per sales rep and year, and per
+sales rep for the days, instead of per invoice.
+
+Invalid rows are reported, with the same messages as `full_clean`, and don't stop the other rows from being written.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, NamedTuple
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.core.bulk import chunked, clean_fields_errors, foreign_key_error_messages
+from apps.customers.models import Customer
+from apps.music.models import Track
+from apps.sales.cache import OVERALL_SCOPE, invalidate, year_scope
+from apps.sales.models import Invoice, InvoiceLine
+from apps.sales.rollups import apply_sales_rep_daily_deltas, apply_sales_rep_delta
+from apps.sales.watermark import bump_sales_data_version
+
+CHUNK_SIZE = 500
+
+INVOICE_INPUT_FIELDS = {
+    'invoice_date', 'customer', 'billing_address', 'billing_city', 'billing_state', 'billing_country',
+    'billing_postal_code', 'total', 'lines',
+}
+LINE_INPUT_FIELDS = {'track', 'unit_price', 'quantity'}
+
+
+class IngestResult(NamedTuple):
+    # ids of the invoices written, in the order of the input rows
+    invoice_ids: list[int]
+    # index of the input row: field ('lines.<index>.<field>' for the lines) -> error messages
+    errors: dict[int, dict[str, list[str]]]
+
+
+class _ValidRow(NamedTuple):
+    index: int
+    invoice: Invoice
+    lines: list[InvoiceLine]
+
+
+def _input_value(value):
+    # JSON numbers are read as floats: their shortest repr is the decimal value that was sent (Decimal(2.97) isn't)
+    return str(value) if isinstance(value, float) else value
+
+
+def _build(row, index: int, errors: dict) -> _ValidRow | None:
+    """
+    Builds the unsaved invoice and lines of an input row, with their fields validated and converted, but not their
+    foreign keys. Returns None (adding to `errors`) if the row is invalid.
+    """
+    if not isinstance(row, dict):
+        errors[index] = {NON_FIELD_ERRORS: ['Expected an object with the invoice fields.']}
+        return None
+
+    row_errors = {}
+    unknown = sorted(set(row) - INVOICE_INPUT_FIELDS)
+    if unknown:
+        row_errors[NON_FIELD_ERRORS] = [f'Unknown fields: {", ".join(unknown)}.']
+
+    invoice = Invoice(**{
+        field: _input_value(value) for field, value in row.items()
+        if field in INVOICE_INPUT_FIELDS - {'customer', 'lines'}
+    })
+    invoice.customer_id = _foreign_key_value(invoice, 'customer', row.get('customer'), row_errors)
+    row_errors.update(clean_fields_errors(invoice))
+
+    lines = []
+    input_lines = row.get('lines') or []
+    if not isinstance(input_lines, list):
+        row_errors['lines'] = ['Expected a list of invoice lines.']
+        input_lines = []
+    for line_index, input_line in enumerate(input_lines):
+        prefix = f'lines.{line_index}.'
+        if not isinstance(input_line, dict):
+            row_errors[f'{prefix}{NON_FIELD_ERRORS}'] = ['Expected an object with the invoice line fields.']
+            continue
+        unknown = sorted(set(input_line) - LINE_INPUT_FIELDS)
+        if unknown:
+            row_errors[f'{prefix}{NON_FIELD_ERRORS}'] = [f'Unknown fields: {", ".join(unknown)}.']
+
+        line = InvoiceLine(**{
+            field: _input_value(value) for field, value in input_line.items() if field in LINE_INPUT_FIELDS - {'track'}
+        })
+        line.track_id = _foreign_key_value(line, 'track', input_line.get('track'), row_errors, prefix)
+        for field, messages in clean_fields_errors(line).items():
+            row_errors[f'{prefix}{field}'] = messages
+        lines.append(line)
+
+    if row_errors:
+        errors[index] = row_errors
+        return None
+
+    if timezone.is_naive(invoice.invoice_date):
+        # as Django does when saving a naive datetime, but without the warning
+        invoice.invoice_date = timezone.make_aware(invoice.invoice_date)
+    invoice.set_date_parts()
+    return _ValidRow(index, invoice, lines)
+
+
+def _foreign_key_value(instance, field_name: str, value, errors: dict, prefix: str = '') -> int | None:
+    field = instance._meta.get_field(field_name)
+    if value is None:
+        if not field.null:
+            errors[f'{prefix}{field_name}'] = [str(field.error_messages['null'])]
+        return None
+    try:
+        return field.target_field.to_python(value)
+    except ValidationError as error:
+        errors[f'{prefix}{field_name}'] = error.messages
+        return None
+
+
+def _check_foreign_keys(rows: list[_ValidRow], errors: dict) -> list[_ValidRow]:
+    """
+    Checks that the customers and tracks of the rows exist, with one query each, sets the sales rep of the invoices
+    (as `Invoice.save()` does) and returns the rows that passed.
+    """
+    customer_ids = {row.invoice.customer_id for row in rows if row.invoice.customer_id is not None}
+    support_reps = dict(Customer.objects.filter(pk__in=customer_ids).values_list('id', 'support_representative_id'))
+    track_ids = {line.track_id for row in rows for line in row.lines}
+    existing_track_ids = set(Track.objects.filter(pk__in=track_ids).values_list('id', flat=True))
+
+    valid_rows = []
+    for row in rows:
+        row_errors = {}
+        customer_id = row.invoice.customer_id
+        if customer_id is not None and customer_id not in support_reps:
+            row_errors['customer'] = foreign_key_error_messages(row.invoice, 'customer', customer_id)
+        for line_index, line in enumerate(row.lines):
+            if line.track_id not in existing_track_ids:
+                row_errors[f'lines.{line_index}.track'] = foreign_key_error_messages(line, 'track', line.track_id)
+
+        if row_errors:
+            errors[row.index] = row_errors
+            continue
+        if customer_id is not None:
+            row.invoice.sales_rep_id = support_reps[customer_id]
+        valid_rows.append(row)
+
+    return valid_rows
+
+
+def _write(rows: list[_ValidRow]) -> list[int]:
+    # what the invoices add to the reporting tables, summed per sales rep and year/day
+    yearly = defaultdict(lambda: (Decimal(0), 0))
+    daily = defaultdict(lambda: defaultdict(lambda: (Decimal(0), 0)))
+    for row in rows:
+        employee_id, total = row.invoice.sales_rep_id, row.invoice.total
+        if employee_id is not None:
+            year_total, year_count = yearly[employee_id, row.invoice.year]
+            yearly[employee_id, row.invoice.year] = (year_total + total, year_count + 1)
+            day_total, day_count = daily[employee_id][row.invoice.sales_date]
+            daily[employee_id][row.invoice.sales_date] = (day_total + total, day_count + 1)
+
+    with transaction.atomic():
+        invoices = Invoice.objects.bulk_create([row.invoice for row in rows])
+        lines = []
+        for row, invoice in zip(rows, invoices):
+            for line in row.lines:
+                line.invoice_id = invoice.id
+                lines.append(line)
+        InvoiceLine.objects.bulk_create(lines)
+
+        for (employee_id, year), (total, count) in yearly.items():
+            apply_sales_rep_delta(employee_id, year, total, count)
+        for employee_id, deltas in daily.items():
+            apply_sales_rep_daily_deltas(employee_id, deltas)
+
+        invalidate(OVERALL_SCOPE, *(year_scope(year) for year in {row.invoice.year for row in rows}))
+        bump_sales_data_version()
+
+    return [invoice.id for invoice in invoices]
+
+
+def ingest_chunk(rows: list, errors: dict, start: int = 0) -> list[int]:
+    """
+    Validates the rows of one chunk and writes the valid ones in one transaction. Adds the errors of the invalid rows
+    to `errors`, by index in `rows` plus `start`, and returns the ids of the invoices written.
+
+    Raises IntegrityError, with nothing written, if the chunk fails to be written (e.g. a customer deleted meanwhile).
+    """
+    built = (_build(row, index, errors) for index, row in enumerate(rows, start))
+    valid_rows = _check_foreign_keys([row for row in built if row is not None], errors)
+    if not valid_rows:
+        return []
+    return _write(valid_rows)
+
+
+def ingest_invoices(rows: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> IngestResult:
+    """
+    Validates and writes invoices given as dicts of `INVOICE_INPUT_FIELDS`, 'lines' being a list of dicts of
+    `LINE_INPUT_FIELDS` ('customer' and 'track' are ids, 'invoice_date' a datetime or an ISO 8601 string).
+
+    Rows are read, validated and written `chunk_size` at a time. A chunk failing to be written (e.g. a customer
+    deleted meanwhile) reports an error for each of its rows and the following chunks are still written.
+    """
+    invoice_ids = []
+    errors = {}
+    start = 0
+    for chunk in chunked(rows, chunk_size):
+        chunk_errors = {}
+        try:
+            invoice_ids.extend(ingest_chunk(chunk, chunk_errors, start))
+        except IntegrityError as error:
+            for index in range(start, start + len(chunk)):
+                chunk_errors.setdefault(index, {NON_FIELD_ERRORS: [f'The invoice could not be written: {error}']})
+        errors.update(chunk_errors)
+        start += len(chunk)
+
+    return IngestResult(invoice_ids, dict(sorted(errors.items())))
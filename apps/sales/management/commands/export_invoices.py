@@ -0,0 +1,74 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.core.sqlite import PROFILES, sqlite_profile
+
+from apps.sales.api.renderers import CSVRenderer, NDJSONRenderer
+from apps.sales.export import (
+    CHUNK_SIZE,
+    INVOICE_LINE_ROW_FIELDS,
+    INVOICE_RECORD_FIELDS,
+    gzip_chunks,
+    iter_invoice_line_rows,
+    iter_invoice_records
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports all the invoices with their lines and tracks, as NDJSON (one object per invoice) or CSV (one row per '
+        'invoice line), optionally gzip compressed. Invoices are read and written a chunk at a time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=['ndjson', 'csv'],
+            default='ndjson',
+            help='Output format (default: ndjson).'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Compress the output with gzip.'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (default: the standard output).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Number of invoices read per query (default: {CHUNK_SIZE}).'
+        )
+        parser.add_argument(
+            '--sqlite-profile',
+            choices=list(PROFILES),
+            default='analytics',
+            help='Pragmas of the database connection while exporting, see apps/core/sqlite.py (default: analytics).'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(options['chunk_size'], 1)
+        if options['format'] == 'csv':
+            content = CSVRenderer().render_rows(iter_invoice_line_rows(chunk_size), INVOICE_LINE_ROW_FIELDS)
+        else:
+            content = NDJSONRenderer().render_rows(iter_invoice_records(chunk_size), INVOICE_RECORD_FIELDS)
+
+        if options['gzip']:
+            content = gzip_chunks(content)
+
+        # the invoices are read while the content is written
+        with sqlite_profile(connection, options['sqlite_profile']):
+            if options['output']:
+                with open(options['output'], 'wb') as output:
+                    output.writelines(content)
+            else:
+                sys.stdout.buffer.writelines(content)
+                sys.stdout.buffer.flush()
+
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f'Exported the invoices to {options["output"]}.'))
@@ -0,0 +1,77 @@
+import json
+import sys
+
+from typing import Iterator
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.core.sqlite import PROFILES, sqlite_profile
+from apps.sales.ingest import CHUNK_SIZE, ingest_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the invoices of an NDJSON file (one invoice per line, with the fields of the '
+        'api/v1/invoices/batch endpoint), validated and written a chunk at a time. Invalid lines are reported and '
+        'skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='NDJSON file to read, "-" for the standard input.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Number of invoices validated and written together (default: {CHUNK_SIZE}).'
+        )
+        parser.add_argument(
+            '--sqlite-profile',
+            choices=list(PROFILES),
+            default='ingest',
+            help='Pragmas of the database connection while loading, see apps/core/sqlite.py (default: ingest).'
+        )
+
+    def handle(self, *args, **options):
+        created = invalid = 0
+
+        with (
+            sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8') as lines,
+            sqlite_profile(connection, options['sqlite_profile'])
+        ):
+            for chunk, invalid_json in self.read_chunks(lines, max(options['chunk_size'], 1)):
+                result = ingest_invoices([invoice for line_number, invoice in chunk], chunk_size=len(chunk))
+                for index, errors in result.errors.items():
+                    self.stderr.write(f'Line {chunk[index][0]}: {json.dumps(errors, ensure_ascii=False)}')
+
+                created += len(result.invoice_ids)
+                invalid += invalid_json + len(result.errors)
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} invoices.'))
+        if invalid:
+            self.stdout.write(self.style.WARNING(f'Skipped {invalid} invalid lines.'))
+
+    def read_chunks(self, lines, chunk_size: int) -> Iterator[tuple[list[tuple[int, dict]], int]]:
+        """
+        Yields the (line number, invoice) of `chunk_size` lines at a time, with the number of lines that were not
+        valid JSON (reported as they are read).
+        """
+        chunk = []
+        invalid_json = 0
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                chunk.append((line_number, json.loads(line)))
+            except ValueError as error:
+                self.stderr.write(f'Line {line_number}: invalid JSON ({error}).')
+                invalid_json += 1
+
+            if len(chunk) == chunk_size:
+                yield chunk, invalid_json
+                chunk, invalid_json = [], 0
+
+        yield chunk, invalid_json
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.sales.partitions import get_partition_dir, rebuild_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the yearly partitions of SALES_PARTITION_DIR from the invoices, a read-side projection for the '
+        'rankings of the partitions sales analytics engine, used until the sales data changes again.'
+    )
+
+    def handle(self, *args, **options):
+        counts = rebuild_partitions()
+        for year, count in counts.items():
+            self.stdout.write(f'{year}: {count} invoices.')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(counts)} invoice partitions to {get_partition_dir()}.'))
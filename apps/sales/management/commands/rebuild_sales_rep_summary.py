@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.sales.rollups import rebuild_sales_rep_daily_cumulative, rebuild_sales_rep_summary
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the yearly and daily cumulative sales representative summary tables from the invoices.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales_rep_summary()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt sales rep summary: {rows} rows written.'))
+        rows = rebuild_sales_rep_daily_cumulative()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt sales rep daily cumulative sales: {rows} rows written.'))
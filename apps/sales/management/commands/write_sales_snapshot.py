@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.sales.analytics import invoice_rewrites
+from apps.sales.snapshot import get_snapshot_dir, remove_old_snapshots, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes a columnar snapshot of the sales facts to SALES_SNAPSHOT_DIR and makes it the current one, for the '
+        'numpy sales analytics engine.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=2,
+            help='Number of snapshots to keep, the older ones are removed (default: 2).'
+        )
+
+    def handle(self, *args, **options):
+        version = write_snapshot(invoice_rewrites())
+        self.stdout.write(self.style.SUCCESS(f'Wrote sales snapshot {version} to {get_snapshot_dir()}.'))
+
+        removed = remove_old_snapshots(max(options['keep'], 1))
+        if removed:
+            self.stdout.write(f'Removed old sales snapshots: {", ".join(removed)}.')
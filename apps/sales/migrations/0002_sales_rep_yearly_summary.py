@@ -0,0 +1,59 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractYear, Round
+
+
+def populate_sales_rep_summary(apps, schema_editor):
+    Invoice = apps.get_model('sales', 'Invoice')
+    SalesRepYearlySummary = apps.get_model('sales', 'SalesRepYearlySummary')
+
+    per_rep_and_year = (
+        Invoice.objects.filter(customer__support_representative__isnull=False)
+        .annotate(invoice_year=ExtractYear('invoice_date'))
+        .values('customer__support_representative', 'invoice_year')
+        .annotate(total_sales=Round(Sum('total'), 2), invoice_count=Count('id'))
+        .order_by()
+    )
+    SalesRepYearlySummary.objects.bulk_create(
+        SalesRepYearlySummary(
+            employee_id=row['customer__support_representative'],
+            year=row['invoice_year'],
+            total_sales=row['total_sales'],
+            invoice_count=row['invoice_count'],
+        )
+        for row in per_rep_and_year
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('employees', '0001_initial'),
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRepYearlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(db_column='Year', verbose_name='year')),
+                ('total_sales', models.DecimalField(db_column='TotalSales', decimal_places=2, default=0, max_digits=14, verbose_name='total sales')),
+                ('invoice_count', models.PositiveIntegerField(db_column='InvoiceCount', default=0, verbose_name='invoice count')),
+                ('employee', models.ForeignKey(db_column='EmployeeId', on_delete=django.db.models.deletion.CASCADE, related_name='yearly_sales_summaries', to='employees.employee', verbose_name='sales representative')),
+            ],
+            options={
+                'verbose_name': 'sales rep yearly summary',
+                'verbose_name_plural': 'sales rep yearly summaries',
+                'db_table': 'SalesRepYearlySummary',
+                'ordering': ['year', '-total_sales'],
+                'indexes': [models.Index(fields=['year', '-total_sales'], name='sales_rep_year_total_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'year'), name='unique_sales_rep_year')],
+            },
+        ),
+        migrations.RunPython(populate_sales_rep_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:40
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractQuarter, ExtractYear
+
+
+def populate_invoice_date_parts(apps, schema_editor):
+    Invoice = apps.get_model('sales', 'Invoice')
+    Invoice.objects.update(
+        year=ExtractYear('invoice_date'),
+        month=ExtractMonth('invoice_date'),
+        quarter=ExtractQuarter('invoice_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0002_sales_rep_yearly_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='year',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Year', editable=False, null=True, verbose_name='year'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='month',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Month', editable=False, null=True, verbose_name='month'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='quarter',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Quarter', editable=False, null=True, verbose_name='quarter'),
+        ),
+        migrations.RunPython(populate_invoice_date_parts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='invoice',
+            name='year',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Year', editable=False, verbose_name='year'),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='month',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Month', editable=False, verbose_name='month'),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='quarter',
+            field=models.PositiveSmallIntegerField(blank=True, db_column='Quarter', editable=False, verbose_name='quarter'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['year', 'month'], name='invoice_year_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['year', 'quarter'], name='invoice_year_quarter_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('sales', '0003_invoice_date_parts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_year_month_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_year_quarter_idx',
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['year', 'month', 'quarter', 'customer', 'total'], name='invoice_period_customer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['customer', 'invoice_date', 'total'], name='invoice_customer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_invoice_sales_rep(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    Invoice = apps.get_model('sales', 'Invoice')
+
+    # existing invoices are attributed to the current support representative of their customer
+    Invoice.objects.filter(customer__isnull=False).update(
+        sales_rep=Subquery(Customer.objects.filter(pk=OuterRef('customer')).values('support_representative')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('employees', '0001_initial'),
+        ('sales', '0004_invoice_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_period_customer_idx',
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='sales_rep',
+            field=models.ForeignKey(blank=True, db_column='SalesRepId', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='employees.employee', verbose_name='sales representative'),
+        ),
+        migrations.RunPython(populate_invoice_sales_rep, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['year', 'month', 'quarter', 'sales_rep', 'total'], name='invoice_period_sales_rep_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.2 on 2026-10-17 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_sales_rep_daily_cumulative(apps, schema_editor):
+    Invoice = apps.get_model('sales', 'Invoice')
+    SalesRepDailyCumulative = apps.get_model('sales', 'SalesRepDailyCumulative')
+
+    invoices = (
+        Invoice.objects.filter(sales_rep__isnull=False)
+        .order_by('sales_rep', 'invoice_date')
+        .values_list('sales_rep', 'invoice_date', 'total')
+    )
+
+    rows = []
+    for employee_id, invoice_date, total in invoices.iterator():
+        if timezone.is_aware(invoice_date):
+            invoice_date = timezone.localtime(invoice_date)
+        sales_date = invoice_date.date()
+
+        if rows and rows[-1].employee_id == employee_id:
+            row = rows[-1]
+            if row.date != sales_date:
+                row = SalesRepDailyCumulative(
+                    employee_id=employee_id,
+                    date=sales_date,
+                    cumulative_sales=row.cumulative_sales,
+                    cumulative_count=row.cumulative_count,
+                )
+                rows.append(row)
+        else:
+            row = SalesRepDailyCumulative(employee_id=employee_id, date=sales_date)
+            rows.append(row)
+
+        row.daily_sales += total
+        row.daily_count += 1
+        row.cumulative_sales += total
+        row.cumulative_count += 1
+
+    SalesRepDailyCumulative.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+        ('sales', '0005_invoice_sales_rep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRepDailyCumulative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_column='Date', verbose_name='date')),
+                ('daily_sales', models.DecimalField(db_column='DailySales', decimal_places=2, default=0, max_digits=14, verbose_name='daily sales')),
+                ('daily_count', models.PositiveIntegerField(db_column='DailyCount', default=0, verbose_name='daily invoice count')),
+                ('cumulative_sales', models.DecimalField(db_column='CumulativeSales', decimal_places=2, default=0, max_digits=14, verbose_name='cumulative sales')),
+                ('cumulative_count', models.PositiveIntegerField(db_column='CumulativeCount', default=0, verbose_name='cumulative invoice count')),
+                ('employee', models.ForeignKey(db_column='EmployeeId', on_delete=django.db.models.deletion.CASCADE, related_name='daily_cumulative_sales', to='employees.employee', verbose_name='sales representative')),
+            ],
+            options={
+                'verbose_name': 'sales rep daily cumulative sales',
+                'verbose_name_plural': 'sales rep daily cumulative sales',
+                'db_table': 'SalesRepDailyCumulative',
+                'ordering': ['employee', 'date'],
+                'indexes': [models.Index(fields=['employee', 'date', 'cumulative_sales', 'cumulative_count'], name='sales_rep_date_cumulative_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'date'), name='unique_sales_rep_date')],
+            },
+        ),
+        migrations.RunPython(populate_sales_rep_daily_cumulative, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0006_sales_rep_daily_cumulative'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceRewriteCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveBigIntegerField(db_column='Count', default=0, verbose_name='invoice rewrites')),
+            ],
+            options={
+                'verbose_name': 'invoice rewrite counter',
+                'db_table': 'InvoiceRewriteCounter',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_sales_data_version(apps, schema_editor):
+    # the data already stored counts as modified now
+    SalesDataVersion = apps.get_model('sales', 'SalesDataVersion')
+    SalesDataVersion.objects.create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0007_invoice_rewrite_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(db_column='Version', default=0, verbose_name='version')),
+                ('modified', models.DateTimeField(db_column='Modified', default=django.utils.timezone.now, verbose_name='modified')),
+            ],
+            options={
+                'verbose_name': 'sales data version',
+                'db_table': 'SalesDataVersion',
+            },
+        ),
+        migrations.RunPython(create_sales_data_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-17 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_sales_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesCacheGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(db_column='Scope', max_length=32, unique=True, verbose_name='scope')),
+                ('generation', models.PositiveBigIntegerField(db_column='Generation', default=0, verbose_name='generation')),
+            ],
+            options={
+                'verbose_name': 'sales cache generation',
+                'db_table': 'SalesCacheGeneration',
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class Invoice(models.Model):
@@ -53,6 +54,26 @@ class Invoice(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(0.00)]
     )
+    # Date parts of invoice_date (in the current time zone), stored so that reporting queries can filter and group on
+    # indexed integer columns instead of extracting them from every row. Filled in by save().
+    year = models.PositiveSmallIntegerField(
+        verbose_name='year',
+        db_column='Year',
+        editable=False,
+        blank=True
+    )
+    month = models.PositiveSmallIntegerField(
+        verbose_name='month',
+        db_column='Month',
+        editable=False,
+        blank=True
+    )
+    quarter = models.PositiveSmallIntegerField(
+        verbose_name='quarter',
+        db_column='Quarter',
+        editable=False,
+        blank=True
+    )
 
     customer = models.ForeignKey(
         'customers.Customer',
@@ -62,23 +83,80 @@ class Invoice(models.Model):
         blank=True,
         null=True
     )
+    # Sales representative the invoice is attributed to: the customer's support representative when the invoice is
+    # written. Later customer reassignments don't change it, so reports keep the history and don't need to join
+    # Customer.
+    sales_rep = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.PROTECT,
+        related_name='invoices',
+        verbose_name='sales representative',
+        db_column='SalesRepId',
+        blank=True,
+        null=True
+    )
 
     class Meta:
         db_table = 'Invoice'
         ordering = ['-invoice_date', ]
         verbose_name = 'invoice'
         verbose_name_plural = 'invoices'
+        indexes = [
+            # Covering indexes for the sales rep reports, which aggregate Total per period and sales representative or
+            # per customer, so that they are answered from the index alone.
+            models.Index(
+                fields=['year', 'month', 'quarter', 'sales_rep', 'total'],
+                name='invoice_period_sales_rep_idx'
+            ),
+            models.Index(fields=['customer', 'invoice_date', 'total'], name='invoice_customer_date_idx'),
+        ]
 
     def __str__(self):
         return self.invoice_date.strftime('%Y-%m-%d %H:%M:%S')
 
     def save(self, *args, **kwargs):
+        if self.sales_rep_id is None and self.customer_id is not None:
+            self.sales_rep_id = self.customer.support_representative_id
+
         # Run Django model validation (max_length, blank, custom validators, etc.).
         # This is especially needed on SQLite, which doesn’t enforce max_length or
         # other field constraints at the database level.
         self.full_clean()
+        self.set_date_parts()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'invoice_date' in update_fields:
+                update_fields |= {'year', 'month', 'quarter'}
+            if 'customer' in update_fields:
+                update_fields.add('sales_rep')
+            kwargs['update_fields'] = update_fields
+
         super().save(*args, **kwargs)
 
+    def set_date_parts(self):
+        invoice_date = self.invoice_date
+        if timezone.is_aware(invoice_date):
+            invoice_date = timezone.localtime(invoice_date)
+
+        self.year = invoice_date.year
+        self.month = invoice_date.month
+        self.quarter = (invoice_date.month - 1) // 3 + 1
+
+    @property
+    def sales_date(self):
+        """
+        Day of the invoice in the current time zone, the granularity of `SalesRepDailyCumulative`.
+        """
+        return local_date(self.invoice_date)
+
+
+def local_date(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
 
 class InvoiceLine(models.Model):
     id = models.AutoField(
@@ -125,3 +203,196 @@ class InvoiceLine(models.Model):
         # other field constraints at the database level.
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class SalesRepYearlySummary(models.Model):
+    """
+    Yearly sales totals per sales representative.
+
+    This is a derived table: rows are maintained by the signal handlers in `apps.sales.signals` and can be rebuilt
+    from the invoices with the `rebuild_sales_rep_summary` management command, so it must not be edited by hand.
+    """
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        related_name='yearly_sales_summaries',
+        verbose_name='sales representative',
+        db_column='EmployeeId'
+    )
+    year = models.PositiveSmallIntegerField(
+        verbose_name='year',
+        db_column='Year'
+    )
+    total_sales = models.DecimalField(
+        verbose_name='total sales',
+        db_column='TotalSales',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    invoice_count = models.PositiveIntegerField(
+        verbose_name='invoice count',
+        db_column='InvoiceCount',
+        default=0
+    )
+
+    class Meta:
+        db_table = 'SalesRepYearlySummary'
+        ordering = ['year', '-total_sales']
+        verbose_name = 'sales rep yearly summary'
+        verbose_name_plural = 'sales rep yearly summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'year'], name='unique_sales_rep_year'),
+        ]
+        indexes = [
+            models.Index(fields=['year', '-total_sales'], name='sales_rep_year_total_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.employee} - {self.year}'
+
+
+class SalesRepDailyCumulative(models.Model):
+    """
+    Running totals of the sales of each sales representative, one row per day with sales.
+
+    `cumulative_sales` and `cumulative_count` add up everything attributed to the sales representative up to and
+    including `date`, so the sales between two dates are the difference of two rows found by index lookup, whatever the
+    length of the range.
+
+    Like `SalesRepYearlySummary`, this is a derived table maintained by the signal handlers in `apps.sales.signals`
+    and rebuilt by the `rebuild_sales_rep_summary` management command.
+    """
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        related_name='daily_cumulative_sales',
+        verbose_name='sales representative',
+        db_column='EmployeeId'
+    )
+    date = models.DateField(
+        verbose_name='date',
+        db_column='Date'
+    )
+    daily_sales = models.DecimalField(
+        verbose_name='daily sales',
+        db_column='DailySales',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    daily_count = models.PositiveIntegerField(
+        verbose_name='daily invoice count',
+        db_column='DailyCount',
+        default=0
+    )
+    cumulative_sales = models.DecimalField(
+        verbose_name='cumulative sales',
+        db_column='CumulativeSales',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    cumulative_count = models.PositiveIntegerField(
+        verbose_name='cumulative invoice count',
+        db_column='CumulativeCount',
+        default=0
+    )
+
+    class Meta:
+        db_table = 'SalesRepDailyCumulative'
+        ordering = ['employee', 'date']
+        verbose_name = 'sales rep daily cumulative sales'
+        verbose_name_plural = 'sales rep daily cumulative sales'
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'date'], name='unique_sales_rep_date'),
+        ]
+        indexes = [
+            # Covering index for the range lookups, which read the last running totals before a date.
+            models.Index(
+                fields=['employee', 'date', 'cumulative_sales', 'cumulative_count'],
+                name='sales_rep_date_cumulative_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.employee} - {self.date}'
+
+
+class InvoiceRewriteCounter(models.Model):
+    """
+    Number of invoice updates and deletes, in a single row.
+
+    Written by the signal handlers in `apps.sales.signals` in the transaction of the change, and read by the in-memory
+    analytics engine of every process (`apps.sales.analytics`) to tell whether a snapshot predates a change.
+    """
+    SINGLETON_ID = 1
+
+    count = models.PositiveBigIntegerField(
+        verbose_name='invoice rewrites',
+        db_column='Count',
+        default=0
+    )
+
+    class Meta:
+        db_table = 'InvoiceRewriteCounter'
+        verbose_name = 'invoice rewrite counter'
+
+    def __str__(self):
+        return str(self.count)
+
+
+class SalesDataVersion(models.Model):
+    """
+    Version of the data the sellers reports are built from, in a single row.
+
+    Moved forward by `apps.sales.watermark.bump_sales_data_version` in the transaction of every write to the invoices,
+    their lines, the customers and the employees (from any process: web workers, management commands), and read by
+    every process for the ETag and Last-Modified of the sellers endpoints.
+    """
+    SINGLETON_ID = 1
+
+    version = models.PositiveBigIntegerField(
+        verbose_name='version',
+        db_column='Version',
+        default=0
+    )
+    modified = models.DateTimeField(
+        verbose_name='modified',
+        db_column='Modified',
+        default=timezone.now
+    )
+
+    class Meta:
+        db_table = 'SalesDataVersion'
+        verbose_name = 'sales data version'
+
+    def __str__(self):
+        return str(self.version)
+
+
+class SalesCacheGeneration(models.Model):
+    """
+    Generation of a scope of the sellers response cache (`apps.sales.cache`), e.g. a year.
+
+    Moved forward in the transaction of the writes that change the responses of the scope, from any process, and read
+    by every process to build its cache keys: the responses cached under an older generation are never read again.
+    """
+    scope = models.CharField(
+        max_length=32,
+        unique=True,
+        verbose_name='scope',
+        db_column='Scope'
+    )
+    generation = models.PositiveBigIntegerField(
+        verbose_name='generation',
+        db_column='Generation',
+        default=0
+    )
+
+    class Meta:
+        db_table = 'SalesCacheGeneration'
+        verbose_name = 'sales cache generation'
+
+    def __str__(self):
+        return f'{self.scope}: {self.generation}'
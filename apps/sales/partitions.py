@@ -0,0 +1,227 @@
+"""
+Read-side projection of the invoices for the sellers rankings, partitioned by year, read instead of `Invoice` when
+`SALES_ANALYTICS_ENGINE = 'partitions'`.
+
+Each year of invoices has a SQLite database of its own under SALES_PARTITION_DIR (`invoices-<year>.db`), holding the
+facts the rankings aggregate (invoice id, sales rep, total in cents) with a covering index on (sales rep, total). The
+partition of an invoice is chosen by `partition_path` from the year of its date (in the current time zone, as
+`Invoice.year`). A ranking of one year opens that partition only, the rankings over several years read their
+partitions in parallel threads (sqlite3 releases the GIL while a statement runs) and merge the top rows of each.
+
+`Invoice` stays the table the invoices are written to and read from: writes never touch the partitions. They are
+rebuilt only, with `python manage.py partition_invoices`, from the invoices and the sales data version
+(`apps.sales.watermark`) read in one transaction, and the version is recorded in the `VERSION` file of the directory
+once every partition is written. The rankings read the partitions while that version is the current one, and fall back
+to the SQL rankings of `apps.sales.ranking` as soon as any sales data is written, until the next rebuild.
+"""
+import os
+import re
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.core.sqlite import get_profile, pragma_statements, read_transaction
+from apps.employees.models import Employee
+from apps.sales.models import Invoice
+from apps.sales.ranking import LeaderboardRow
+from apps.sales.watermark import sales_data_version
+
+PARTITION_FILE = re.compile(r'^invoices-(\d+)\.db$')
+VERSION_FILE = 'VERSION'
+CHUNK_SIZE = 10000
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS invoice_fact (id INTEGER PRIMARY KEY, sales_rep_id INTEGER, total_cents INTEGER)',
+    'CREATE INDEX IF NOT EXISTS invoice_fact_sales_rep_idx ON invoice_fact (sales_rep_id, total_cents)',
+]
+
+# The sales reps ranked first in the partition, with their total in cents.
+TOP_SALES_REPS_SQL = """
+    SELECT sales_rep_id, total_cents FROM (
+        SELECT sales_rep_id, SUM(total_cents) AS total_cents, RANK() OVER (ORDER BY SUM(total_cents) DESC) AS rank
+        FROM invoice_fact
+        WHERE sales_rep_id IS NOT NULL
+        GROUP BY sales_rep_id
+    )
+    WHERE rank = 1
+"""
+
+YEAR_LOOKUPS = {
+    'year': lambda year, value: year == value,
+    'year__in': lambda year, value: year in value,
+    'year__gte': lambda year, value: year >= value,
+    'year__lte': lambda year, value: year <= value,
+}
+
+
+def partitions_engine_enabled() -> bool:
+    return settings.SALES_ANALYTICS_ENGINE == 'partitions'
+
+
+def get_partition_dir() -> Path:
+    return Path(settings.SALES_PARTITION_DIR)
+
+
+def partition_path(year: int, partition_dir: Path | None = None) -> Path:
+    return (partition_dir or get_partition_dir()) / f'invoices-{year}.db'
+
+
+def partition_years(partition_dir: Path | None = None) -> list[int]:
+    """
+    Returns the years that have a partition, in order.
+    """
+    partition_dir = partition_dir or get_partition_dir()
+    if not partition_dir.is_dir():
+        return []
+    return sorted(
+        int(match.group(1)) for match in map(PARTITION_FILE.match, (path.name for path in partition_dir.iterdir()))
+        if match
+    )
+
+
+def _connect(path: Path, profile: str) -> sqlite3.Connection:
+    # transactions are started explicitly
+    connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    for statement in pragma_statements(get_profile(profile)):
+        connection.execute(statement)
+    return connection
+
+
+def _open_for_write(year: int, partition_dir: Path | None = None) -> sqlite3.Connection:
+    path = partition_path(year, partition_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = _connect(path, 'serving')
+    for statement in SCHEMA:
+        connection.execute(statement)
+    # the write lock of the partition, waited for up to the busy timeout of the profile
+    connection.execute('BEGIN IMMEDIATE')
+    return connection
+
+
+def partitions_version(partition_dir: Path | None = None) -> int | None:
+    """
+    Returns the sales data version the partitions were rebuilt at, None if they never were.
+    """
+    try:
+        return int(((partition_dir or get_partition_dir()) / VERSION_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def partitions_are_current(partition_dir: Path | None = None) -> bool:
+    """
+    Whether the rankings can be read from the partitions: the engine is enabled and no sales data was written since
+    they were rebuilt.
+    """
+    return partitions_engine_enabled() and partitions_version(partition_dir) == sales_data_version()
+
+
+def _write_version(version: int, partition_dir: Path) -> None:
+    # replaced atomically, so that readers never see a partial file
+    file_descriptor, path = tempfile.mkstemp(prefix=f'.{VERSION_FILE}-', dir=partition_dir)
+    with os.fdopen(file_descriptor, 'w') as file:
+        file.write(str(version))
+    os.replace(path, partition_dir / VERSION_FILE)
+
+
+def rebuild_partition(year: int, partition_dir: Path | None = None) -> int:
+    """
+    Replaces the facts of the partition of `year` by the ones of the invoices of that year, and returns their number.
+    """
+    connection = _open_for_write(year, partition_dir)
+    try:
+        connection.execute('DELETE FROM invoice_fact')
+        invoices = (
+            Invoice.objects.filter(year=year)
+            .order_by()
+            .values_list('id', 'sales_rep_id', 'total')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        cursor = connection.executemany(
+            'INSERT INTO invoice_fact VALUES (?, ?, ?)',
+            ((invoice_id, sales_rep_id, int(total * 100)) for invoice_id, sales_rep_id, total in invoices)
+        )
+        count = cursor.rowcount
+        connection.execute('COMMIT')
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    finally:
+        connection.close()
+    return count
+
+
+def rebuild_partitions(partition_dir: Path | None = None) -> dict[int, int]:
+    """
+    Rebuilds the partitions from the invoices, emptying the partitions of years without invoices, and records the sales
+    data version they were read at. Returns the number of invoices of each year.
+
+    The invoices and the version are read in one transaction, so that the partitions are only read while they hold
+    every invoice of that version. Readers falling back to the SQL rankings meanwhile, a rebuild doesn't invalidate the
+    sellers cache.
+    """
+    partition_dir = partition_dir or get_partition_dir()
+    with read_transaction():
+        version = sales_data_version()
+        years = set(Invoice.objects.order_by().values_list('year', flat=True).distinct())
+        years.update(partition_years(partition_dir))
+        counts = {year: rebuild_partition(year, partition_dir) for year in sorted(years)}
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    _write_version(version, partition_dir)
+    return counts
+
+
+def _top_sales_reps_of_partition(year: int, partition_dir: Path) -> list[tuple[int, int, int]]:
+    connection = _connect(partition_path(year, partition_dir), 'analytics')
+    try:
+        return [(year, employee_id, cents) for employee_id, cents in connection.execute(TOP_SALES_REPS_SQL)]
+    finally:
+        connection.close()
+
+
+_executor = ThreadPoolExecutor(thread_name_prefix='invoice-partitions')
+
+
+def partitioned_top_sales_reps_per_year(
+        years_filter: dict | None = None,
+        order_by: tuple[str, ...] = ('year',)
+) -> list[LeaderboardRow]:
+    """
+    Same results as `apps.sales.ranking.top_sales_reps_per_year` while the partitions are current (see
+    `partitions_are_current`), read from the partitions of the years selected by `years_filter`: the sales reps ranked
+    first in each year, ordered by `order_by` ('year', 'total_sales' or 'sales_rep', optionally prefixed with '-').
+    """
+    for lookup in years_filter or {}:
+        if lookup not in YEAR_LOOKUPS:
+            raise ValueError(f'Unsupported years filter lookup: {lookup}')
+
+    partition_dir = get_partition_dir()
+    years = [
+        year for year in partition_years(partition_dir)
+        if all(YEAR_LOOKUPS[lookup](year, value) for lookup, value in (years_filter or {}).items())
+    ]
+    if len(years) == 1:
+        partitions = [_top_sales_reps_of_partition(years[0], partition_dir)]
+    else:
+        partitions = _executor.map(_top_sales_reps_of_partition, years, [partition_dir] * len(years))
+    top_sales_reps = [row for rows in partitions for row in rows]
+
+    names = {
+        employee_id: f'{first_name} {last_name}'
+        for employee_id, first_name, last_name in Employee.objects.filter(
+            pk__in={employee_id for _, employee_id, _ in top_sales_reps}
+        ).values_list('id', 'first_name', 'last_name')
+    }
+    rows = [
+        LeaderboardRow(year, 0, employee_id, names[employee_id], Decimal(cents).scaleb(-2), 1)
+        for year, employee_id, cents in top_sales_reps
+        # the partitions have no foreign keys: facts of an employee deleted since the rebuild
+        if employee_id in names
+    ]
+    for field in reversed(order_by):
+        rows.sort(key=lambda row: getattr(row, field.lstrip('-')), reverse=field.startswith('-'))
+    return rows
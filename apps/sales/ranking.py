@@ -0,0 +1,205 @@
+from datetime import date
+from decimal import Decimal
+from typing import Iterator, NamedTuple
+
+from django.db import connections, router
+from django.db.models import F, QuerySet, Sum, Value, Window
+from django.db.models.functions import Concat, Rank, Round
+
+from apps.sales.models import Invoice, SalesRepDailyCumulative, SalesRepYearlySummary
+
+CENT = Decimal('0.01')
+
+# Column of Invoice holding the sub-period of a year, for each period a leaderboard can be computed over.
+PERIOD_COLUMNS = {
+    'year': None,
+    'quarter': 'quarter',
+    'month': 'month',
+}
+
+
+class LeaderboardRow(NamedTuple):
+    year: int
+    sub_period: int
+    employee_id: int
+    sales_rep: str
+    total_sales: Decimal
+    rank: int
+
+    @property
+    def keyset(self) -> tuple:
+        return self.year, self.sub_period, self.total_sales, self.employee_id
+
+
+class SalesRepTotal(NamedTuple):
+    employee_id: int
+    sales_rep: str
+    total_sales: Decimal
+    invoice_count: int
+    rank: int
+
+
+def top_sales_reps_per_year(years_filter: dict | None = None, order_by: tuple[str, ...] = ('year',)) -> QuerySet:
+    """
+    Returns the sales representatives ranked first in each year, all of them when several are tied at the top value.
+
+    The ranking is done by the database with a window function and the name is concatenated in SQL as well, so the
+    result is produced by exactly one statement. Each row has `year`, `total_sales`, `sales_rep` (the sales
+    representative's name) and `rank` (always 1).
+
+    Parameters:
+        - years_filter (dict): Lookups on `year` restricting the years ranked, e.g. {'year__in': [2009, 2010]}.
+        - order_by (tuple): Ordering of the rows. Any of 'year', 'total_sales' and 'sales_rep', optionally prefixed
+        with '-'.
+    """
+    return (
+        SalesRepYearlySummary.objects.filter(**(years_filter or {}))
+        .annotate(rank=Window(expression=Rank(), partition_by=[F('year')], order_by=F('total_sales').desc()))
+        .filter(rank=1)
+        .annotate(sales_rep=Concat(F('employee__first_name'), Value(' '), F('employee__last_name')))
+        .order_by(*order_by)
+    )
+
+
+def top_sales_reps_between(date_from: date, date_to: date) -> list[SalesRepTotal]:
+    """
+    Returns the sales representatives with the highest sales between two dates (both included), all of them when
+    several are tied at the top value, ordered by name.
+
+    The sales of each employee in the range are the difference of the running totals of `SalesRepDailyCumulative` at
+    `date_to` and just before `date_from`, each read with one index lookup, so the cost depends on the number of
+    employees and not on the number of invoices or the length of the range. The statement is written in SQL: built
+    with the ORM, its correlated subqueries took several times longer to compile than to run.
+    """
+    running_total = """
+        (SELECT "{column}" FROM "SalesRepDailyCumulative" running_total
+         WHERE running_total."EmployeeId" = "Employee"."EmployeeId" AND running_total."Date" {operator} %s
+         ORDER BY running_total."Date" DESC LIMIT 1)
+    """
+    sql = f"""
+        SELECT employee_id, sales_rep, total_sales, invoice_count, rank FROM (
+            SELECT *, RANK() OVER (ORDER BY total_sales DESC) AS rank FROM (
+                SELECT
+                    "Employee"."EmployeeId" AS employee_id,
+                    "Employee"."FirstName" || ' ' || "Employee"."LastName" AS sales_rep,
+                    ROUND(
+                        COALESCE({running_total.format(column='CumulativeSales', operator='<=')}, 0)
+                        - COALESCE({running_total.format(column='CumulativeSales', operator='<')}, 0),
+                        2
+                    ) AS total_sales,
+                    COALESCE({running_total.format(column='CumulativeCount', operator='<=')}, 0)
+                    - COALESCE({running_total.format(column='CumulativeCount', operator='<')}, 0) AS invoice_count
+                FROM "Employee"
+            ) range_sales
+            WHERE invoice_count > 0
+        ) ranked
+        WHERE rank = 1
+        ORDER BY sales_rep
+    """
+    date_from, date_to = date_from.isoformat(), date_to.isoformat()
+    params = (date_to, date_from, date_to, date_from)
+
+    with connections[router.db_for_read(SalesRepDailyCumulative)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            SalesRepTotal(employee_id, sales_rep, Decimal(str(total_sales)).quantize(CENT), invoice_count, rank)
+            for employee_id, sales_rep, total_sales, invoice_count, rank in cursor.fetchall()
+        ]
+
+
+def top_sales_reps_per_period(
+        period: str = 'year',
+        top: int = 1,
+        years_filter: dict | None = None,
+        after: tuple | None = None,
+        limit: int | None = None
+) -> list[LeaderboardRow]:
+    """
+    Returns the rows of `iter_top_sales_reps_per_period` as a list.
+    """
+    return list(iter_top_sales_reps_per_period(period, top, years_filter, after, limit))
+
+
+def iter_top_sales_reps_per_period(
+        period: str = 'year',
+        top: int = 1,
+        years_filter: dict | None = None,
+        after: tuple | None = None,
+        limit: int | None = None,
+        chunk_size: int = 2000
+) -> Iterator[LeaderboardRow]:
+    """
+    Yields the `top` sales representatives of each period (year, quarter or month), more when several are tied at the
+    last rank, ordered by period, descending total sales and employee id.
+
+    Pages are cut with a keyset rather than an OFFSET: `after` is the `keyset` of the last row of the previous page,
+    i.e. (year, sub_period, total_sales, employee_id), and only rows strictly after it are returned. Periods before
+    the keyset's year are excluded before aggregating, so the query cost does not grow with the page depth.
+
+    Parameters:
+        - period (str): One of 'year', 'quarter' or 'month'. The `sub_period` of the rows is 0 for years.
+        - top (int): Number of ranks to keep per period.
+        - years_filter (dict): Lookups on `year` restricting the periods ranked, e.g. {'year__gte': 2010}.
+        - after (tuple): Keyset to start after.
+        - limit (int): Maximum number of rows returned.
+        - chunk_size (int): Number of rows fetched from the database at a time.
+    """
+    period_column = PERIOD_COLUMNS[period]
+    invoices = Invoice.objects.filter(sales_rep__isnull=False, **(years_filter or {}))
+    if after:
+        invoices = invoices.filter(year__gte=after[0])
+
+    period_sales = (
+        invoices.values(
+            'year',
+            sub_period=F(period_column) if period_column else Value(0),
+            employee_id=F('sales_rep'),
+            sales_rep_name=Concat(F('sales_rep__first_name'), Value(' '), F('sales_rep__last_name')),
+        )
+        .annotate(total_sales=Round(Sum('total'), 2))
+        .order_by()
+    )
+    period_sales_sql, params = period_sales.query.get_compiler(using=period_sales.db).as_sql()
+
+    # The keyset condition has to apply to the ranked rows. Django places conditions on aggregates before the window
+    # function is evaluated (and rejects them combined with OR), so the ranking is done in an outer statement.
+    sql = f"""
+        SELECT year, sub_period, employee_id, sales_rep_name, total_sales, rank FROM (
+            SELECT *, RANK() OVER (PARTITION BY year, sub_period ORDER BY total_sales DESC) AS rank
+            FROM ({period_sales_sql}) period_sales
+        ) ranked
+        WHERE rank <= %s
+    """
+    params = (*params, top)
+
+    if after:
+        year, sub_period, total_sales, employee_id = after
+        sql += """
+            AND (
+                year > %s
+                OR (year = %s AND sub_period > %s)
+                OR (year = %s AND sub_period = %s AND total_sales < %s)
+                OR (year = %s AND sub_period = %s AND total_sales = %s AND employee_id > %s)
+            )
+        """
+        total_sales = float(total_sales)
+        params = (
+            *params,
+            year,
+            year, sub_period,
+            year, sub_period, total_sales,
+            year, sub_period, total_sales, employee_id,
+        )
+
+    sql += ' ORDER BY year, sub_period, total_sales DESC, employee_id'
+    if limit is not None:
+        sql += ' LIMIT %s'
+        params = (*params, limit)
+
+    with connections[period_sales.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            for year, sub_period, employee_id, sales_rep, total_sales, rank in rows:
+                yield LeaderboardRow(
+                    year, sub_period, employee_id, sales_rep, Decimal(str(total_sales)).quantize(CENT), rank
+                )
@@ -0,0 +1,231 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Round
+
+from apps.sales.cache import ALL_SCOPE, invalidate
+from apps.sales.models import Invoice, SalesRepDailyCumulative, SalesRepYearlySummary, local_date
+from apps.sales.watermark import bump_sales_data_version
+
+
+def apply_sales_rep_delta(employee_id: int | None, year: int, total: Decimal, count: int) -> None:
+    """
+    Adds `total` and `count` to the (employee, year) summary row, creating it if needed and removing it once it no
+    longer accounts for any invoice.
+
+    Totals are rounded to cents on every write so that equal amounts are always stored as equal values, which keeps
+    ties between sales representatives exact.
+    """
+    if employee_id is None or (not total and not count):
+        return
+
+    rows = SalesRepYearlySummary.objects.filter(employee_id=employee_id, year=year)
+
+    with transaction.atomic():
+        updated = rows.update(
+            total_sales=Round(F('total_sales') + total, 2),
+            invoice_count=F('invoice_count') + count
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    SalesRepYearlySummary.objects.create(
+                        employee_id=employee_id, year=year, total_sales=total, invoice_count=count
+                    )
+            except IntegrityError:
+                # another writer created the row in the meantime
+                rows.update(
+                    total_sales=Round(F('total_sales') + total, 2),
+                    invoice_count=F('invoice_count') + count
+                )
+
+        rows.filter(invoice_count__lte=0).delete()
+
+
+def rebuild_sales_rep_summary() -> int:
+    """
+    Rebuilds the whole summary table from the invoices and returns the number of rows written.
+    """
+    per_rep_and_year = (
+        Invoice.objects.filter(sales_rep__isnull=False)
+        .values('sales_rep', 'year')
+        .annotate(total_sales=Round(Sum('total'), 2), invoice_count=Count('id'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        SalesRepYearlySummary.objects.all().delete()
+        summaries = SalesRepYearlySummary.objects.bulk_create(
+            SalesRepYearlySummary(
+                employee_id=row['sales_rep'],
+                year=row['year'],
+                total_sales=row['total_sales'],
+                invoice_count=row['invoice_count'],
+            )
+            for row in per_rep_and_year
+        )
+        # the rankings read the table, which may have been repaired
+        invalidate(ALL_SCOPE)
+        bump_sales_data_version()
+
+    return len(summaries)
+
+
+def apply_sales_rep_daily_delta(employee_id: int | None, sales_date: date, total: Decimal, count: int) -> None:
+    """
+    Adds `total` and `count` to the sales of the employee on `sales_date`, and to the running totals of that day and of
+    every later day of the employee.
+
+    New invoices are usually the most recent ones, so few rows follow them; a backdated invoice rewrites the running
+    totals of every later day with sales of its sales representative.
+    """
+    if employee_id is None or (not total and not count):
+        return
+
+    rows = SalesRepDailyCumulative.objects.filter(employee_id=employee_id)
+    day = rows.filter(date=sales_date)
+
+    with transaction.atomic():
+        if not day.exists():
+            previous = rows.filter(date__lt=sales_date).order_by('-date').first()
+            try:
+                with transaction.atomic():
+                    SalesRepDailyCumulative.objects.create(
+                        employee_id=employee_id,
+                        date=sales_date,
+                        cumulative_sales=previous.cumulative_sales if previous else 0,
+                        cumulative_count=previous.cumulative_count if previous else 0,
+                    )
+            except IntegrityError:
+                # another writer created the row in the meantime
+                pass
+
+        day.update(daily_sales=Round(F('daily_sales') + total, 2), daily_count=F('daily_count') + count)
+        rows.filter(date__gte=sales_date).update(
+            cumulative_sales=Round(F('cumulative_sales') + total, 2),
+            cumulative_count=F('cumulative_count') + count
+        )
+
+        # the running totals of the following days already account for the day, so it can go
+        day.filter(daily_count__lte=0).delete()
+
+
+def apply_sales_rep_daily_deltas(employee_id: int | None, deltas: dict[date, tuple[Decimal, int]]) -> None:
+    """
+    Same as calling `apply_sales_rep_daily_delta` for each sales date: (total, count) of `deltas`, for writes of many
+    invoices at once. The days and running totals of the employee are updated with a fixed number of queries, whatever
+    the number of days.
+    """
+    deltas = {sales_date: delta for sales_date, delta in deltas.items() if delta[0] or delta[1]}
+    if employee_id is None or not deltas:
+        return
+
+    dates = sorted(deltas)
+    rows = SalesRepDailyCumulative.objects.filter(employee_id=employee_id)
+
+    with transaction.atomic():
+        # a missing day starts from the running totals of the day before it, as in `apply_sales_rep_daily_delta`
+        cumulative = (
+            rows.filter(date__lt=dates[0]).order_by('-date').values_list('cumulative_sales', 'cumulative_count').first()
+            or (Decimal(0), 0)
+        )
+        existing = rows.filter(date__range=(dates[0], dates[-1])).order_by('date').values_list(
+            'date', 'cumulative_sales', 'cumulative_count'
+        )
+        existing_cumulative = {row_date: (sales, count) for row_date, sales, count in existing}
+
+        missing_days = []
+        existing_dates = iter(sorted(existing_cumulative))
+        next_existing = next(existing_dates, None)
+        for sales_date in dates:
+            while next_existing is not None and next_existing <= sales_date:
+                cumulative = existing_cumulative[next_existing]
+                next_existing = next(existing_dates, None)
+            if sales_date not in existing_cumulative:
+                missing_days.append(SalesRepDailyCumulative(
+                    employee_id=employee_id,
+                    date=sales_date,
+                    cumulative_sales=cumulative[0],
+                    cumulative_count=cumulative[1],
+                ))
+        # a day created by another writer in the meantime already holds its running totals
+        SalesRepDailyCumulative.objects.bulk_create(missing_days, ignore_conflicts=True)
+
+        rows.filter(date__in=dates).update(
+            daily_sales=Round(F('daily_sales') + _per_date(deltas, 0, DecimalField()), 2),
+            daily_count=F('daily_count') + _per_date(deltas, 1, IntegerField()),
+        )
+
+        # every day from the first one gets the deltas of the days up to it
+        running_totals = {}
+        running_total = (Decimal(0), 0)
+        for sales_date in dates:
+            running_total = (running_total[0] + deltas[sales_date][0], running_total[1] + deltas[sales_date][1])
+            running_totals[sales_date] = running_total
+        rows.filter(date__gte=dates[0]).update(
+            cumulative_sales=Round(F('cumulative_sales') + _up_to_date(running_totals, 0, DecimalField()), 2),
+            cumulative_count=F('cumulative_count') + _up_to_date(running_totals, 1, IntegerField()),
+        )
+
+        rows.filter(date__in=dates, daily_count__lte=0).delete()
+
+
+def _per_date(values: dict[date, tuple], position: int, output_field) -> Case:
+    return Case(
+        *(When(date=value_date, then=Value(value[position])) for value_date, value in values.items()),
+        output_field=output_field,
+    )
+
+
+def _up_to_date(values: dict[date, tuple], position: int, output_field) -> Case:
+    # the value of the latest date on or before the row's
+    return Case(
+        *(
+            When(date__gte=value_date, then=Value(values[value_date][position]))
+            for value_date in sorted(values, reverse=True)
+        ),
+        output_field=output_field,
+    )
+
+
+def rebuild_sales_rep_daily_cumulative() -> int:
+    """
+    Rebuilds the whole daily running totals table from the invoices and returns the number of rows written.
+    """
+    invoices = (
+        Invoice.objects.filter(sales_rep__isnull=False)
+        .order_by('sales_rep', 'invoice_date')
+        .values_list('sales_rep', 'invoice_date', 'total')
+    )
+
+    rows = []
+    for employee_id, invoice_date, total in invoices.iterator():
+        sales_date = local_date(invoice_date)
+        if rows and rows[-1].employee_id == employee_id:
+            row = rows[-1]
+            if row.date != sales_date:
+                row = SalesRepDailyCumulative(
+                    employee_id=employee_id,
+                    date=sales_date,
+                    cumulative_sales=row.cumulative_sales,
+                    cumulative_count=row.cumulative_count,
+                )
+                rows.append(row)
+        else:
+            row = SalesRepDailyCumulative(employee_id=employee_id, date=sales_date)
+            rows.append(row)
+
+        row.daily_sales += total
+        row.daily_count += 1
+        row.cumulative_sales += total
+        row.cumulative_count += 1
+
+    with transaction.atomic():
+        SalesRepDailyCumulative.objects.all().delete()
+        SalesRepDailyCumulative.objects.bulk_create(rows, batch_size=1000)
+        invalidate(ALL_SCOPE)
+        bump_sales_data_version()
+
+    return len(rows)
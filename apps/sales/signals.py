@@ -0,0 +1,114 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.bulk import post_bulk_upsert
+from apps.core.replica import replica_refreshed
+from apps.customers.models import Customer
+from apps.employees.models import Employee
+from apps.sales.analytics import bump_invoice_rewrites
+from apps.sales.cache import ALL_SCOPE, OVERALL_SCOPE, invalidate, year_scope
+from apps.sales.models import Invoice, InvoiceLine, local_date
+from apps.sales.rollups import apply_sales_rep_daily_delta, apply_sales_rep_delta
+from apps.sales.watermark import bump_sales_data_version
+
+
+@receiver(pre_save, sender=Invoice)
+def remember_previous_invoice_state(sender, instance: Invoice, raw: bool = False, **kwargs) -> None:
+    # Keep what the stored row contributed to the summaries, so that post_save can take it back out.
+    instance._previous_rollup_state = None
+    if raw or instance.pk is None:
+        return
+
+    previous = (
+        Invoice.objects.filter(pk=instance.pk)
+        .values_list('sales_rep_id', 'year', 'invoice_date', 'total')
+        .first()
+    )
+    if previous:
+        instance._previous_rollup_state = previous
+
+
+@receiver(post_save, sender=Invoice)
+def update_summary_on_invoice_save(sender, instance: Invoice, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+
+    years = {instance.year}
+    previous = getattr(instance, '_previous_rollup_state', None)
+    if previous:
+        employee_id, year, invoice_date, total = previous
+        apply_sales_rep_delta(employee_id, year, -total, -1)
+        apply_sales_rep_daily_delta(employee_id, local_date(invoice_date), -total, -1)
+        years.add(year)
+        bump_invoice_rewrites()
+
+    apply_sales_rep_delta(instance.sales_rep_id, instance.year, instance.total, 1)
+    apply_sales_rep_daily_delta(instance.sales_rep_id, instance.sales_date, instance.total, 1)
+    invalidate(OVERALL_SCOPE, *(year_scope(year) for year in years))
+
+
+@receiver(post_delete, sender=Invoice)
+def update_summary_on_invoice_delete(sender, instance: Invoice, **kwargs) -> None:
+    apply_sales_rep_delta(instance.sales_rep_id, instance.year, -instance.total, -1)
+    apply_sales_rep_daily_delta(instance.sales_rep_id, instance.sales_date, -instance.total, -1)
+    invalidate(OVERALL_SCOPE, year_scope(instance.year))
+    bump_invoice_rewrites()
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_employee_name(sender, instance: Employee, raw: bool = False, **kwargs) -> None:
+    instance._previous_name = None
+    if raw or instance.pk is None:
+        return
+
+    instance._previous_name = (
+        Employee.objects.filter(pk=instance.pk)
+        .values_list('first_name', 'last_name')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Employee)
+def invalidate_cache_on_employee_rename(sender, instance: Employee, raw: bool = False, **kwargs) -> None:
+    # Employees only show up in the sellers responses by name.
+    previous_name = getattr(instance, '_previous_name', None)
+    if previous_name and previous_name != (instance.first_name, instance.last_name):
+        invalidate(ALL_SCOPE)
+
+
+@receiver(post_delete, sender=Employee)
+def invalidate_cache_on_employee_delete(sender, instance: Employee, **kwargs) -> None:
+    invalidate(ALL_SCOPE)
+
+
+@receiver(post_bulk_upsert, sender=Employee)
+def invalidate_cache_on_employee_bulk_upsert(sender, updated_pks: set, **kwargs) -> None:
+    # the replaced employees may have been renamed
+    if updated_pks:
+        invalidate(ALL_SCOPE)
+
+
+@receiver(replica_refreshed)
+def invalidate_cache_on_replica_refresh(sender, **kwargs) -> None:
+    # the reports read the replica, their results change when it is refreshed rather than when the data is written
+    invalidate(ALL_SCOPE)
+    bump_sales_data_version()
+
+
+def bump_sales_data_version_on_write(sender, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        bump_sales_data_version()
+
+
+for model in (Invoice, InvoiceLine, Customer, Employee):
+    post_save.connect(
+        bump_sales_data_version_on_write, sender=model, dispatch_uid=f'sales_data_version_save_{model.__name__}'
+    )
+    post_delete.connect(
+        bump_sales_data_version_on_write, sender=model, dispatch_uid=f'sales_data_version_delete_{model.__name__}'
+    )
+
+for model in (Customer, Employee):
+    post_bulk_upsert.connect(
+        bump_sales_data_version_on_write, sender=model, dispatch_uid=f'sales_data_version_bulk_upsert_{model.__name__}'
+    )
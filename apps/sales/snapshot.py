@@ -0,0 +1,281 @@
+"""
+Versioned columnar snapshots of the sales facts, shared by the worker processes through memory mapping.
+
+A snapshot is a directory of `.npy` files, one per column, written by the `write_sales_snapshot` management command to
+SALES_SNAPSHOT_DIR/<version>/. The `CURRENT` file of SALES_SNAPSHOT_DIR names the snapshot in use and is only replaced
+(atomically, with os.replace) once the new snapshot is complete. Readers open the columns with
+`numpy.load(mmap_mode='r')`, so the processes share one page cache copy, and pick up a new snapshot on their next use,
+without restart. A process keeps reading the files of the snapshot it mapped until it switches, even if they are
+removed in the meantime.
+"""
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.core.sqlite import read_transaction
+from apps.customers.models import Customer
+from apps.music.models import Track
+from apps.sales.models import Invoice, InvoiceLine, local_date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Stored for missing foreign keys.
+NO_ID = -1
+CHUNK_SIZE = 10000
+
+
+class InvoiceColumns(NamedTuple):
+    ids: 'np.ndarray'
+    # days since 1970-01-01 of the invoice date in the current time zone
+    days: 'np.ndarray'
+    cents: 'np.ndarray'
+    customer_ids: 'np.ndarray'
+    sales_rep_ids: 'np.ndarray'
+    # date parts of `days`
+    years: 'np.ndarray'
+    months: 'np.ndarray'
+
+
+class InvoiceLineColumns(NamedTuple):
+    ids: 'np.ndarray'
+    invoice_ids: 'np.ndarray'
+    track_ids: 'np.ndarray'
+    unit_price_cents: 'np.ndarray'
+    quantities: 'np.ndarray'
+
+
+class CustomerColumns(NamedTuple):
+    ids: 'np.ndarray'
+    support_rep_ids: 'np.ndarray'
+
+
+class TrackColumns(NamedTuple):
+    ids: 'np.ndarray'
+    album_ids: 'np.ndarray'
+    genre_ids: 'np.ndarray'
+
+
+INVOICE_DTYPES = InvoiceColumns(
+    ids='int64', days='int32', cents='int64', customer_ids='int32', sales_rep_ids='int32', years='int16', months='int8'
+)
+INVOICE_LINE_DTYPES = InvoiceLineColumns(
+    ids='int64', invoice_ids='int64', track_ids='int32', unit_price_cents='int32', quantities='int32'
+)
+CUSTOMER_DTYPES = CustomerColumns(ids='int32', support_rep_ids='int32')
+TRACK_DTYPES = TrackColumns(ids='int32', album_ids='int32', genre_ids='int32')
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImproperlyConfigured(
+            'The sales analytics engine and snapshots require NumPy (requirements/analytics.txt).'
+        )
+
+
+def empty_columns(columns_class: type, dtypes: NamedTuple) -> NamedTuple:
+    return columns_class(*(np.empty(0, dtype=dtype) for dtype in dtypes))
+
+
+def _ids_or_missing(values) -> list[int]:
+    return [NO_ID if value is None else value for value in values]
+
+
+def _cents(values) -> list[int]:
+    return [int(value * 100) for value in values]
+
+
+def invoice_columns(rows: list[tuple]) -> InvoiceColumns:
+    """
+    Converts (id, invoice_date, total, customer_id, sales_rep_id) rows to columns.
+    """
+    if not rows:
+        return empty_columns(InvoiceColumns, INVOICE_DTYPES)
+
+    ids, invoice_dates, totals, customer_ids, sales_rep_ids = zip(*rows)
+    days = np.array([local_date(value).toordinal() - EPOCH_ORDINAL for value in invoice_dates])
+    dates = days.astype('datetime64[D]')
+
+    columns = InvoiceColumns(
+        ids=np.array(ids),
+        days=days,
+        cents=np.array(_cents(totals)),
+        customer_ids=np.array(_ids_or_missing(customer_ids)),
+        sales_rep_ids=np.array(_ids_or_missing(sales_rep_ids)),
+        years=dates.astype('datetime64[Y]').astype(np.int64) + 1970,
+        months=dates.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+    )
+    return InvoiceColumns(*(column.astype(dtype) for column, dtype in zip(columns, INVOICE_DTYPES)))
+
+
+def invoice_line_columns(rows: list[tuple]) -> InvoiceLineColumns:
+    """
+    Converts (id, invoice_id, track_id, unit_price, quantity) rows to columns.
+    """
+    if not rows:
+        return empty_columns(InvoiceLineColumns, INVOICE_LINE_DTYPES)
+
+    ids, invoice_ids, track_ids, unit_prices, quantities = zip(*rows)
+    columns = (ids, invoice_ids, track_ids, _cents(unit_prices), quantities)
+    return InvoiceLineColumns(*(np.array(column, dtype=dtype) for column, dtype in zip(columns, INVOICE_LINE_DTYPES)))
+
+
+def customer_columns(rows: list[tuple]) -> CustomerColumns:
+    """
+    Converts (id, support_representative_id) rows to columns.
+    """
+    if not rows:
+        return empty_columns(CustomerColumns, CUSTOMER_DTYPES)
+
+    ids, support_rep_ids = zip(*rows)
+    columns = (ids, _ids_or_missing(support_rep_ids))
+    return CustomerColumns(*(np.array(column, dtype=dtype) for column, dtype in zip(columns, CUSTOMER_DTYPES)))
+
+
+def track_columns(rows: list[tuple]) -> TrackColumns:
+    """
+    Converts (id, album_id, genre_id) rows to columns.
+    """
+    if not rows:
+        return empty_columns(TrackColumns, TRACK_DTYPES)
+
+    ids, album_ids, genre_ids = zip(*rows)
+    columns = (ids, _ids_or_missing(album_ids), _ids_or_missing(genre_ids))
+    return TrackColumns(*(np.array(column, dtype=dtype) for column, dtype in zip(columns, TRACK_DTYPES)))
+
+
+# name of the table in the snapshot: (model, fields read, converter to columns, columns class)
+TABLES = {
+    'invoices': (
+        Invoice, ('id', 'invoice_date', 'total', 'customer_id', 'sales_rep_id'), invoice_columns, InvoiceColumns
+    ),
+    'invoice_lines': (
+        InvoiceLine, ('id', 'invoice_id', 'track_id', 'unit_price', 'quantity'), invoice_line_columns,
+        InvoiceLineColumns
+    ),
+    'customers': (Customer, ('id', 'support_representative_id'), customer_columns, CustomerColumns),
+    'tracks': (Track, ('id', 'album_id', 'genre_id'), track_columns, TrackColumns),
+}
+
+
+class Snapshot(NamedTuple):
+    version: str
+    # value of `apps.sales.analytics.invoice_rewrites` when the snapshot was written
+    invoice_rewrites: int
+    invoices: InvoiceColumns
+    invoice_lines: InvoiceLineColumns
+    customers: CustomerColumns
+    tracks: TrackColumns
+
+
+def get_snapshot_dir() -> Path:
+    return Path(settings.SALES_SNAPSHOT_DIR)
+
+
+def _read_table(model, fields: tuple[str, ...], to_columns) -> NamedTuple:
+    # keyset chunks, so that the rows are never all held as Python objects at once
+    chunks = []
+    last_id = 0
+    while True:
+        rows = list(model.objects.filter(pk__gt=last_id).order_by('pk').values_list(*fields)[:CHUNK_SIZE])
+        if not rows:
+            break
+        chunks.append(to_columns(rows))
+        last_id = rows[-1][0]
+
+    if not chunks:
+        return to_columns([])
+    return type(chunks[0])(*(np.concatenate(columns) for columns in zip(*chunks)))
+
+
+def write_snapshot(invoice_rewrites: int, snapshot_dir: Path | None = None) -> str:
+    """
+    Writes a new snapshot, makes it the current one and returns its version.
+
+    `invoice_rewrites` must be read before the data: if invoices are updated or deleted while the snapshot is written,
+    readers see that the counter moved and don't use it.
+    """
+    require_numpy()
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    # written under a temporary name, so that an interrupted run never leaves a partial snapshot behind a version name
+    working_dir = Path(tempfile.mkdtemp(prefix=f'.{version}-', dir=snapshot_dir))
+
+    row_counts = {}
+    # one transaction, so that the tables are read from the same state of the database
+    with read_transaction():
+        for table, (model, fields, to_columns, columns_class) in TABLES.items():
+            columns = _read_table(model, fields, to_columns)
+            for name, column in zip(columns_class._fields, columns):
+                np.save(working_dir / f'{table}.{name}.npy', column)
+            row_counts[table] = len(columns[0])
+
+    manifest = {'version': version, 'invoice_rewrites': invoice_rewrites, 'row_counts': row_counts}
+    (working_dir / MANIFEST_FILE).write_text(json.dumps(manifest))
+    working_dir.rename(snapshot_dir / version)
+
+    current_file = Path(tempfile.mkstemp(prefix='.CURRENT-', dir=snapshot_dir)[1])
+    current_file.write_text(version)
+    os.replace(current_file, snapshot_dir / CURRENT_FILE)
+
+    return version
+
+
+def current_version(snapshot_dir: Path | None = None) -> str | None:
+    try:
+        return ((snapshot_dir or get_snapshot_dir()) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_snapshot(version: str, snapshot_dir: Path | None = None) -> Snapshot:
+    """
+    Memory maps the columns of a snapshot, read only.
+    """
+    require_numpy()
+    version_dir = (snapshot_dir or get_snapshot_dir()) / version
+    manifest = json.loads((version_dir / MANIFEST_FILE).read_text())
+
+    tables = {
+        table: columns_class(*(
+            np.load(version_dir / f'{table}.{name}.npy', mmap_mode='r') for name in columns_class._fields
+        ))
+        for table, (model, fields, to_columns, columns_class) in TABLES.items()
+    }
+    return Snapshot(version=version, invoice_rewrites=manifest['invoice_rewrites'], **tables)
+
+
+def remove_old_snapshots(keep: int, snapshot_dir: Path | None = None) -> list[str]:
+    """
+    Removes all but the `keep` most recent snapshots (never the current one) and returns the versions removed.
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    current = current_version(snapshot_dir)
+    versions = sorted(
+        (path.name for path in snapshot_dir.iterdir() if path.is_dir() and not path.name.startswith('.')),
+        reverse=True
+    )
+
+    removed = []
+    for version in versions[keep:]:
+        if version == current:
+            continue
+        for path in (snapshot_dir / version).iterdir():
+            path.unlink()
+        (snapshot_dir / version).rmdir()
+        removed.append(version)
+
+    return removed
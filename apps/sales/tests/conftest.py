@@ -1,8 +1,12 @@
+import pytest
+
 from pytest_factoryboy import register
 
 from apps.customers.factories import CustomerFactory
 from apps.employees.factories import EmployeeFactory
 from apps.music.factories import TrackFactory
+from apps.music.reference import clear_reference_data
+from apps.sales.cache import get_sellers_cache
 from apps.sales.factories import (
     InvoiceFactory,
     InvoiceLineFactory
@@ -13,3 +17,41 @@ register(EmployeeFactory)
 register(TrackFactory)
 register(InvoiceFactory)
 register(InvoiceLineFactory)
+
+
+@pytest.fixture(autouse=True)
+def sellers_cache():
+    # The sellers cache outlives the test database, start every test from an empty one.
+    cache = get_sellers_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def sales_snapshot_dir(settings, tmp_path):
+    # Never read or write the snapshots of the project directory.
+    settings.SALES_SNAPSHOT_DIR = tmp_path / 'snapshots'
+    return settings.SALES_SNAPSHOT_DIR
+
+
+@pytest.fixture(autouse=True)
+def analytics_replica_path(settings, tmp_path):
+    # The reports read the test database, unless a test writes a replica here.
+    settings.ANALYTICS_REPLICA_PATH = tmp_path / 'analytics.db'
+    return settings.ANALYTICS_REPLICA_PATH
+
+
+@pytest.fixture(autouse=True)
+def sales_partition_dir(settings, tmp_path):
+    # Never read or write the invoice partitions of the project directory.
+    settings.SALES_PARTITION_DIR = tmp_path / 'partitions'
+    return settings.SALES_PARTITION_DIR
+
+
+@pytest.fixture(autouse=True)
+def music_reference_data():
+    # The reference data loaded by the process outlives the test database.
+    clear_reference_data()
+    yield
+    clear_reference_data()
@@ -0,0 +1,98 @@
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sales.analytics import InvoiceFacts
+from apps.sales.ranking import top_sales_reps_per_period
+
+pytest.importorskip('numpy')
+
+pytestmark = pytest.mark.django_db
+
+
+class TestInvoiceFacts:
+    client = APIClient()
+
+    @pytest.fixture
+    def sales(self, invoice_factory, customer_factory, employee_factory):
+        employees = [
+            employee_factory(first_name='Josh', last_name='Smith'),
+            employee_factory(first_name='Maria', last_name='Jones'),
+            employee_factory(first_name='Stan', last_name='Miller'),
+        ]
+        customers = [customer_factory(support_representative=employee) for employee in employees]
+
+        # (year, month, customer index, total), with ties in 2023-01 and 2023-Q1
+        sales = [
+            (2022, 12, 0, '0.99'), (2022, 12, 1, '1.98'),
+            (2023, 1, 0, '100.00'), (2023, 1, 1, '300.00'), (2023, 1, 2, '300.00'),
+            (2023, 2, 0, '200.10'), (2023, 2, 1, '0.10'),
+            (2023, 5, 2, '70.00'),
+            (2024, 1, 0, '10.00'), (2024, 1, 1, '30.00'), (2024, 1, 2, '20.00'),
+        ]
+        for year, month, customer, total in sales:
+            invoice_factory(
+                invoice_date=timezone.make_aware(datetime(year, month, 15, 10, 30)),
+                customer=customers[customer],
+                total=Decimal(total)
+            )
+        invoice_factory(
+            invoice_date=timezone.make_aware(datetime(2023, 1, 15, 10, 30)), customer=None, total=Decimal('999.00')
+        )
+
+        return customers
+
+    @pytest.mark.parametrize('period', ['year', 'quarter', 'month'])
+    @pytest.mark.parametrize('top', [1, 2, 3])
+    @pytest.mark.parametrize('years_filter', [None, {'year__in': [2022, 2024]}, {'year__gte': 2023, 'year__lte': 2023}])
+    def test_matches_sql_ranking(self, sales, period, top, years_filter):
+        assert InvoiceFacts().top_sales_reps_per_period(period, top, years_filter) == top_sales_reps_per_period(
+            period, top, years_filter
+        )
+
+    def test_refresh_only_reads_new_invoices(self, sales, invoice_factory, django_assert_num_queries):
+        facts = InvoiceFacts()
+        facts.refresh()
+        loaded_ids = facts.columns.ids.tolist()
+
+        invoice = invoice_factory(
+            invoice_date=timezone.make_aware(datetime(2024, 2, 1, 10, 30)), customer=sales[2], total=Decimal('50.00')
+        )
+        # the invoice rewrite counter, then the new invoices
+        with django_assert_num_queries(2):
+            snapshot_columns, columns = facts.refresh()
+
+        assert columns.ids.tolist() == [*loaded_ids, invoice.id]
+        assert facts.top_sales_reps_per_year({'year': 2024})[0].sales_rep == 'Stan Miller'
+
+    def test_invoice_update_and_delete_reload_the_facts(self, sales, invoice_factory):
+        facts = InvoiceFacts()
+        invoice = invoice_factory(
+            invoice_date=timezone.make_aware(datetime(2024, 2, 1, 10, 30)), customer=sales[2], total=Decimal('50.00')
+        )
+        facts.refresh()
+
+        invoice.total = Decimal('1.00')
+        invoice.save()
+        assert facts.top_sales_reps_per_year({'year': 2024})[0].sales_rep == 'Maria Jones'
+
+        invoice.delete()
+        facts.refresh()
+        assert len(facts) == 12
+
+    @pytest.mark.parametrize('query', [
+        '', '?order_by=total_sales&order=desc', '?order_by=sales_rep', '?years=2022,2024&order_by=year&order=desc',
+    ])
+    def test_overall_endpoint_with_numpy_engine(self, sales, settings, sellers_cache, query):
+        url = f"{reverse('api-top-sales-reps-overall')}{query}"
+        sql_response = self.client.get(url).json()
+        sellers_cache.clear()
+
+        settings.SALES_ANALYTICS_ENGINE = 'numpy'
+        numpy_response = self.client.get(url).json()
+
+        assert numpy_response == sql_response
@@ -0,0 +1,81 @@
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.replica import refresh_replica, replica_refreshed
+from apps.sales.signals import invalidate_cache_on_replica_refresh
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'analytics'])
+
+
+@pytest.fixture
+def replica(analytics_replica_path):
+    # the analytics database mirrors the test database in the tests, open the replica instead
+    replica = connections['analytics']
+    name = replica.settings_dict['NAME']
+    replica.close()
+    replica.settings_dict['NAME'] = f'file:{analytics_replica_path}?mode=ro&immutable=1'
+    yield replica
+    replica.close()
+    replica.settings_dict['NAME'] = name
+
+
+@pytest.fixture
+def refreshed_by_another_process():
+    # `replica_refreshed` only reaches the process that ran the refresh, not the web workers
+    replica_refreshed.disconnect(invalidate_cache_on_replica_refresh)
+    yield
+    replica_refreshed.connect(invalidate_cache_on_replica_refresh)
+
+
+class TestAnalyticsReplica:
+    client = APIClient()
+    invoice_date = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def customer(self, customer_factory, employee_factory):
+        return customer_factory(support_representative=employee_factory(first_name='John', last_name='Smith'))
+
+    def test_reports_read_the_replica_until_it_is_refreshed(self, replica, invoice_factory, customer):
+        url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=100)
+        refresh_replica()
+        etag = self.client.get(url).headers['ETag']
+
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=50)
+
+        response = self.client.get(url)
+        assert response.json()['Total Sales'] == Decimal('100.00')
+        refresh_replica()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        assert self.client.get(url).json() == {'Sales Rep': 'John Smith', 'Total Sales': Decimal('150.00')}
+
+    def test_replica_refreshed_by_another_process(
+            self, replica, refreshed_by_another_process, invoice_factory, customer
+    ):
+        url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=100)
+        refresh_replica()
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=50)
+        # built from the replica after the write, cached under the new generation and sales data version
+        response = self.client.get(url)
+        assert response.json()['Total Sales'] == Decimal('100.00')
+
+        refresh_replica()
+
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=response.headers['ETag']).status_code == 200
+        assert self.client.get(url).json() == {'Sales Rep': 'John Smith', 'Total Sales': Decimal('150.00')}
+
+    def test_streamed_reports_read_the_replica(self, replica, invoice_factory, customer):
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=100)
+        refresh_replica()
+        invoice_factory(invoice_date=self.invoice_date, customer=customer, total=50)
+
+        response = self.client.get(reverse('api-invoice-export'))
+
+        assert len(b''.join(response.streaming_content).splitlines()) == 1
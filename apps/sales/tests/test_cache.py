@@ -0,0 +1,141 @@
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.bulk import bulk_upsert
+from apps.employees.models import Employee
+from apps.sales.cache import ALL_SCOPE, invalidate
+from apps.sales.models import SalesCacheGeneration
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSellersResponseCache:
+    client = APIClient()
+    aware_datetime_2023 = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+    aware_datetime_2024 = timezone.make_aware(datetime(2024, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def customer(self, customer_factory, employee_factory):
+        employee = employee_factory(first_name='John', last_name='Smith')
+        return customer_factory(support_representative=employee)
+
+    def test_repeated_request_is_served_from_cache(self, invoice_factory, customer, django_assert_num_queries):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+
+        first_response = self.client.get(url)
+        # the sales data version, for the ETag, and the cache generations
+        with django_assert_num_queries(2):
+            second_response = self.client.get(url)
+
+        assert first_response.json() == second_response.json()
+        stats = self.client.get(reverse('api-sellers-cache-stats')).json()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+    def test_ordering_parameters_are_normalized(self, invoice_factory, customer, django_assert_num_queries):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        url = reverse('api-top-sales-reps-overall')
+
+        self.client.get(url)
+        # the sales data version, for the ETag, and the cache generations
+        with django_assert_num_queries(2):
+            self.client.get(f'{url}?order_by=year&order=asc')
+
+        response = self.client.get(f'{url}?order_by=year&order=desc')
+        assert response.status_code == 200
+        assert self.client.get(reverse('api-sellers-cache-stats')).json()['misses'] == 2
+
+    def test_invoice_write_invalidates_year_and_overall(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        overall_url = reverse('api-top-sales-reps-overall')
+        self.client.get(year_url)
+        self.client.get(overall_url)
+
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=50.00)
+
+        assert self.client.get(year_url).json() == {'Sales Rep': 'John Smith', 'Total Sales': Decimal('250.00')}
+        assert self.client.get(overall_url).json() == [
+            {'Sales Rep': 'John Smith', 'Total Sales': Decimal('250.00'), 'Year': 2023}
+        ]
+
+    def test_invoice_write_keeps_other_years_cached(self, invoice_factory, customer, django_assert_num_queries):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=customer, total=50.00)
+
+        # the sales data version, for the ETag, and the cache generations
+        with django_assert_num_queries(2):
+            self.client.get(year_url)
+
+    def test_no_content_is_cached_until_first_invoice(self, invoice_factory, customer):
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        assert self.client.get(year_url).status_code == 204
+
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+
+        assert self.client.get(year_url).status_code == 200
+
+    def test_employee_rename_invalidates_cache(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        employee = customer.support_representative
+        employee.first_name = 'Jane'
+        employee.save()
+
+        assert self.client.get(year_url).json()['Sales Rep'] == 'Jane Smith'
+
+    def test_employee_bulk_upsert_invalidates_cache(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        employee = customer.support_representative
+        bulk_upsert(Employee, [{
+            field.name: getattr(employee, field.attname) for field in Employee._meta.concrete_fields
+        } | {'first_name': 'Jane'}])
+
+        assert self.client.get(year_url).json()['Sales Rep'] == 'Jane Smith'
+
+    def test_invalidation_by_another_process_drops_cached_responses(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        # renamed by another worker: only the generations it moved forward in the database are shared with this one
+        Employee.objects.filter(pk=customer.support_representative_id).update(first_name='Jane')
+        SalesCacheGeneration.objects.update_or_create(scope=ALL_SCOPE, defaults={'generation': 1})
+
+        assert self.client.get(year_url).json()['Sales Rep'] == 'Jane Smith'
+
+    def test_rolled_back_invalidation_keeps_cached_responses(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            invalidate(ALL_SCOPE)
+            raise RuntimeError
+
+        self.client.get(year_url)
+        assert self.client.get(reverse('api-sellers-cache-stats')).json()['hits'] == 1
+
+    def test_customer_sales_rep_change_keeps_attributed_sales(self, invoice_factory, customer, employee_factory):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        year_url = reverse('api-top-sales-rep-by-year', kwargs={'year': 2023})
+        self.client.get(year_url)
+
+        customer.support_representative = employee_factory(first_name='Maria', last_name='Miller')
+        customer.save()
+
+        assert self.client.get(year_url).json()['Sales Rep'] == 'John Smith'
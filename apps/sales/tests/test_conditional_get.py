@@ -0,0 +1,78 @@
+import pytest
+
+from datetime import datetime
+from django.core.management import call_command
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sales.cache import get_sellers_cache
+from apps.sales.models import SalesDataVersion
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSellersConditionalGet:
+    client = APIClient()
+    aware_datetime = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def customer(self, customer_factory, employee_factory):
+        return customer_factory(support_representative=employee_factory())
+
+    @pytest.mark.parametrize('url', [
+        reverse('api-top-sales-rep-by-year', kwargs={'year': 2023}),
+        reverse('api-top-sales-reps-overall'),
+    ])
+    def test_matching_etag_returns_not_modified_reading_the_version_only(
+            self, invoice_factory, customer, django_assert_num_queries, url
+    ):
+        invoice_factory(invoice_date=self.aware_datetime, customer=customer, total=200.00)
+        response = self.client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+
+        with django_assert_num_queries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize('write', ['invoice', 'invoice_line', 'customer', 'employee'])
+    def test_any_sales_write_changes_etag(self, invoice_factory, invoice_line_factory, customer, write):
+        invoice = invoice_factory(invoice_date=self.aware_datetime, customer=customer, total=200.00)
+        url = reverse('api-top-sales-reps-overall')
+        etag = self.client.get(url)['ETag']
+
+        if write == 'invoice':
+            invoice.save()
+        elif write == 'invoice_line':
+            invoice_line_factory(invoice=invoice)
+        elif write == 'customer':
+            customer.save()
+        else:
+            customer.support_representative.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_write_of_another_process_changes_etag(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime, customer=customer, total=200.00)
+        url = reverse('api-top-sales-reps-overall')
+        response = self.client.get(url)
+
+        # a write committed by another worker or a management command: nothing of this process is told
+        SalesDataVersion.objects.update(version=F('version') + 1)
+        get_sellers_cache().clear()
+
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+
+    def test_rebuilding_the_summaries_changes_etag(self, invoice_factory, customer):
+        invoice_factory(invoice_date=self.aware_datetime, customer=customer, total=200.00)
+        url = reverse('api-top-sales-reps-overall')
+        etag = self.client.get(url)['ETag']
+
+        call_command('rebuild_sales_rep_summary', stdout=None)
+
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
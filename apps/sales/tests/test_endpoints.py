@@ -112,6 +112,56 @@ class TestTopSalesRepByYearAPIView:
         }
 
 
+class TestTopSalesRepBetweenDatesAPIView:
+    client = APIClient()
+
+    @pytest.fixture
+    def sales(self, invoice_factory, customer_factory, employee_factory):
+        john = customer_factory(support_representative=employee_factory(first_name='John', last_name='Smith'))
+        maria = customer_factory(support_representative=employee_factory(first_name='Maria', last_name='Miller'))
+
+        for year, month, day, customer, total in [
+            (2022, 12, 31, john, 500),
+            (2023, 1, 1, john, 100),
+            (2023, 1, 1, maria, 80),
+            (2023, 6, 30, maria, 20),
+            (2023, 7, 1, maria, 300),
+        ]:
+            invoice_factory(
+                invoice_date=timezone.make_aware(datetime(year, month, day, 10, 30)),
+                customer=customer,
+                total=total
+            )
+
+    @pytest.mark.parametrize('date_from, date_to, expected', [
+        ('2023-01-01', '2023-06-30', [
+            {'Sales Rep': 'John Smith', 'Total Sales': Decimal('100.00')},
+            {'Sales Rep': 'Maria Miller', 'Total Sales': Decimal('100.00')},
+        ]),
+        ('2023-01-01', '2023-12-31', {'Sales Rep': 'Maria Miller', 'Total Sales': Decimal('400.00')}),
+        ('2022-12-31', '2023-12-31', {'Sales Rep': 'John Smith', 'Total Sales': Decimal('600.00')}),
+    ])
+    def test_get_top_sales_reps(self, sales, date_from, date_to, expected):
+        url = reverse('api-top-sales-rep-between-dates')
+        response = self.client.get(f'{url}?from={date_from}&to={date_to}')
+
+        assert response.status_code == 200
+        assert response.json() == expected
+
+    def test_get_no_data_in_range(self, sales):
+        response = self.client.get(f"{reverse('api-top-sales-rep-between-dates')}?from=2023-01-02&to=2023-06-29")
+        assert response.status_code == 204
+
+    @pytest.mark.parametrize('query', [
+        '', 'from=2023-01-01', 'to=2023-01-01', 'from=2023-01-01&to=2023-02-30', 'from=2023&to=2024',
+        'from=2023-02-01&to=2023-01-01',
+    ])
+    def test_get_invalid_range(self, query):
+        response = self.client.get(f"{reverse('api-top-sales-rep-between-dates')}?{query}")
+        assert response.status_code == 400
+        assert response.json()['status'] == 'error'
+
+
 class TestTopSalesRepsOverallAPIView:
     client = APIClient()
 
@@ -286,3 +336,147 @@ class TestTopSalesRepsOverallAPIView:
         response = self.client.get(f"{url}?order_by={order_by}&order={order}")
         assert response.status_code == 200
         assert response.json() == expected
+
+    @pytest.mark.parametrize("query,expected", [
+        ("years=2019,2024", [
+            {"Sales Rep": "Stan Miller", "Total Sales": 600, "Year": 2019},
+            {"Sales Rep": "Maria Jones", "Total Sales": 350, "Year": 2024},
+        ]),
+        ("years=2024, 2019,2024", [
+            {"Sales Rep": "Stan Miller", "Total Sales": 600, "Year": 2019},
+            {"Sales Rep": "Maria Jones", "Total Sales": 350, "Year": 2024},
+        ]),
+        ("year_from=2020", [
+            {"Sales Rep": "Josh Smith", "Total Sales": 400, "Year": 2023},
+            {"Sales Rep": "Maria Jones", "Total Sales": 350, "Year": 2024},
+        ]),
+        ("year_from=2019&year_to=2023", [
+            {"Sales Rep": "Stan Miller", "Total Sales": 600, "Year": 2019},
+            {"Sales Rep": "Josh Smith", "Total Sales": 400, "Year": 2023},
+        ]),
+    ])
+    def test_years_filter(self, valid_expected_response_to_test_ordering, query, expected):
+        url = reverse('api-top-sales-reps-overall')
+        response = self.client.get(f"{url}?{query}")
+        assert response.status_code == 200
+        assert response.json() == expected
+
+    def test_years_filter_keeps_ties(self, valid_expected_response_one_year_repeated_totals):
+        url = reverse('api-top-sales-reps-overall')
+        response = self.client.get(f"{url}?years=2023")
+        assert response.status_code == 200
+        assert sorted(response.json(), key=lambda x: x['Sales Rep']) == sorted(
+            valid_expected_response_one_year_repeated_totals, key=lambda x: x['Sales Rep']
+        )
+
+    def test_years_filter_without_data(self, valid_expected_response_to_test_ordering):
+        url = reverse('api-top-sales-reps-overall')
+        response = self.client.get(f"{url}?years=2009,2010")
+        assert response.status_code == 204
+
+    @pytest.mark.parametrize("query", ["years=2019,abc", "years=0", "year_to=10000", "years=2019&year_from=2018"])
+    def test_years_filter_invalid(self, query):
+        url = reverse('api-top-sales-reps-overall')
+        response = self.client.get(f"{url}?{query}")
+        assert response.status_code == 400
+        assert response.json()['status'] == 'error'
+
+
+class TestSalesRepLeaderboardAPIView:
+    client = APIClient()
+
+    @pytest.fixture
+    def monthly_sales(self, invoice_factory, customer_factory, employee_factory):
+        employees = [
+            employee_factory(first_name='Josh', last_name='Smith'),
+            employee_factory(first_name='Maria', last_name='Jones'),
+            employee_factory(first_name='Stan', last_name='Miller'),
+        ]
+        customers = [customer_factory(support_representative=employee) for employee in employees]
+
+        # (year, month, customer index, total)
+        sales = [
+            (2023, 1, 0, 100), (2023, 1, 1, 300), (2023, 1, 2, 300),
+            (2023, 2, 0, 50), (2023, 2, 1, 20),
+            (2023, 5, 2, 70),
+            (2024, 1, 0, 10), (2024, 1, 1, 30), (2024, 1, 2, 20),
+        ]
+        for year, month, customer, total in sales:
+            invoice_factory(
+                invoice_date=timezone.make_aware(datetime(year, month, 15, 10, 30)),
+                customer=customers[customer],
+                total=total
+            )
+
+        return employees
+
+    def test_top_per_month_with_ties(self, monthly_sales):
+        url = reverse('api-sales-rep-leaderboard')
+        response = self.client.get(f'{url}?period=month&top=1')
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'results': [
+                {'Period': '2023-01', 'Rank': 1, 'Sales Rep': 'Maria Jones', 'Total Sales': 300},
+                {'Period': '2023-01', 'Rank': 1, 'Sales Rep': 'Stan Miller', 'Total Sales': 300},
+                {'Period': '2023-02', 'Rank': 1, 'Sales Rep': 'Josh Smith', 'Total Sales': 50},
+                {'Period': '2023-05', 'Rank': 1, 'Sales Rep': 'Stan Miller', 'Total Sales': 70},
+                {'Period': '2024-01', 'Rank': 1, 'Sales Rep': 'Maria Jones', 'Total Sales': 30},
+            ],
+            'next_cursor': None,
+        }
+
+    def test_top_per_quarter_and_year(self, monthly_sales):
+        url = reverse('api-sales-rep-leaderboard')
+
+        quarters = self.client.get(f'{url}?period=quarter&top=2&year_to=2023').json()['results']
+        years = self.client.get(f'{url}?period=year&top=1').json()['results']
+
+        assert [(row['Period'], row['Rank'], row['Sales Rep'], row['Total Sales']) for row in quarters] == [
+            ('2023-Q1', 1, 'Maria Jones', 320),
+            ('2023-Q1', 2, 'Stan Miller', 300),
+            ('2023-Q2', 1, 'Stan Miller', 70),
+        ]
+        assert [(row['Period'], row['Sales Rep'], row['Total Sales']) for row in years] == [
+            ('2023', 'Stan Miller', 370),
+            ('2024', 'Maria Jones', 30),
+        ]
+
+    @pytest.mark.parametrize('page_size', [1, 2, 3, 4])
+    def test_cursor_pages_match_unpaginated_results(self, monthly_sales, page_size):
+        url = reverse('api-sales-rep-leaderboard')
+        expected = self.client.get(f'{url}?period=month&top=2').json()['results']
+
+        results = []
+        response = self.client.get(f'{url}?period=month&top=2&page_size={page_size}').json()
+        while True:
+            assert len(response['results']) <= page_size
+            results.extend(response['results'])
+            if not response['next_cursor']:
+                break
+            response = self.client.get(
+                f"{url}?period=month&top=2&page_size={page_size}&cursor={response['next_cursor']}"
+            ).json()
+
+        assert results == expected
+
+    def test_no_data(self):
+        response = self.client.get(reverse('api-sales-rep-leaderboard'))
+        assert response.status_code == 204
+
+    @pytest.mark.parametrize('query', [
+        'period=week', 'top=0', 'top=101', 'page_size=x', 'years=abc', 'cursor=abc', 'cursor=WyJ5ZWFyIl0=',
+        'cursor=WyJ5ZWFyIiwgMSwgMCwgIngiLCAxXQ==',
+    ])
+    def test_invalid_parameters(self, query):
+        response = self.client.get(f"{reverse('api-sales-rep-leaderboard')}?{query}")
+        assert response.status_code == 400
+        assert response.json()['status'] == 'error'
+
+    def test_cursor_from_another_period_is_rejected(self, monthly_sales):
+        url = reverse('api-sales-rep-leaderboard')
+        next_cursor = self.client.get(f'{url}?period=month&page_size=1').json()['next_cursor']
+
+        response = self.client.get(f'{url}?period=year&cursor={next_cursor}')
+
+        assert response.status_code == 400
@@ -0,0 +1,102 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.music.reference import reference_data
+from apps.sales.export import iter_invoice_line_rows, iter_invoice_records
+
+pytestmark = pytest.mark.django_db
+
+
+class TestInvoiceExport:
+    client = APIClient()
+    aware_datetime = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def invoices(self, invoice_factory, invoice_line_factory, customer_factory, employee_factory, track_factory):
+        customer = customer_factory(support_representative=employee_factory())
+        invoices = [
+            invoice_factory(invoice_date=self.aware_datetime, customer=customer, total=Decimal('2.97'))
+            for _ in range(5)
+        ]
+        track = track_factory(name='Balls to the Wall', composer='U. Dirkschneider')
+        invoice_line_factory(invoice=invoices[0], track=track, unit_price=Decimal('0.99'), quantity=1)
+        invoice_line_factory(invoice=invoices[0], track=track, unit_price=Decimal('0.99'), quantity=2)
+        for invoice in invoices[2:]:
+            invoice_line_factory(invoice=invoice, quantity=3)
+        return invoices
+
+    def test_records_nest_the_lines_and_tracks(self, invoices):
+        records = list(iter_invoice_records())
+
+        assert [record['InvoiceId'] for record in records] == [invoice.id for invoice in invoices]
+        first = records[0]
+        assert first['InvoiceDate'] == self.aware_datetime.isoformat()
+        assert first['SalesRepId'] == invoices[0].sales_rep_id
+        assert first['Total'] == Decimal('2.97')
+        assert [(line['TrackName'], line['Quantity']) for line in first['Lines']] == [
+            ('Balls to the Wall', 1), ('Balls to the Wall', 2)
+        ]
+        track = invoices[0].invoice_lines.first().track
+        assert (first['Lines'][0]['Album'], first['Lines'][0]['Genre'], first['Lines'][0]['MediaType']) == (
+            track.album.title, track.genre.name, track.media_type.name
+        )
+        assert records[1]['Lines'] == []
+
+    def test_three_queries_per_chunk(self, invoices, django_assert_num_queries):
+        # the genre and media type names are read from the reference data, loaded once per process
+        reference_data()
+        # 3 chunks of invoices, lines and the version stamp of the reference data, and the query finding no more
+        # invoices
+        with django_assert_num_queries(10):
+            records = list(iter_invoice_records(chunk_size=2))
+
+        assert len(records) == 5
+        assert sum(len(record['Lines']) for record in records) == 5
+
+    def test_line_rows(self, invoices):
+        rows = list(iter_invoice_line_rows(chunk_size=2))
+
+        assert [(row['InvoiceId'], row['Quantity']) for row in rows] == [
+            (invoices[0].id, 1), (invoices[0].id, 2), (invoices[1].id, None),
+            (invoices[2].id, 3), (invoices[3].id, 3), (invoices[4].id, 3),
+        ]
+
+    def test_endpoint_ndjson(self, invoices):
+        response = self.client.get(reverse('api-invoice-export'))
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+        assert response['Content-Disposition'] == 'attachment; filename="invoices.ndjson"'
+        assert 'Content-Encoding' not in response
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [len(record['Lines']) for record in records] == [2, 0, 1, 1, 1]
+        assert records[0]['Lines'][1]['UnitPrice'] == 0.99
+
+    def test_endpoint_gzip_csv(self, invoices):
+        response = self.client.get(f"{reverse('api-invoice-export')}?format=csv", HTTP_ACCEPT_ENCODING='gzip, br')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(b''.join(response.streaming_content)).decode())))
+        assert len(rows) == 6
+        assert rows[0]['TrackName'] == 'Balls to the Wall'
+        assert rows[2]['InvoiceLineId'] == ''
+
+    def test_command_writes_gzip_file(self, invoices, tmp_path):
+        output = tmp_path / 'invoices.ndjson.gz'
+
+        call_command('export_invoices', '--gzip', f'--output={output}', '--chunk-size=2', stderr=io.StringIO())
+
+        lines = gzip.decompress(output.read_bytes()).decode().splitlines()
+        assert [json.loads(line)['InvoiceId'] for line in lines] == [invoice.id for invoice in invoices]
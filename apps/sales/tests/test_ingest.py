@@ -0,0 +1,175 @@
+import io
+import json
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sales.ingest import ingest_invoices
+from apps.sales.models import Invoice, InvoiceLine, SalesRepDailyCumulative, SalesRepYearlySummary
+from apps.sales.rollups import rebuild_sales_rep_daily_cumulative, rebuild_sales_rep_summary
+from apps.sales.watermark import sales_data_version
+
+pytestmark = pytest.mark.django_db
+
+
+def summaries() -> tuple[list, list]:
+    return (
+        list(SalesRepYearlySummary.objects.order_by('employee', 'year').values_list(
+            'employee', 'year', 'total_sales', 'invoice_count'
+        )),
+        list(SalesRepDailyCumulative.objects.order_by('employee', 'date').values_list(
+            'employee', 'date', 'daily_sales', 'daily_count', 'cumulative_sales', 'cumulative_count'
+        )),
+    )
+
+
+class TestIngestInvoices:
+    client = APIClient()
+
+    @pytest.fixture
+    def customer(self, customer_factory, employee_factory):
+        return customer_factory(support_representative=employee_factory())
+
+    @pytest.fixture
+    def track(self, track_factory):
+        return track_factory()
+
+    def invoice(self, customer, track, /, **fields) -> dict:
+        return {
+            'invoice_date': '2024-03-15T10:30:00',
+            'customer': customer.id,
+            'billing_city': 'Lisbon',
+            'total': 1.98,
+            'lines': [{'track': track.id, 'unit_price': 0.99, 'quantity': 2}],
+            **fields,
+        }
+
+    def test_writes_invoices_lines_and_summaries(self, customer, track, invoice_factory):
+        invoice_factory(invoice_date=timezone.make_aware(datetime(2024, 3, 20)), customer=customer, total=5)
+        version = sales_data_version()
+
+        result = ingest_invoices([
+            self.invoice(customer, track),
+            self.invoice(customer, track, invoice_date='2023-12-31T23:00:00', total='10.01', lines=[]),
+            self.invoice(customer, track, customer=None),
+        ], chunk_size=2)
+
+        assert result.errors == {}
+        invoices = Invoice.objects.in_bulk(result.invoice_ids)
+        assert [invoices[pk].total for pk in result.invoice_ids] == [Decimal('1.98'), Decimal('10.01'), Decimal('1.98')]
+        assert invoices[result.invoice_ids[0]].sales_rep_id == customer.support_representative_id
+        assert (invoices[result.invoice_ids[1]].year, invoices[result.invoice_ids[1]].quarter) == (2023, 4)
+        assert invoices[result.invoice_ids[2]].sales_rep_id is None
+        assert InvoiceLine.objects.filter(invoice_id=result.invoice_ids[0]).get().unit_price == Decimal('0.99')
+        assert sales_data_version() > version
+
+        ingested = summaries()
+        rebuild_sales_rep_summary()
+        rebuild_sales_rep_daily_cumulative()
+        assert ingested == summaries()
+
+    def test_reports_the_errors_of_full_clean(self, customer, track):
+        rows = [
+            self.invoice(customer, track, billing_city='x' * 200, total=-1),
+            self.invoice(customer, track, total='1.999', invoice_date='yesterday'),
+            self.invoice(customer, track),
+        ]
+
+        result = ingest_invoices(rows)
+
+        assert len(result.invoice_ids) == 1
+        assert list(result.errors) == [0, 1]
+        for index in result.errors:
+            invoice = Invoice(
+                customer=customer,
+                **{field: str(value) for field, value in rows[index].items() if field not in ('customer', 'lines')}
+            )
+            with pytest.raises(ValidationError) as error:
+                invoice.full_clean()
+            assert result.errors[index] == error.value.message_dict
+
+    def test_reports_missing_foreign_keys_and_unknown_fields(self, customer, track):
+        result = ingest_invoices([
+            self.invoice(customer, track, customer=customer.id + 1),
+            self.invoice(customer, track, lines=[{'track': track.id + 1, 'unit_price': 1, 'quantity': 0}]),
+            self.invoice(customer, track, lines=[{'track': 'abc', 'unit_price': 1, 'quantity': 1, 'price': 1}]),
+            self.invoice(customer, track, discount=1),
+            'not an invoice',
+        ])
+
+        assert result.invoice_ids == []
+        assert result.errors == {
+            0: {'customer': [f'customer instance with id {customer.id + 1} is not a valid choice.']},
+            1: {'lines.0.track': [f'track instance with id {track.id + 1} is not a valid choice.']},
+            2: {
+                'lines.0.__all__': ['Unknown fields: price.'],
+                'lines.0.track': ['“abc” value must be an integer.'],
+            },
+            3: {'__all__': ['Unknown fields: discount.']},
+            4: {'__all__': ['Expected an object with the invoice fields.']},
+        }
+
+    def test_queries_do_not_depend_on_the_number_of_rows(self, customer, track):
+        def queries(count: int) -> int:
+            with CaptureQueriesContext(connection) as context:
+                result = ingest_invoices([self.invoice(customer, track)] * count, chunk_size=100)
+            assert len(result.invoice_ids) == count
+            return len(context)
+
+        # the first batch creates the summary rows of the sales rep, the next ones update them
+        queries(1)
+        assert queries(5) == queries(50)
+
+    def test_endpoint(self, customer, track):
+        response = self.client.post(
+            reverse('api-invoice-batch'),
+            [self.invoice(customer, track), self.invoice(customer, track, total='abc')],
+            format='json'
+        )
+
+        assert response.status_code == 201
+        assert response.json() == {
+            'created': 1,
+            'invoice_ids': [Invoice.objects.get().id],
+            'errors': [{'index': 1, 'errors': {'total': ['“abc” value must be a decimal number.']}}],
+        }
+
+    def test_endpoint_nothing_valid(self, customer, track):
+        response = self.client.post(
+            reverse('api-invoice-batch'), [self.invoice(customer, track, total=None)], format='json'
+        )
+
+        assert response.status_code == 400
+        assert response.json()['errors'] == [{'index': 0, 'errors': {'total': ['This field cannot be null.']}}]
+
+    def test_endpoint_body_must_be_a_list(self, customer, track):
+        response = self.client.post(reverse('api-invoice-batch'), self.invoice(customer, track), format='json')
+
+        assert response.status_code == 400
+        assert response.json()['status'] == 'error'
+
+    def test_command(self, customer, track, tmp_path):
+        path = tmp_path / 'invoices.ndjson'
+        path.write_text('\n'.join([
+            json.dumps(self.invoice(customer, track)),
+            '{"invoice_date": ',
+            json.dumps(self.invoice(customer, track, total=-5)),
+            json.dumps(self.invoice(customer, track)),
+        ]))
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command('ingest_invoices', str(path), '--chunk-size=2', stdout=stdout, stderr=stderr)
+
+        assert Invoice.objects.count() == 2
+        assert 'Created 2 invoices.' in stdout.getvalue()
+        assert 'Skipped 2 invalid lines.' in stdout.getvalue()
+        assert stderr.getvalue().splitlines()[0].startswith('Line 2: invalid JSON')
+        assert stderr.getvalue().splitlines()[1].startswith('Line 3: {"total"')
@@ -1,7 +1,9 @@
 import pytest
 
+from datetime import datetime
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
+from django.utils import timezone
 
 from apps.sales.models import Invoice, InvoiceLine
 
@@ -89,6 +91,45 @@ class TestInvoiceModel:
         invoice.save()
         assert self.full_clean_calls == 1
 
+    def test_save_stores_date_parts(self, invoice_factory):
+        obj = invoice_factory(invoice_date=timezone.make_aware(datetime(2023, 8, 15, 10, 30)))
+        obj.refresh_from_db()
+        assert (obj.year, obj.month, obj.quarter) == (2023, 8, 3)
+
+    def test_sales_rep_attributed_from_customer(self, invoice_factory, customer_factory, employee_factory):
+        employee = employee_factory()
+        obj = invoice_factory(customer=customer_factory(support_representative=employee))
+        assert obj.sales_rep == employee
+
+    def test_sales_rep_kept_after_customer_reassignment(self, invoice_factory, customer_factory, employee_factory):
+        employee = employee_factory()
+        customer = customer_factory(support_representative=employee)
+        obj = invoice_factory(customer=customer)
+        customer.support_representative = employee_factory()
+        customer.save()
+
+        obj.save()
+        obj.refresh_from_db()
+
+        assert obj.sales_rep == employee
+
+    def test_sales_rep_field_null(self, invoice_factory):
+        obj = invoice_factory()
+        assert obj.sales_rep is None
+
+    def test_fk_sales_rep_on_delete_protect(self, invoice_factory, employee_factory):
+        obj = employee_factory()
+        invoice_factory(sales_rep=obj)
+        with pytest.raises(IntegrityError):
+            obj.delete()
+
+    def test_save_with_update_fields_refreshes_date_parts(self, invoice_factory):
+        obj = invoice_factory(invoice_date=timezone.make_aware(datetime(2023, 8, 15, 10, 30)))
+        obj.invoice_date = timezone.make_aware(datetime(2021, 2, 1, 10, 30))
+        obj.save(update_fields=['invoice_date'])
+        obj.refresh_from_db()
+        assert (obj.year, obj.month, obj.quarter) == (2021, 2, 1)
+
 
 class TestInvoiceLineModel:
     def setup_method(self):
@@ -0,0 +1,189 @@
+import io
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.sales import partitions
+from apps.sales.ingest import ingest_invoices
+from apps.sales.models import Invoice
+from apps.sales.partitions import (
+    partition_path,
+    partition_years,
+    partitioned_top_sales_reps_per_year,
+    partitions_are_current,
+    partitions_version,
+    rebuild_partitions
+)
+from apps.sales.ranking import top_sales_reps_per_year
+from apps.sales.watermark import sales_data_version
+
+pytestmark = pytest.mark.django_db
+
+
+def stored_facts(year: int) -> list[tuple]:
+    connection = partitions._connect(partition_path(year), 'analytics')
+    try:
+        return connection.execute('SELECT id, sales_rep_id, total_cents FROM invoice_fact ORDER BY id').fetchall()
+    finally:
+        connection.close()
+
+
+class TestInvoicePartitions:
+    client = APIClient()
+
+    @pytest.fixture
+    def partitions_engine(self, settings):
+        settings.SALES_ANALYTICS_ENGINE = 'partitions'
+
+    @pytest.fixture
+    def customers(self, customer_factory, employee_factory):
+        employees = [
+            employee_factory(first_name='Josh', last_name='Smith'),
+            employee_factory(first_name='Maria', last_name='Jones'),
+            employee_factory(first_name='Stan', last_name='Miller'),
+        ]
+        return [customer_factory(support_representative=employee) for employee in employees]
+
+    @pytest.fixture
+    def sales(self, customers, invoice_factory):
+        # (year, month, customer index, total), with a tie in 2023
+        sales = [
+            (2022, 12, 0, '0.99'), (2022, 12, 1, '1.98'),
+            (2023, 1, 0, '100.00'), (2023, 1, 1, '300.00'), (2023, 2, 2, '300.00'),
+            (2024, 1, 0, '10.00'), (2024, 1, 1, '30.00'), (2024, 1, 2, '20.00'),
+        ]
+        invoices = [
+            invoice_factory(
+                invoice_date=timezone.make_aware(datetime(year, month, 15, 10, 30)),
+                customer=customers[customer],
+                total=Decimal(total)
+            )
+            for year, month, customer, total in sales
+        ]
+        invoice_factory(
+            invoice_date=timezone.make_aware(datetime(2023, 1, 15, 10, 30)), customer=None, total=Decimal('999.00')
+        )
+        return invoices
+
+    @pytest.fixture
+    def rebuilt(self, sales):
+        rebuild_partitions()
+
+    def test_rebuild_writes_the_invoices_to_the_partition_of_their_year(self, sales):
+        rebuild_partitions()
+
+        assert partition_years() == [2022, 2023, 2024]
+        assert stored_facts(2022) == [
+            (sales[0].pk, sales[0].sales_rep_id, 99), (sales[1].pk, sales[1].sales_rep_id, 198)
+        ]
+        assert len(stored_facts(2023)) == 4
+        assert partitions_version() == sales_data_version()
+
+    @pytest.mark.parametrize('years_filter', [None, {'year': 2023}, {'year__in': [2022, 2024]}, {'year__gte': 2023}])
+    @pytest.mark.parametrize('order_by', ['year', '-total_sales', 'sales_rep'])
+    def test_matches_sql_ranking(self, partitions_engine, rebuilt, years_filter, order_by):
+        expected = [
+            (row.year, row.sales_rep, row.total_sales)
+            for row in top_sales_reps_per_year(years_filter, order_by=(order_by, 'sales_rep'))
+        ]
+        assert [
+            (row.year, row.sales_rep, row.total_sales)
+            for row in partitioned_top_sales_reps_per_year(years_filter, order_by=(order_by, 'sales_rep'))
+        ] == expected
+
+    def test_writes_never_touch_the_partitions(self, partitions_engine, customers, invoice_factory):
+        invoice_factory(invoice_date=timezone.make_aware(datetime(2021, 1, 1)), customer=customers[0])
+        ingest_invoices([
+            {'invoice_date': '2020-06-01T10:00:00+00:00', 'customer': customers[2].pk, 'total': '5.00'},
+        ])
+
+        assert partition_years() == []
+        assert not partitions_are_current()
+
+    @pytest.mark.parametrize('write', [
+        lambda sales, customers: sales[5].delete(),
+        lambda sales, customers: ingest_invoices([
+            {'invoice_date': '2024-06-01T10:00:00+00:00', 'customer': customers[2].pk, 'total': '5.00'},
+        ]),
+    ])
+    def test_writes_make_the_partitions_stale_until_rebuilt(self, partitions_engine, rebuilt, sales, customers, write):
+        assert partitions_are_current()
+
+        write(sales, customers)
+
+        assert not partitions_are_current()
+        rebuild_partitions()
+        assert partitions_are_current()
+
+    def test_stale_partitions_are_not_read(self, partitions_engine, rebuilt, sales, monkeypatch):
+        opened = []
+        connect = partitions._connect
+        monkeypatch.setattr(partitions, '_connect', lambda path, profile: opened.append(path) or connect(path, profile))
+
+        moved = sales[0]
+        moved.invoice_date = timezone.make_aware(datetime(2024, 3, 1, 10, 30))
+        moved.total = Decimal('50.00')
+        moved.save()
+        response = self.client.get(reverse('api-top-sales-rep-by-year', kwargs={'year': '2024'}))
+
+        assert response.json() == {'Sales Rep': 'Josh Smith', 'Total Sales': 60.0}
+        assert opened == []
+        assert (moved.pk, moved.sales_rep_id, 99) in stored_facts(2022)
+
+    def test_partitions_are_not_read_with_another_engine(self, rebuilt):
+        assert not partitions_are_current()
+
+    def test_partition_invoices_command(self, sales, settings):
+        assert partition_years() == []
+
+        stdout = io.StringIO()
+        call_command('partition_invoices', stdout=stdout)
+        settings.SALES_ANALYTICS_ENGINE = 'partitions'
+
+        assert '2023: 4 invoices.' in stdout.getvalue()
+        assert partition_years() == [2022, 2023, 2024]
+        assert partitions_are_current()
+        assert partitioned_top_sales_reps_per_year() == [
+            (row.year, 0, row.employee_id, row.sales_rep, row.total_sales, 1) for row in top_sales_reps_per_year()
+        ]
+
+    def test_rebuild_empties_the_partitions_of_years_without_invoices(self, sales):
+        rebuild_partitions()
+        Invoice.objects.filter(year=2024).delete()
+
+        assert rebuild_partitions() == {2022: 2, 2023: 4, 2024: 0}
+        assert stored_facts(2024) == []
+
+    def test_single_year_reads_one_partition(self, partitions_engine, rebuilt, monkeypatch):
+        opened = []
+        connect = partitions._connect
+        monkeypatch.setattr(partitions, '_connect', lambda path, profile: opened.append(path) or connect(path, profile))
+
+        response = self.client.get(reverse('api-top-sales-rep-by-year', kwargs={'year': '2024'}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'Sales Rep': 'Maria Jones', 'Total Sales': 30.0}
+        assert opened == [partition_path(2024)]
+
+    def test_overall_endpoint_fans_out(self, partitions_engine, rebuilt, monkeypatch):
+        opened = []
+        connect = partitions._connect
+        monkeypatch.setattr(partitions, '_connect', lambda path, profile: opened.append(path) or connect(path, profile))
+
+        response = self.client.get(reverse('api-top-sales-reps-overall'), {'order_by': 'total_sales', 'order': 'desc'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['Total Sales'] for row in response.json()] == [300.0, 300.0, 30.0, 1.98]
+        assert sorted(response.json(), key=lambda row: (row['Year'], row['Sales Rep'])) == [
+            {'Sales Rep': 'Maria Jones', 'Total Sales': 1.98, 'Year': 2022},
+            {'Sales Rep': 'Maria Jones', 'Total Sales': 300.0, 'Year': 2023},
+            {'Sales Rep': 'Stan Miller', 'Total Sales': 300.0, 'Year': 2023},
+            {'Sales Rep': 'Maria Jones', 'Total Sales': 30.0, 'Year': 2024},
+        ]
+        assert sorted(opened) == [partition_path(year) for year in (2022, 2023, 2024)]
@@ -0,0 +1,67 @@
+import pytest
+import re
+
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.sales.models import Invoice
+from apps.sales.ranking import top_sales_reps_between, top_sales_reps_per_period
+from apps.sales.rollups import rebuild_sales_rep_summary
+
+pytestmark = pytest.mark.django_db
+
+# "SCAN Invoice" alone is a full table scan, a scan of a covering index only reads the (narrower) index.
+FULL_INVOICE_SCAN = re.compile(r'\bSCAN Invoice\b(?! USING COVERING INDEX)')
+
+
+def query_plan(sql: str, params=()) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is specific to SQLite')
+class TestSellersQueryPlans:
+
+    @pytest.mark.parametrize('kwargs', [
+        {'period': 'year', 'top': 1},
+        {'period': 'quarter', 'top': 3},
+        {'period': 'month', 'top': 3, 'years_filter': {'year__in': [2010, 2011]}},
+        {'period': 'month', 'top': 3, 'after': (2010, 5, 10, 3)},
+    ])
+    def test_leaderboard_does_not_scan_invoice_table(self, kwargs):
+        with CaptureQueriesContext(connection) as context:
+            top_sales_reps_per_period(**kwargs)
+
+        plan = query_plan(context.captured_queries[-1]['sql'])
+
+        assert not [step for step in plan if FULL_INVOICE_SCAN.search(step)], plan
+        assert any('COVERING INDEX invoice_period_sales_rep_idx' in step for step in plan), plan
+
+    def test_summary_rebuild_does_not_scan_invoice_table(self):
+        with CaptureQueriesContext(connection) as context:
+            rebuild_sales_rep_summary()
+
+        aggregate_sql = next(query['sql'] for query in context.captured_queries if 'GROUP BY' in query['sql'])
+        plan = query_plan(aggregate_sql)
+
+        assert not [step for step in plan if FULL_INVOICE_SCAN.search(step)], plan
+
+    def test_customer_invoices_use_covering_index(self):
+        customer_invoices = Invoice.objects.filter(customer_id=1, invoice_date__year=2010).values('total')
+        sql, params = customer_invoices.query.sql_with_params()
+
+        plan = query_plan(sql, params)
+
+        assert any('COVERING INDEX invoice_customer_date_idx' in step for step in plan), plan
+
+    def test_date_range_reads_running_totals_by_index(self):
+        with CaptureQueriesContext(connection) as context:
+            top_sales_reps_between(date(2010, 3, 1), date(2011, 2, 28))
+
+        plan = query_plan(context.captured_queries[-1]['sql'])
+
+        assert not [step for step in plan if 'Invoice' in step], plan
+        assert not [step for step in plan if re.search(r'\bSCAN SalesRepDailyCumulative\b', step)], plan
+        assert any('COVERING INDEX sales_rep_date_cumulative_idx' in step for step in plan), plan
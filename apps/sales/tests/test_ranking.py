@@ -0,0 +1,81 @@
+import pytest
+
+from datetime import date, datetime
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sales.ranking import top_sales_reps_between, top_sales_reps_per_year
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTopSalesRepsPerYear:
+    client = APIClient()
+    aware_datetime_2023 = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+    aware_datetime_2024 = timezone.make_aware(datetime(2024, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def sales(self, invoice_factory, customer_factory, employee_factory):
+        employee1 = employee_factory(first_name='John', last_name='Smith')
+        employee2 = employee_factory(first_name='Maria', last_name='Miller')
+        employee3 = employee_factory(first_name='Stan', last_name='Jones')
+        customer1 = customer_factory(support_representative=employee1)
+        customer2 = customer_factory(support_representative=employee2)
+        customer3 = customer_factory(support_representative=employee3)
+
+        # 2023: John Smith and Maria Miller tied at 200.00
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer1, total=200.00)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer2, total=150.00)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer2, total=50.00)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer3, total=100.00)
+        # 2024: Stan Jones
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=customer3, total=300.00)
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=customer1, total=100.00)
+
+    def test_rank_one_with_ties_in_one_query(self, sales, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            rows = [
+                (row.year, row.sales_rep, row.total_sales, row.rank)
+                for row in top_sales_reps_per_year(order_by=('year', 'sales_rep'))
+            ]
+
+        assert rows == [
+            (2023, 'John Smith', Decimal('200.00'), 1),
+            (2023, 'Maria Miller', Decimal('200.00'), 1),
+            (2024, 'Stan Jones', Decimal('300.00'), 1),
+        ]
+
+    def test_years_filter(self, sales):
+        rows = [row.sales_rep for row in top_sales_reps_per_year({'year': 2024})]
+        assert rows == ['Stan Jones']
+
+    @pytest.mark.parametrize('date_from, date_to, expected', [
+        (
+            date(2023, 4, 15), date(2023, 4, 15),
+            [('John Smith', Decimal('200.00')), ('Maria Miller', Decimal('200.00'))]
+        ),
+        (date(2023, 1, 1), date(2024, 12, 31), [('Stan Jones', Decimal('400.00'))]),
+        (date(2023, 4, 16), date(2024, 4, 15), [('Stan Jones', Decimal('300.00'))]),
+        (date(2023, 4, 16), date(2024, 4, 14), []),
+    ])
+    def test_date_range_in_one_query(self, sales, django_assert_num_queries, date_from, date_to, expected):
+        with django_assert_num_queries(1):
+            rows = [(row.sales_rep, row.total_sales) for row in top_sales_reps_between(date_from, date_to)]
+
+        assert rows == expected
+
+    @pytest.mark.parametrize('url', [
+        reverse('api-top-sales-rep-by-year', kwargs={'year': 2023}),
+        reverse('api-top-sales-rep-by-year', kwargs={'year': 2024}),
+        reverse('api-top-sales-reps-overall'),
+        f"{reverse('api-top-sales-reps-overall')}?years=2023,2024&order_by=sales_rep",
+        f"{reverse('api-top-sales-rep-between-dates')}?from=2023-01-01&to=2024-06-30",
+    ])
+    def test_endpoints_run_one_ranking_query_per_request(self, sales, django_assert_num_queries, url):
+        # and the sales data version, for the ETag, and the cache generations
+        with django_assert_num_queries(3):
+            response = self.client.get(url)
+
+        assert response.status_code == 200
@@ -0,0 +1,186 @@
+import pytest
+
+from datetime import date, datetime
+from decimal import Decimal
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.sales.models import SalesRepDailyCumulative, SalesRepYearlySummary
+from apps.sales.rollups import apply_sales_rep_daily_delta, apply_sales_rep_daily_deltas
+
+pytestmark = pytest.mark.django_db
+
+
+def summary_rows():
+    return list(
+        SalesRepYearlySummary.objects.order_by('employee_id', 'year')
+        .values_list('employee_id', 'year', 'total_sales', 'invoice_count')
+    )
+
+
+def daily_cumulative_rows():
+    return list(
+        SalesRepDailyCumulative.objects.order_by('employee_id', 'date')
+        .values_list('employee_id', 'date', 'daily_sales', 'cumulative_sales', 'cumulative_count')
+    )
+
+
+class TestSalesRepYearlySummary:
+    aware_datetime_2023 = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+    aware_datetime_2024 = timezone.make_aware(datetime(2024, 4, 15, 10, 30))
+
+    def test_invoice_save_adds_to_summary(self, invoice_factory, customer_factory, employee_factory):
+        employee = employee_factory()
+        customer = customer_factory(support_representative=employee)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=Decimal('0.10'))
+
+        assert summary_rows() == [(employee.id, 2023, Decimal('200.10'), 2)]
+
+    def test_invoice_without_sales_rep_is_ignored(self, invoice_factory, customer_factory):
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=None, total=200.00)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer_factory(), total=200.00)
+
+        assert summary_rows() == []
+
+    def test_invoice_update_moves_total_between_years(self, invoice_factory, customer_factory, employee_factory):
+        employee = employee_factory()
+        customer = customer_factory(support_representative=employee)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=100.00)
+        invoice = invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+
+        invoice.invoice_date = self.aware_datetime_2024
+        invoice.total = Decimal('250.00')
+        invoice.save()
+
+        assert summary_rows() == [
+            (employee.id, 2023, Decimal('100.00'), 1),
+            (employee.id, 2024, Decimal('250.00'), 1),
+        ]
+
+    def test_invoice_delete_removes_empty_rows(self, invoice_factory, customer_factory, employee_factory):
+        employee = employee_factory()
+        customer = customer_factory(support_representative=employee)
+        invoice = invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=200.00)
+
+        invoice.delete()
+
+        assert summary_rows() == []
+
+    def test_customer_sales_rep_change_keeps_history(self, invoice_factory, customer_factory, employee_factory):
+        employee1 = employee_factory()
+        employee2 = employee_factory()
+        customer = customer_factory(support_representative=employee1)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=100.00)
+
+        customer.support_representative = employee2
+        customer.save()
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer, total=300.00)
+
+        assert summary_rows() == [
+            (employee1.id, 2023, Decimal('100.00'), 1),
+            (employee2.id, 2023, Decimal('300.00'), 1),
+        ]
+
+    def test_rebuild_command_matches_incremental_summary(
+            self,
+            invoice_factory,
+            customer_factory,
+            employee_factory
+    ):
+        employee1 = employee_factory()
+        employee2 = employee_factory()
+        customer1 = customer_factory(support_representative=employee1)
+        customer2 = customer_factory(support_representative=employee2)
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer1, total=Decimal('0.10'))
+        invoice_factory(invoice_date=self.aware_datetime_2023, customer=customer1, total=Decimal('0.20'))
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=customer2, total=Decimal('0.30'))
+        incremental_rows = summary_rows()
+
+        SalesRepYearlySummary.objects.all().delete()
+        call_command('rebuild_sales_rep_summary', stdout=None)
+
+        assert summary_rows() == incremental_rows
+
+
+class TestSalesRepDailyCumulative:
+
+    @pytest.fixture
+    def customer(self, customer_factory, employee_factory):
+        return customer_factory(support_representative=employee_factory())
+
+    @staticmethod
+    def at(year, month, day):
+        return timezone.make_aware(datetime(year, month, day, 10, 30))
+
+    def test_invoices_add_to_running_totals(self, invoice_factory, customer):
+        employee_id = customer.support_representative_id
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('100.00'))
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('0.10'))
+        invoice_factory(invoice_date=self.at(2023, 3, 5), customer=customer, total=Decimal('50.00'))
+
+        assert daily_cumulative_rows() == [
+            (employee_id, date(2023, 1, 10), Decimal('100.10'), Decimal('100.10'), 2),
+            (employee_id, date(2023, 3, 5), Decimal('50.00'), Decimal('150.10'), 3),
+        ]
+
+    def test_backdated_invoice_moves_later_running_totals(self, invoice_factory, customer):
+        employee_id = customer.support_representative_id
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('100.00'))
+        invoice_factory(invoice_date=self.at(2023, 3, 5), customer=customer, total=Decimal('50.00'))
+
+        invoice_factory(invoice_date=self.at(2022, 12, 31), customer=customer, total=Decimal('20.00'))
+
+        assert daily_cumulative_rows() == [
+            (employee_id, date(2022, 12, 31), Decimal('20.00'), Decimal('20.00'), 1),
+            (employee_id, date(2023, 1, 10), Decimal('100.00'), Decimal('120.00'), 2),
+            (employee_id, date(2023, 3, 5), Decimal('50.00'), Decimal('170.00'), 3),
+        ]
+
+    def test_invoice_update_and_delete(self, invoice_factory, customer):
+        employee_id = customer.support_representative_id
+        invoice = invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('100.00'))
+        other = invoice_factory(invoice_date=self.at(2023, 3, 5), customer=customer, total=Decimal('50.00'))
+
+        invoice.invoice_date = self.at(2023, 4, 1)
+        invoice.save()
+        other.delete()
+
+        assert daily_cumulative_rows() == [(employee_id, date(2023, 4, 1), Decimal('100.00'), Decimal('100.00'), 1)]
+
+    def test_rebuild_command_matches_incremental_running_totals(self, invoice_factory, customer_factory, customer):
+        invoice_factory(invoice_date=self.at(2023, 3, 5), customer=customer, total=Decimal('0.30'))
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('0.10'))
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer, total=Decimal('0.20'))
+        invoice_factory(invoice_date=self.at(2023, 1, 10), customer=customer_factory(), total=Decimal('9.99'))
+        incremental_rows = daily_cumulative_rows()
+
+        SalesRepDailyCumulative.objects.all().delete()
+        call_command('rebuild_sales_rep_summary', stdout=None)
+
+        assert daily_cumulative_rows() == incremental_rows
+
+    def test_daily_deltas_match_one_day_at_a_time(self, invoice_factory, customer):
+        employee_id = customer.support_representative_id
+        for day in (date(2023, 1, 10), date(2023, 3, 5), date(2023, 6, 1)):
+            invoice_factory(invoice_date=self.at(day.year, day.month, day.day), customer=customer, total=Decimal('10'))
+        deltas = {
+            date(2022, 12, 1): (Decimal('1.10'), 1),
+            date(2023, 1, 10): (Decimal('-10.00'), -1),
+            date(2023, 2, 1): (Decimal('2.20'), 2),
+            date(2023, 3, 5): (Decimal('3.30'), 1),
+            date(2023, 7, 1): (Decimal('4.40'), 1),
+        }
+
+        apply_sales_rep_daily_deltas(employee_id, deltas)
+        batched_rows = daily_cumulative_rows()
+        # back to the invoices alone, then one day at a time
+        for sales_date, (total, count) in deltas.items():
+            apply_sales_rep_daily_delta(employee_id, sales_date, -total, -count)
+        for sales_date, (total, count) in deltas.items():
+            apply_sales_rep_daily_delta(employee_id, sales_date, total, count)
+
+        assert batched_rows == daily_cumulative_rows()
+        assert [row[1] for row in batched_rows] == [
+            date(2022, 12, 1), date(2023, 2, 1), date(2023, 3, 5), date(2023, 6, 1), date(2023, 7, 1)
+        ]
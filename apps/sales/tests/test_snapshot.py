@@ -0,0 +1,119 @@
+import pytest
+
+from datetime import datetime
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from apps.sales.analytics import InvoiceFacts, invoice_rewrites
+from apps.sales.models import Invoice
+from apps.sales.ranking import top_sales_reps_per_period
+from apps.sales.snapshot import CURRENT_FILE, current_version, open_snapshot
+
+np = pytest.importorskip('numpy')
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSalesSnapshot:
+    aware_datetime_2023 = timezone.make_aware(datetime(2023, 4, 15, 10, 30))
+    aware_datetime_2024 = timezone.make_aware(datetime(2024, 4, 15, 10, 30))
+
+    @pytest.fixture
+    def sales(self, invoice_factory, invoice_line_factory, customer_factory, employee_factory):
+        customers = [
+            customer_factory(support_representative=employee_factory(first_name='John', last_name='Smith')),
+            customer_factory(support_representative=employee_factory(first_name='Maria', last_name='Miller')),
+            customer_factory(support_representative=None),
+        ]
+        invoices = [
+            invoice_factory(invoice_date=self.aware_datetime_2023, customer=customers[0], total=Decimal('200.10')),
+            invoice_factory(invoice_date=self.aware_datetime_2023, customer=customers[1], total=Decimal('150.00')),
+            invoice_factory(invoice_date=self.aware_datetime_2024, customer=customers[1], total=Decimal('30.00')),
+            invoice_factory(invoice_date=self.aware_datetime_2024, customer=customers[2], total=Decimal('99.00')),
+        ]
+        invoice_line_factory(invoice=invoices[0], unit_price=Decimal('0.99'), quantity=2)
+        return customers
+
+    def test_command_writes_current_snapshot(self, sales, sales_snapshot_dir):
+        call_command('write_sales_snapshot', stdout=None)
+
+        snapshot = open_snapshot(current_version())
+
+        assert isinstance(snapshot.invoices.cents, np.memmap)
+        assert snapshot.invoices.cents.tolist() == [20010, 15000, 3000, 9900]
+        assert snapshot.invoices.years.tolist() == [2023, 2023, 2024, 2024]
+        assert snapshot.invoices.sales_rep_ids.tolist() == [
+            sales[0].support_representative_id, sales[1].support_representative_id,
+            sales[1].support_representative_id, -1
+        ]
+        assert snapshot.customers.support_rep_ids.tolist()[-1] == -1
+        assert snapshot.invoice_lines.unit_price_cents.tolist() == [99]
+        assert snapshot.invoice_lines.quantities.tolist() == [2]
+        assert len(snapshot.tracks.ids) == 1
+
+    def test_engine_maps_snapshot_and_loads_newer_invoices(self, sales, invoice_factory):
+        call_command('write_sales_snapshot', stdout=None)
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=sales[0], total=Decimal('40.00'))
+
+        facts = InvoiceFacts()
+        snapshot_columns, columns = facts.refresh()
+
+        assert facts.snapshot_version == current_version()
+        assert isinstance(snapshot_columns.ids, np.memmap) and len(snapshot_columns.ids) == 4
+        assert columns.cents.tolist() == [4000]
+        assert facts.top_sales_reps_per_period('year', 2) == top_sales_reps_per_period('year', 2)
+
+    def test_new_snapshot_is_swapped_in(self, sales, invoice_factory, sales_snapshot_dir):
+        call_command('write_sales_snapshot', stdout=None)
+        facts = InvoiceFacts()
+        facts.refresh()
+        first_version = facts.snapshot_version
+
+        invoice_factory(invoice_date=self.aware_datetime_2024, customer=sales[0], total=Decimal('40.00'))
+        call_command('write_sales_snapshot', '--keep=1', stdout=None)
+        snapshot_columns, columns = facts.refresh()
+
+        assert facts.snapshot_version != first_version
+        assert (len(snapshot_columns.ids), len(columns.ids)) == (5, 0)
+        assert {path.name for path in sales_snapshot_dir.iterdir()} == {CURRENT_FILE, facts.snapshot_version}
+
+    def test_snapshot_is_not_used_after_invoice_update(self, sales, invoice_factory):
+        invoice = invoice_factory(invoice_date=self.aware_datetime_2024, customer=sales[0], total=Decimal('40.00'))
+        call_command('write_sales_snapshot', stdout=None)
+
+        invoice.total = Decimal('10.00')
+        invoice.save()
+        facts = InvoiceFacts()
+        snapshot_columns, columns = facts.refresh()
+
+        assert facts.snapshot_version is None
+        assert (len(snapshot_columns.ids), len(columns.ids)) == (0, 5)
+        assert facts.top_sales_reps_per_period('year', 2) == top_sales_reps_per_period('year', 2)
+
+    def test_snapshot_written_by_another_process_is_used(self, sales, sellers_cache):
+        invoice = Invoice.objects.first()
+        invoice.total = Decimal('10.00')
+        invoice.save()
+        call_command('write_sales_snapshot', stdout=None)
+        # nothing the writing process cached is seen by the reading one
+        sellers_cache.clear()
+
+        facts = InvoiceFacts()
+        snapshot_columns, columns = facts.refresh()
+
+        assert facts.snapshot_version == current_version()
+        assert open_snapshot(current_version()).invoice_rewrites == invoice_rewrites() > 0
+        assert (len(snapshot_columns.ids), len(columns.ids)) == (4, 0)
+
+    def test_rolled_back_invoice_update_keeps_the_snapshot(self, sales):
+        call_command('write_sales_snapshot', stdout=None)
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            Invoice.objects.first().delete()
+            raise RuntimeError
+
+        facts = InvoiceFacts()
+        facts.refresh()
+        assert facts.snapshot_version == current_version()
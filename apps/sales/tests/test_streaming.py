@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import pytest
+
+from datetime import datetime
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sales.api.renderers import CSVRenderer, RowsRenderer
+
+pytestmark = pytest.mark.django_db
+
+
+def ndjson_rows(response) -> list[dict]:
+    return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+
+def csv_rows(response) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+
+class TestStreamingReports:
+    client = APIClient()
+
+    @pytest.fixture
+    def monthly_sales(self, invoice_factory, customer_factory, employee_factory):
+        employees = [
+            employee_factory(first_name='Josh', last_name='Smith'),
+            employee_factory(first_name='Maria', last_name='Jones'),
+        ]
+        customers = [customer_factory(support_representative=employee) for employee in employees]
+
+        # (year, month, customer index, total)
+        for year, month, customer, total in [
+            (2023, 1, 0, 100), (2023, 1, 1, 300), (2023, 2, 0, 50), (2024, 3, 1, 30), (2024, 3, 0, 10),
+        ]:
+            invoice_factory(
+                invoice_date=timezone.make_aware(datetime(year, month, 15, 10, 30)),
+                customer=customers[customer],
+                total=total
+            )
+
+    def test_overall_ndjson(self, monthly_sales):
+        response = self.client.get(f"{reverse('api-top-sales-reps-overall')}?format=ndjson&order=desc")
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+        assert ndjson_rows(response) == [
+            {'Sales Rep': 'Maria Jones', 'Total Sales': 30.0, 'Year': 2024},
+            {'Sales Rep': 'Maria Jones', 'Total Sales': 300.0, 'Year': 2023},
+        ]
+
+    def test_overall_csv_from_accept_header(self, monthly_sales):
+        response = self.client.get(reverse('api-top-sales-reps-overall'), HTTP_ACCEPT='text/csv')
+
+        assert response.status_code == 200
+        assert response['Content-Disposition'] == 'attachment; filename="top-sales-reps.csv"'
+        assert csv_rows(response) == [
+            ['Sales Rep', 'Total Sales', 'Year'],
+            ['Maria Jones', '300.00', '2023'],
+            ['Maria Jones', '30.00', '2024'],
+        ]
+
+    def test_rows_are_read_while_streaming(self, monthly_sales, django_assert_num_queries):
+        # the sales data version, for the ETag
+        with django_assert_num_queries(1):
+            response = self.client.get(f"{reverse('api-sales-rep-leaderboard')}?period=month&format=ndjson")
+
+        with django_assert_num_queries(1):
+            rows = ndjson_rows(response)
+
+        assert len(rows) == 5
+
+    def test_leaderboard_stream_is_not_paginated(self, monthly_sales):
+        url = reverse('api-sales-rep-leaderboard')
+        expected = self.client.get(f'{url}?period=month&top=2').json()['results']
+
+        response = self.client.get(f'{url}?period=month&top=2&page_size=1&format=csv')
+
+        rows = csv_rows(response)
+        assert rows[0] == ['Period', 'Rank', 'Sales Rep', 'Total Sales']
+        assert rows[1:] == [
+            [row['Period'], str(row['Rank']), row['Sales Rep'], f"{row['Total Sales']:.2f}"] for row in expected
+        ]
+
+    def test_leaderboard_stream_after_cursor(self, monthly_sales):
+        url = reverse('api-sales-rep-leaderboard')
+        first_page = self.client.get(f'{url}?period=month&top=2&page_size=2').json()
+        expected = self.client.get(f"{url}?period=month&top=2&cursor={first_page['next_cursor']}").json()['results']
+
+        response = self.client.get(f"{url}?period=month&top=2&format=ndjson&cursor={first_page['next_cursor']}")
+
+        assert ndjson_rows(response) == expected
+
+    def test_no_data_streams_header_only(self):
+        response = self.client.get(f"{reverse('api-top-sales-reps-overall')}?format=csv")
+
+        assert response.status_code == 200
+        assert csv_rows(response) == [['Sales Rep', 'Total Sales', 'Year']]
+
+    def test_invalid_parameters_are_rendered_in_requested_format(self):
+        response = self.client.get(f"{reverse('api-top-sales-reps-overall')}?format=ndjson&order=up")
+
+        assert response.status_code == 400
+        assert json.loads(response.content)['status'] == 'error'
+
+
+class TestRowsRenderer:
+    def test_render_rows_is_abstract(self):
+        with pytest.raises(TypeError, match='render_rows'):
+            RowsRenderer()
+
+    def test_render_is_the_rendered_rows(self):
+        rows = [{'Sales Rep': 'John Smith', 'Total Sales': 10}]
+
+        assert CSVRenderer().render(rows) == b'Sales Rep,Total Sales\r\nJohn Smith,10\r\n'
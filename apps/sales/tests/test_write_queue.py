@@ -0,0 +1,172 @@
+import pytest
+import threading
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.sales.models import Invoice
+from apps.sales.write_queue import GroupCommitQueue, invoice_write_queue, write_invoices
+
+pytestmark = pytest.mark.django_db
+
+
+class RecordingQueue(GroupCommitQueue):
+    max_batch_size = 6
+    max_delay = 5
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def write_batch(self, items: list) -> list:
+        self.batches.append(items)
+        if 'bad' in items:
+            raise ValueError('bad item')
+        return [item * 2 for item in items]
+
+
+def submit_concurrently(queue: GroupCommitQueue, submissions: list[list]) -> list:
+    outcomes = [None] * len(submissions)
+
+    def submit(index: int) -> None:
+        outcomes[index] = queue.submit(submissions[index])
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(len(submissions))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return outcomes
+
+
+class TestGroupCommitQueue:
+    def test_write_batch_is_abstract(self):
+        with pytest.raises(TypeError, match='write_batch'):
+            GroupCommitQueue()
+
+    def test_concurrent_submissions_are_written_together(self):
+        queue = RecordingQueue()
+
+        outcomes = submit_concurrently(queue, [['a', 'b'], ['c', 'd'], ['e', 'f']])
+
+        assert len(queue.batches) == 1
+        assert sorted(queue.batches[0]) == ['a', 'b', 'c', 'd', 'e', 'f']
+        results = [[result for result, error in outcome] for outcome in outcomes]
+        assert results == [['aa', 'bb'], ['cc', 'dd'], ['ee', 'ff']]
+        stats = queue.stats()
+        assert (stats['batches'], stats['items'], stats['average_batch_size'], stats['max_batch_size']) == (1, 6, 6, 6)
+        assert stats['max_wait_ms'] >= stats['average_wait_ms'] >= 0
+
+    def test_batches_are_at_most_max_batch_size(self):
+        queue = RecordingQueue()
+
+        outcome = queue.submit(list(range(14)))
+
+        assert [len(batch) for batch in queue.batches] == [6, 6, 2]
+        assert [result for result, error in outcome] == [item * 2 for item in range(14)]
+
+    def test_failed_batch_is_written_again_per_caller(self):
+        queue = RecordingQueue()
+
+        good, bad, other = submit_concurrently(queue, [['a', 'b'], ['bad', 'c'], ['d', 'e']])
+
+        assert [result for result, error in good] == ['aa', 'bb']
+        assert [result for result, error in other] == ['dd', 'ee']
+        assert all(isinstance(error, ValueError) and result is None for result, error in bad)
+        assert len(queue.batches) == 4
+        assert queue.stats()['split_batches'] == 1
+
+    def test_no_wait_without_delay(self):
+        queue = RecordingQueue()
+        queue.max_delay = 0
+
+        assert queue.submit(['a']) == [('aa', None)]
+        assert queue.stats()['max_wait_ms'] < 1000
+
+
+class TestInvoiceWriteQueue:
+    client = APIClient()
+
+    @pytest.fixture
+    def invoice(self, customer_factory, employee_factory, track_factory):
+        customer = customer_factory(support_representative=employee_factory())
+        track = track_factory()
+
+        def invoice(**fields) -> dict:
+            return {
+                'invoice_date': '2024-03-15T10:30:00',
+                'customer': customer.id,
+                'billing_city': 'Lisbon',
+                'total': '0.99',
+                'lines': [{'track': track.id, 'unit_price': '0.99', 'quantity': 1}],
+                **fields,
+            }
+
+        return invoice
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_writes_share_a_transaction(self, invoice, settings):
+        settings.INVOICE_WRITE_QUEUE_MAX_BATCH_SIZE = 4
+        settings.INVOICE_WRITE_QUEUE_MAX_DELAY = 5
+        invoice_write_queue.reset_stats()
+        results = [None] * 4
+
+        def write(index: int) -> None:
+            try:
+                results[index] = write_invoices([invoice(total='1.00' if index == 3 else '-1')])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert [list(result.errors) for result in results] == [[0], [0], [0], []]
+        assert results[0].errors[0] == {'total': ['Ensure this value is greater than or equal to 0.0.']}
+        assert Invoice.objects.get().id == results[3].invoice_ids[0]
+        assert invoice_write_queue.stats()['batches'] == 1
+
+    def test_inside_a_transaction_writes_directly(self, invoice):
+        invoice_write_queue.reset_stats()
+
+        result = write_invoices([invoice(), invoice(total='abc')])
+
+        assert len(result.invoice_ids) == 1
+        assert list(result.errors) == [1]
+        assert invoice_write_queue.stats()['batches'] == 0
+
+    def test_create_endpoint(self, invoice):
+        response = self.client.post(reverse('api-invoice-create'), invoice(), format='json')
+
+        assert response.status_code == 201
+        assert response.json() == {'invoice_id': Invoice.objects.get().id}
+
+    def test_create_endpoint_invalid_invoice(self, invoice):
+        response = self.client.post(reverse('api-invoice-create'), invoice(lines=[{'quantity': 1}]), format='json')
+
+        assert response.status_code == 400
+        assert response.json() == {
+            'errors': {
+                'lines.0.track': ['This field cannot be null.'],
+                'lines.0.unit_price': ['This field cannot be null.'],
+            }
+        }
+
+    def test_stats_endpoint(self):
+        invoice_write_queue.reset_stats()
+
+        response = self.client.get(reverse('api-invoice-write-queue-stats'))
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'batches': 0,
+            'items': 0,
+            'split_batches': 0,
+            'average_batch_size': None,
+            'max_batch_size': 0,
+            'average_wait_ms': None,
+            'max_wait_ms': 0.0,
+        }
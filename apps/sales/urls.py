@@ -1,8 +1,30 @@
 from django.urls import path
 
-from .api.views import TopSalesRepByYearAPIView, TopSalesRepsOverallAPIView
+from .api.views import (
+    InvoiceBatchAPIView,
+    InvoiceCreateAPIView,
+    InvoiceExportAPIView,
+    InvoiceWriteQueueStatsAPIView,
+    SalesRepLeaderboardAPIView,
+    SellersCacheStatsAPIView,
+    TopSalesRepBetweenDatesAPIView,
+    TopSalesRepByYearAPIView,
+    TopSalesRepsOverallAPIView
+)
 
 urlpatterns = [
+    # before the by year route, which would otherwise take "range" for a year
+    path('api/v1/sellers/range/top', TopSalesRepBetweenDatesAPIView.as_view(), name='api-top-sales-rep-between-dates'),
     path('api/v1/sellers/<year>/top', TopSalesRepByYearAPIView.as_view(), name='api-top-sales-rep-by-year'),
     path('api/v1/sellers/top', TopSalesRepsOverallAPIView.as_view(), name='api-top-sales-reps-overall'),
+    path('api/v1/sellers/leaderboard', SalesRepLeaderboardAPIView.as_view(), name='api-sales-rep-leaderboard'),
+    path('api/v1/sellers/cache/stats', SellersCacheStatsAPIView.as_view(), name='api-sellers-cache-stats'),
+    path('api/v1/invoices', InvoiceCreateAPIView.as_view(), name='api-invoice-create'),
+    path('api/v1/invoices/batch', InvoiceBatchAPIView.as_view(), name='api-invoice-batch'),
+    path('api/v1/invoices/export', InvoiceExportAPIView.as_view(), name='api-invoice-export'),
+    path(
+        'api/v1/invoices/write-queue/stats',
+        InvoiceWriteQueueStatsAPIView.as_view(),
+        name='api-invoice-write-queue-stats'
+    ),
 ]
@@ -0,0 +1,65 @@
+"""
+Version of the sales data, for the conditional GETs of the sellers endpoints.
+
+The version is a single row of the database (`SalesDataVersion`), moved forward by `bump_sales_data_version` in the
+transaction of every write to the data the reports are built from, whichever process runs it, and read by every
+process: it changes in all of them, and only, when the write commits.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.replica import replica_identity
+from apps.sales.models import SalesDataVersion
+
+# Last-Modified of a database without the row (e.g. emptied by hand), until the next write.
+NEVER_MODIFIED = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def sales_data_state() -> tuple[int, datetime]:
+    """
+    Returns the sales data version and the time of the write that moved it, in one query.
+    """
+    # from the default database even when the reports read the analytics replica: the version is written there
+    state = SalesDataVersion.objects.using(DEFAULT_DB_ALIAS).filter(pk=SalesDataVersion.SINGLETON_ID)
+    return state.values_list('version', 'modified').first() or (0, NEVER_MODIFIED)
+
+
+def sales_data_version() -> int:
+    """
+    Returns the sales data version, a number that increases on every write to the data the reports are built from.
+    """
+    return sales_data_state()[0]
+
+
+def sales_data_last_modified() -> datetime:
+    return sales_data_state()[1]
+
+
+def sales_read_state() -> tuple[str, datetime]:
+    """
+    Returns the version of the data the reports read and its last modification time: the sales data version and,
+    when there is an analytics replica, the identity of its current copy, which changes on every refresh whichever
+    process runs it.
+    """
+    version, modified = sales_data_state()
+    identity = replica_identity()
+    if identity is None:
+        return str(version), modified
+    inode, replica_modified = identity
+    return (
+        f'{version}-{inode}-{replica_modified}',
+        max(modified, datetime.fromtimestamp(replica_modified / 1e9, tz=dt_timezone.utc))
+    )
+
+
+def bump_sales_data_version() -> None:
+    """
+    Moves the sales data version forward, in the current transaction: the other processes see it move when the write
+    commits, and not at all if it is rolled back.
+    """
+    state = SalesDataVersion.objects.filter(pk=SalesDataVersion.SINGLETON_ID)
+    if not state.update(version=F('version') + 1, modified=timezone.now()):
+        SalesDataVersion.objects.create(pk=SalesDataVersion.SINGLETON_ID, version=1)
@@ -0,0 +1,215 @@
+"""
+Group commit of the invoice writes of concurrent requests.
+
+SQLite has a single writer: every transaction writing invoices takes the database write lock, and under concurrent
+point of sale traffic the requests queue up on it, one `BEGIN ... COMMIT` (and one fsync) per invoice, until some
+give up with `database is locked`. Here the writes of the request threads of a process are queued and coalesced: the
+first thread to find no write in progress becomes the leader, waits up to `max_delay` seconds (or until
+`max_batch_size` items are queued) for other threads to add theirs, and writes the whole batch in one transaction on
+its own connection. The other threads wait for their items to be written and get back their own results.
+
+A failed batch is written again one caller at a time, so that the error of one caller's rows (e.g. a customer deleted
+meanwhile) is only reported to that caller.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.db import IntegrityError, transaction
+
+from apps.sales.ingest import IngestResult, ingest_chunk, ingest_invoices
+
+
+class Outcome(NamedTuple):
+    # what `write_batch` returned for the item, or the error raised while writing it
+    result: Any
+    error: Exception | None
+
+
+class _Pending:
+    __slots__ = ('item', 'caller', 'queued_at', 'outcome')
+
+    def __init__(self, item, caller: object, queued_at: float):
+        self.item = item
+        self.caller = caller
+        self.queued_at = queued_at
+        self.outcome = None
+
+
+class GroupCommitQueue(ABC):
+    """
+    Queue of the items to write of the threads of a process, written in batches by `write_batch`.
+
+    Subclasses implement `write_batch`, which writes a list of items (in one transaction) and returns a result per
+    item, and can set `max_batch_size` and `max_delay`.
+    """
+    max_batch_size = 500
+    max_delay = 0.005
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._leading = False
+        self.reset_stats()
+
+    @abstractmethod
+    def write_batch(self, items: list) -> list:
+        ...
+
+    def submit(self, items: list) -> list[Outcome]:
+        """
+        Queues the items and returns, once they are written, the outcome of each.
+        """
+        caller = object()
+        queued_at = time.monotonic()
+        entries = [_Pending(item, caller, queued_at) for item in items]
+
+        with self._condition:
+            self._pending.extend(entries)
+            # wakes the leader up if its batch is now full
+            self._condition.notify_all()
+            while any(entry.outcome is None for entry in entries):
+                if self._leading:
+                    self._condition.wait()
+                else:
+                    self._lead()
+
+        return [entry.outcome for entry in entries]
+
+    def _lead(self) -> None:
+        # called with the lock held, which is released while waiting for more items and while writing
+        self._leading = True
+        try:
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch_size))]
+            started_at = time.monotonic()
+            self._condition.release()
+            try:
+                split = self._write(batch)
+            except BaseException as error:
+                # e.g. KeyboardInterrupt, the waiting threads get it too rather than waiting forever
+                for entry in batch:
+                    if entry.outcome is None:
+                        entry.outcome = Outcome(None, error)
+                raise
+            finally:
+                self._condition.acquire()
+            self._record(batch, started_at, split)
+        finally:
+            self._leading = False
+            self._condition.notify_all()
+
+    def _write(self, batch: list[_Pending]) -> bool:
+        """
+        Writes the batch and sets the outcome of its entries. Returns whether the batch failed and was written again
+        per caller.
+        """
+        try:
+            results = self.write_batch([entry.item for entry in batch])
+        except Exception as error:
+            callers = {}
+            for entry in batch:
+                callers.setdefault(entry.caller, []).append(entry)
+            if len(callers) == 1:
+                for entry in batch:
+                    entry.outcome = Outcome(None, error)
+                return False
+
+            for entries in callers.values():
+                self._write(entries)
+            return True
+
+        for entry, result in zip(batch, results):
+            entry.outcome = Outcome(result, None)
+        return False
+
+    def _record(self, batch: list[_Pending], started_at: float, split: bool) -> None:
+        waits = [started_at - entry.queued_at for entry in batch]
+        self._stats['batches'] += 1
+        self._stats['items'] += len(batch)
+        self._stats['split_batches'] += split
+        self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(batch))
+        self._stats['total_wait'] += sum(waits)
+        self._stats['max_wait'] = max(self._stats['max_wait'], *waits)
+
+    def reset_stats(self) -> None:
+        self._stats = {
+            'batches': 0, 'items': 0, 'split_batches': 0, 'max_batch_size': 0, 'total_wait': 0.0, 'max_wait': 0.0
+        }
+
+    def stats(self) -> dict:
+        """
+        Returns the number of batches written, of items written, of batches written again per caller after failing,
+        the average and largest batch sizes, and the average and longest time (in milliseconds) an item waited before
+        its batch started to be written.
+        """
+        with self._condition:
+            stats = dict(self._stats)
+        batches, items = stats['batches'], stats['items']
+
+        return {
+            'batches': batches,
+            'items': items,
+            'split_batches': stats['split_batches'],
+            'average_batch_size': round(items / batches, 2) if batches else None,
+            'max_batch_size': stats['max_batch_size'],
+            'average_wait_ms': round(stats['total_wait'] / items * 1000, 3) if items else None,
+            'max_wait_ms': round(stats['max_wait'] * 1000, 3),
+        }
+
+
+class InvoiceWriteQueue(GroupCommitQueue):
+    """
+    Invoices (dicts of `apps.sales.ingest.INVOICE_INPUT_FIELDS`), validated and written a batch at a time by
+    `ingest_chunk`. The result of an item is the id of the invoice written, or its validation errors per field.
+    """
+    @property
+    def max_batch_size(self) -> int:
+        return settings.INVOICE_WRITE_QUEUE_MAX_BATCH_SIZE
+
+    @property
+    def max_delay(self) -> float:
+        return settings.INVOICE_WRITE_QUEUE_MAX_DELAY
+
+    def write_batch(self, rows: list) -> list[int | dict]:
+        errors = {}
+        invoice_ids = iter(ingest_chunk(rows, errors))
+        return [errors[index] if index in errors else next(invoice_ids) for index in range(len(rows))]
+
+
+invoice_write_queue = InvoiceWriteQueue()
+
+
+def write_invoices(rows: list) -> IngestResult:
+    """
+    `ingest_invoices` through the invoice write queue: the rows are written in the transactions of the queue, with the
+    invoices of the concurrent requests of the process.
+
+    Inside a transaction, the rows are written directly (by `ingest_invoices`), as part of it.
+    """
+    if transaction.get_connection().in_atomic_block:
+        return ingest_invoices(rows)
+
+    invoice_ids = []
+    errors = {}
+    for index, (result, error) in enumerate(invoice_write_queue.submit(rows)):
+        if isinstance(error, IntegrityError):
+            errors[index] = {NON_FIELD_ERRORS: [f'The invoice could not be written: {error}']}
+        elif error is not None:
+            raise error
+        elif isinstance(result, dict):
+            errors[index] = result
+        else:
+            invoice_ids.append(result)
+
+    return IngestResult(invoice_ids, errors)
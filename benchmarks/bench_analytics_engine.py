@@ -0,0 +1,65 @@
+"""
+NumPy analytics engine against the SQL rankings.
+
+Times the rankings of both engines at several multiples of the Chinook data, as well as the initial load of the engine
+and an incremental refresh after one new invoice. Requires requirements/analytics.txt.
+
+Usage:
+    python -m benchmarks.bench_analytics_engine [scale ...]
+"""
+import sys
+import time
+
+from benchmarks.utils import benchmark_database, measure, populate_sales, print_table, setup_django
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from apps.sales.analytics import InvoiceFacts
+    from apps.sales.models import Invoice
+    from apps.sales.ranking import top_sales_reps_per_period, top_sales_reps_per_year
+
+    rankings = {
+        'top 1 per year': (
+            lambda: list(top_sales_reps_per_year()),
+            lambda facts: facts.top_sales_reps_per_year(),
+        ),
+        'top 3 per quarter': (
+            lambda: top_sales_reps_per_period('quarter', 3),
+            lambda facts: facts.top_sales_reps_per_period('quarter', 3),
+        ),
+        'top 3 per month': (
+            lambda: top_sales_reps_per_period('month', 3),
+            lambda facts: facts.top_sales_reps_per_period('month', 3),
+        ),
+    }
+
+    rows = []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale)
+
+            facts = InvoiceFacts()
+            start = time.perf_counter()
+            facts.refresh()
+            load_ms = (time.perf_counter() - start) * 1000
+
+            invoice = Invoice.objects.order_by('-id').first()
+            invoice.pk = None
+            Invoice.objects.bulk_create([invoice])
+            start = time.perf_counter()
+            facts.refresh()
+            refresh_ms = (time.perf_counter() - start) * 1000
+
+            rows.append([f'{scale}x', 'load / refresh', load_ms, refresh_ms, ''])
+            for name, (sql_ranking, numpy_ranking) in rankings.items():
+                sql_ms = measure(sql_ranking)
+                numpy_ms = measure(lambda: numpy_ranking(facts))
+                rows.append([f'{scale}x', name, sql_ms, numpy_ms, sql_ms / numpy_ms])
+
+    print_table(['scale', 'ranking', 'sql (ms)', 'numpy (ms)', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [1, 100, 1000])
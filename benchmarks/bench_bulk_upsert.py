@@ -0,0 +1,73 @@
+"""
+Bulk customer upsert against saving the customers one at a time.
+
+Writes a batch of customers, half of them replacing stored ones, either with `save()` (full_clean: one query per
+unique field and foreign key, per row) or with `apps.core.bulk.bulk_upsert` (one query per unique field and foreign
+key, per chunk). Reports the queries run and the rows written per second.
+
+Usage:
+    python -m benchmarks.bench_bulk_upsert [batch size ...]
+"""
+import sys
+import time
+
+from benchmarks.utils import benchmark_database, populate_sales, print_table, setup_django
+
+
+def main(batch_sizes: list[int]) -> None:
+    setup_django()
+
+    from django.db import connection, transaction
+
+    from apps.core.bulk import bulk_upsert
+    from apps.customers.models import Customer
+    from apps.employees.models import Employee
+
+    def rows(batch_size: int, stored_ids: list[int], sales_rep_ids: list[int], run: int) -> list[dict]:
+        return [
+            {
+                **({'id': stored_ids[index]} if index < len(stored_ids) else {}),
+                'first_name': f'Customer{index}', 'last_name': f'Run{run}', 'city': 'Lisbon', 'state': 'Lisbon',
+                'country': 'Portugal', 'phone': f'+351 {run} {index:09d}',
+                'email': f'customer{index}@{run}.example.com',
+                'support_representative': sales_rep_ids[index % len(sales_rep_ids)],
+            }
+            for index in range(batch_size)
+        ]
+
+    def saved_one_by_one(batch: list[dict]) -> None:
+        with transaction.atomic():
+            for row in batch:
+                customer = Customer(**{
+                    'support_representative_id' if field == 'support_representative' else field: value
+                    for field, value in row.items()
+                })
+                # a stored customer is replaced, as with a form on the instance read from the database
+                customer._state.adding = 'id' not in row
+                customer.save()
+
+    def upserted(batch: list[dict]) -> None:
+        result = bulk_upsert(Customer, batch)
+        assert not result.errors, result.errors
+
+    results = []
+    for batch_size in batch_sizes:
+        with benchmark_database():
+            populate_sales(1, customer_count=batch_size // 2)
+            sales_rep_ids = list(Employee.objects.values_list('id', flat=True))
+
+            for run, (name, write) in enumerate([('save() per row', saved_one_by_one), ('bulk_upsert', upserted)]):
+                stored_ids = list(Customer.objects.order_by('id').values_list('id', flat=True)[:batch_size // 2])
+                batch = rows(batch_size, stored_ids, sales_rep_ids, run)
+                queries = []
+                with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                    start = time.perf_counter()
+                    write(batch)
+                    seconds = time.perf_counter() - start
+                results.append([batch_size, name, len(queries), seconds * 1000, batch_size / seconds])
+
+    print_table(['customers', 'write', 'queries', 'total (ms)', 'customers/s'], results)
+
+
+if __name__ == '__main__':
+    main([int(batch_size) for batch_size in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,106 @@
+"""
+Catalog search with the FTS5 index of `apps.music.search` against `LIKE '%word%'` over the catalog columns.
+
+Fills a file database with a synthetic catalog (by default 1M tracks over 100k albums and 20k artists, named with
+words drawn from a skewed vocabulary, so that some words are in most names and others in a handful), then times the
+first page (20 results) of several searches: ranked by the index, and with `icontains` on the track name, composer,
+album title and artist name, ordered by track name as a listing would be. The index is filled by the triggers while
+the catalog is inserted, which is timed too.
+
+Usage:
+    python -m benchmarks.bench_catalog_search [track_count]
+"""
+import itertools
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, measure, print_table, setup_django
+
+VOCABULARY_SIZE = 20000
+BATCH_SIZE = 10000
+
+
+def main(track_count: int) -> None:
+    setup_django()
+
+    from django.db import connection, transaction
+    from django.db.models import Q
+
+    from apps.music.models import Album, Artist, Genre, MediaType, Track
+    from apps.music.search import search_catalog
+
+    rng = random.Random(0)
+    vocabulary = [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    # word ranks weighted 1/rank (Zipf)
+    cumulative_weights = list(itertools.accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+
+    def words(count: int) -> str:
+        return ' '.join(rng.choices(vocabulary, cum_weights=cumulative_weights, k=count)).title()
+
+    def populate(track_count: int) -> float:
+        start = time.perf_counter()
+        artist_count, album_count = max(track_count // 50, 1), max(track_count // 10, 1)
+        with transaction.atomic():
+            genre = Genre.objects.create(name='Rock')
+            media_type = MediaType.objects.create(name='MPEG audio file')
+            artists = Artist.objects.bulk_create(
+                (Artist(name=words(rng.randint(1, 3))) for _ in range(artist_count)), batch_size=BATCH_SIZE
+            )
+            albums = Album.objects.bulk_create(
+                (Album(title=words(rng.randint(1, 4)), artist=rng.choice(artists)) for _ in range(album_count)),
+                batch_size=BATCH_SIZE
+            )
+            for start_index in range(0, track_count, BATCH_SIZE):
+                Track.objects.bulk_create(
+                    Track(
+                        name=words(rng.randint(1, 5)), composer=words(2), milliseconds=240000, bytes=8000000,
+                        unit_price=Decimal('0.99'), album=rng.choice(albums), genre=genre, media_type=media_type
+                    )
+                    for _ in range(min(BATCH_SIZE, track_count - start_index))
+                )
+        return time.perf_counter() - start
+
+    def like_search(query: str) -> list:
+        tracks = Track.objects.all()
+        for word in query.split():
+            tracks = tracks.filter(
+                Q(name__icontains=word) | Q(composer__icontains=word) | Q(album__title__icontains=word)
+                | Q(album__artist__name__icontains=word)
+            )
+        return list(tracks.values_list('id', 'name')[:20])
+
+    searches = {
+        'frequent word': vocabulary[0],
+        'rare word': vocabulary[VOCABULARY_SIZE // 2],
+        'two words': f'{vocabulary[3]} {vocabulary[40]}',
+        '2 letter prefix': vocabulary[5][:2],
+        '4 letter prefix': vocabulary[10][:4],
+        'no match': 'zzzzzzzzzz',
+    }
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_catalog_search.db')
+
+        with benchmark_database():
+            seconds = populate(track_count)
+            print(f'Inserted {track_count} tracks (indexed by the triggers) in {seconds:.1f} s.')
+
+            for name, query in searches.items():
+                matches = len(search_catalog(query, ('track',), limit=track_count))
+                fts_ms = measure(lambda: search_catalog(query, ('track',)), repeat=5)
+                like_ms = measure(lambda: like_search(query), repeat=3)
+                rows.append([name, repr(query), matches, fts_ms, like_ms, like_ms / fts_ms])
+
+    print_table(['search', 'query', 'matching tracks', 'fts5 (ms)', 'like (ms)', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
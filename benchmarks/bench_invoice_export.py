@@ -0,0 +1,77 @@
+"""
+Bulk invoice export: lines read per chunk of invoices against per invoice.
+
+Exports every invoice with its lines as NDJSON (and gzip compressed NDJSON), reading the lines of each chunk of
+invoices with one query (`apps.sales.export`) or the lines of each invoice with its own query. Reports the number of
+queries, the total time and the peak of memory allocated while exporting, which should stay flat as the scale grows.
+
+Usage:
+    python -m benchmarks.bench_invoice_export [scale ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import benchmark_database, populate_invoice_lines, populate_sales, print_table, setup_django
+
+LINES_PER_INVOICE = 5
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.db import connection
+
+    from apps.music.reference import reference_data
+    from apps.sales.api.renderers import NDJSONRenderer
+    from apps.sales.export import (
+        INVOICE_RECORD_FIELDS,
+        gzip_chunks,
+        invoice_values,
+        iter_invoice_records,
+        line_values
+    )
+    from apps.sales.models import Invoice
+
+    def per_invoice_records():
+        for invoice in Invoice.objects.order_by('id').iterator(chunk_size=1000):
+            lines = invoice.invoice_lines.select_related('track__album').order_by('id')
+            reference = reference_data()
+            yield {**invoice_values(invoice), 'Lines': [line_values(line, reference) for line in lines]}
+
+    exports = [
+        ('lines per invoice', lambda: NDJSONRenderer().render_rows(per_invoice_records(), INVOICE_RECORD_FIELDS)),
+        ('lines per chunk', lambda: NDJSONRenderer().render_rows(iter_invoice_records(), INVOICE_RECORD_FIELDS)),
+        (
+            'lines per chunk, gzip',
+            lambda: gzip_chunks(NDJSONRenderer().render_rows(iter_invoice_records(), INVOICE_RECORD_FIELDS))
+        ),
+    ]
+
+    rows = []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale)
+            populate_invoice_lines(LINES_PER_INVOICE)
+
+            for name, export in exports:
+                queries = []
+                with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                    start = time.perf_counter()
+                    size = sum(len(chunk) for chunk in export())
+                    total_ms = (time.perf_counter() - start) * 1000
+
+                # measured apart, tracing the allocations slows the export down
+                tracemalloc.start()
+                for _ in export():
+                    pass
+                peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+
+                rows.append([f'{scale}x', name, len(queries), total_ms, size / 2 ** 20, peak_mb])
+
+    print_table(['scale', 'export', 'queries', 'total (ms)', 'output (MiB)', 'peak memory (MiB)'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [10, 50])
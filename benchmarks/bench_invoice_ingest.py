@@ -0,0 +1,80 @@
+"""
+Bulk invoice ingestion against saving the invoices one at a time.
+
+Creates a batch of invoices with their lines either with `save()` (full_clean, signals and rollups per row, one
+transaction per invoice and its lines) or with `apps.sales.ingest.ingest_invoices` (validated a chunk at a time,
+bulk inserts, rollups per sales rep and day). Reports the rows written per second and the queries run.
+
+Usage:
+    python -m benchmarks.bench_invoice_ingest [batch size ...]
+"""
+import sys
+import time
+
+from benchmarks.utils import benchmark_database, populate_invoice_lines, populate_sales, print_table, setup_django
+
+LINES_PER_INVOICE = 3
+
+
+def main(batch_sizes: list[int]) -> None:
+    setup_django()
+
+    from django.db import connection, transaction
+
+    from apps.customers.models import Customer
+    from apps.music.models import Track
+    from apps.sales.ingest import ingest_invoices
+    from apps.sales.models import Invoice, InvoiceLine
+
+    def saved_one_by_one(rows: list[dict]) -> None:
+        for row in rows:
+            with transaction.atomic():
+                invoice = Invoice(
+                    invoice_date=row['invoice_date'], customer_id=row['customer'], billing_city=row['billing_city'],
+                    total=row['total']
+                )
+                invoice.save()
+                for line in row['lines']:
+                    InvoiceLine(
+                        invoice=invoice, track_id=line['track'], unit_price=line['unit_price'],
+                        quantity=line['quantity']
+                    ).save()
+
+    def ingested(rows: list[dict]) -> None:
+        result = ingest_invoices(rows)
+        assert not result.errors, result.errors
+
+    results = []
+    for batch_size in batch_sizes:
+        with benchmark_database():
+            populate_sales(1)
+            populate_invoice_lines(0)
+            customer_ids = list(Customer.objects.values_list('id', flat=True))
+            track_ids = list(Track.objects.values_list('id', flat=True))
+            rows = [
+                {
+                    'invoice_date': f'2013-{index % 12 + 1:02d}-{index % 28 + 1:02d}T10:00:00+00:00',
+                    'customer': customer_ids[index % len(customer_ids)],
+                    'billing_city': 'Lisbon',
+                    'total': '2.97',
+                    'lines': [
+                        {'track': track_ids[(index + line) % len(track_ids)], 'unit_price': '0.99', 'quantity': 1}
+                        for line in range(LINES_PER_INVOICE)
+                    ],
+                }
+                for index in range(batch_size)
+            ]
+
+            for name, write in [('save() per row', saved_one_by_one), ('ingest_invoices', ingested)]:
+                queries = []
+                with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                    start = time.perf_counter()
+                    write(rows)
+                    seconds = time.perf_counter() - start
+                results.append([batch_size, name, len(queries), seconds * 1000, batch_size / seconds])
+
+    print_table(['invoices', 'write', 'queries', 'total (ms)', 'invoices/s'], results)
+
+
+if __name__ == '__main__':
+    main([int(batch_size) for batch_size in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,74 @@
+"""
+Sellers rankings read from the yearly invoice partitions of `apps.sales.partitions` against the SQL rankings.
+
+At several multiples of the Chinook data (5 years of invoices), times:
+- the rebuild of the partitions from the invoices (`rebuild_partitions`);
+- the top sales reps of one year and of every year, from the yearly summary table (the 'sql' engine), aggregated from
+  the `Invoice` table, and from the partitions (one partition, or all of them in parallel threads).
+
+Invoice writes don't touch the partitions, which are a projection rebuilt on demand, so they are not compared here.
+
+The test database is a file here, so that both sides read from disk the same way.
+
+Usage:
+    python -m benchmarks.bench_invoice_partitions [scale ...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, measure, populate_sales, print_table, setup_django
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from apps.sales.partitions import partitioned_top_sales_reps_per_year, rebuild_partitions
+    from apps.sales.ranking import top_sales_reps_per_period, top_sales_reps_per_year
+
+    rankings = {
+        'top 1 of 2011': (
+            lambda: list(top_sales_reps_per_year({'year': 2011})),
+            lambda: top_sales_reps_per_period('year', 1, {'year': 2011}),
+            lambda: partitioned_top_sales_reps_per_year({'year': 2011}),
+        ),
+        'top 1 per year': (
+            lambda: list(top_sales_reps_per_year()),
+            lambda: top_sales_reps_per_period('year', 1),
+            lambda: partitioned_top_sales_reps_per_year(),
+        ),
+    }
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_invoice_partitions.db')
+        settings.SALES_PARTITION_DIR = Path(directory) / 'partitions'
+
+        for scale in scales:
+            with benchmark_database():
+                populate_sales(scale)
+
+                start = time.perf_counter()
+                rebuild_partitions()
+                rows.append([f'{scale}x', 'rebuild', '', '', (time.perf_counter() - start) * 1000, ''])
+
+                for name, (summary_ranking, invoice_ranking, partitions_ranking) in rankings.items():
+                    assert summary_ranking() and partitions_ranking()
+                    summary_ms = measure(summary_ranking)
+                    invoice_ms = measure(invoice_ranking)
+                    partitions_ms = measure(partitions_ranking)
+                    rows.append([f'{scale}x', name, summary_ms, invoice_ms, partitions_ms, invoice_ms / partitions_ms])
+
+            for path in settings.SALES_PARTITION_DIR.iterdir():
+                path.unlink()
+
+    print_table(
+        ['scale', 'ranking', 'summary table (ms)', 'Invoice (ms)', 'partitions (ms)', 'Invoice / partitions'], rows
+    )
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [10, 100, 1000])
@@ -0,0 +1,106 @@
+"""
+Bulk playlist membership changes (`apps.playlists.membership`) against writing `PlaylistTrack` rows one by one.
+
+Fills a file database with a synthetic catalog of tracks, then times, on a new playlist each run:
+- adding `track_count` tracks: `PlaylistTrack.save()` per track (which runs `full_clean`, 3 queries, and an insert)
+against `add_tracks`;
+- replacing them with a list sharing half of them: deleting the rows and saving each track of the new list, against
+`replace_tracks`, which writes the difference;
+- removing them: `delete()` per row against `remove_tracks`.
+The per row changes run in one transaction too.
+
+Usage:
+    python -m benchmarks.bench_playlist_membership [track_count ...]
+"""
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, print_table, setup_django
+
+REPEAT = 3
+
+
+def main(track_counts: list[int]) -> None:
+    setup_django()
+
+    from django.db import connection, transaction
+
+    from apps.music.models import Album, Artist, Genre, MediaType, Track
+    from apps.playlists.membership import add_tracks, remove_tracks, replace_tracks
+    from apps.playlists.models import Playlist, PlaylistTrack
+
+    def populate(track_count: int) -> list[int]:
+        album = Album.objects.create(title='Album', artist=Artist.objects.create(name='Artist'))
+        genre = Genre.objects.create(name='Rock')
+        media_type = MediaType.objects.create(name='MPEG audio file')
+        tracks = Track.objects.bulk_create(
+            (
+                Track(
+                    name=f'Track {index}', milliseconds=240000, bytes=8000000, unit_price=Decimal('0.99'), album=album,
+                    genre=genre, media_type=media_type
+                )
+                for index in range(track_count * 2)
+            ),
+            batch_size=10000
+        )
+        return [track.pk for track in tracks]
+
+    def add_per_row(playlist: Playlist, track_ids: list[int]) -> None:
+        with transaction.atomic():
+            for track_id in track_ids:
+                PlaylistTrack(playlist=playlist, track_id=track_id).save()
+
+    def replace_per_row(playlist: Playlist, track_ids: list[int]) -> None:
+        with transaction.atomic():
+            PlaylistTrack.objects.filter(playlist=playlist).delete()
+            add_per_row(playlist, track_ids)
+
+    def remove_per_row(playlist: Playlist, track_ids: list[int]) -> None:
+        with transaction.atomic():
+            for playlist_track in PlaylistTrack.objects.filter(playlist=playlist, track_id__in=track_ids):
+                playlist_track.delete()
+
+    def timed(prepare, change) -> float:
+        # median over REPEAT runs, each on a new playlist prepared beforehand
+        durations = []
+        for _ in range(REPEAT):
+            playlist = Playlist.objects.create(name=f'Playlist {Playlist.objects.count()}')
+            prepare(playlist)
+            start = time.perf_counter()
+            change(playlist)
+            durations.append((time.perf_counter() - start) * 1000)
+        return statistics.median(durations)
+
+    rows = []
+    for track_count in track_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_playlist_membership.db')
+
+            with benchmark_database():
+                track_ids = populate(track_count)
+                added = track_ids[:track_count]
+                # half of the tracks kept, half new ones
+                replacement = track_ids[track_count // 2:track_count + track_count // 2]
+
+                def fill(playlist: Playlist) -> None:
+                    add_tracks(playlist, added)
+
+                operations = [
+                    ('add', lambda playlist: None, add_per_row, add_tracks, added),
+                    ('replace (half kept)', fill, replace_per_row, replace_tracks, replacement),
+                    ('remove', fill, remove_per_row, remove_tracks, added),
+                ]
+                for name, prepare, per_row, bulk, ids in operations:
+                    per_row_ms = timed(prepare, lambda playlist: per_row(playlist, ids))
+                    bulk_ms = timed(prepare, lambda playlist: bulk(playlist, ids))
+                    rows.append([track_count, name, per_row_ms, bulk_ms, per_row_ms / bulk_ms])
+
+    print_table(['tracks', 'change', 'per row (ms)', 'bulk (ms)', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main([int(track_count) for track_count in sys.argv[1:]] or [500, 5000])
@@ -0,0 +1,78 @@
+"""
+Genre and media type names from the reference data of `apps.music.reference` against reading them from the database.
+
+Fills a database with `scale` times the Chinook invoices, 5 lines each over 500 tracks, then times:
+- reading every invoice line with its track, album, genre and media type names, the names joined
+  (`select_related` of the genre and the media type) or resolved with the reference data;
+- resolving one genre name by id, with a query or with the reference data (loaded, then reloaded after a write).
+
+Usage:
+    python -m benchmarks.bench_reference_data [scale ...]
+"""
+import sys
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    populate_invoice_lines,
+    populate_sales,
+    print_table,
+    setup_django
+)
+
+LINES_PER_INVOICE = 5
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from apps.music.models import Genre
+    from apps.music.reference import bump_reference_data_version, clear_reference_data, reference_data
+    from apps.sales.models import InvoiceLine
+
+    def joined_names() -> list[tuple]:
+        lines = InvoiceLine.objects.select_related('track__album', 'track__genre', 'track__media_type')
+        return [
+            (line.track.name, line.track.album.title, line.track.genre.name, line.track.media_type.name)
+            for line in lines.order_by('id')
+        ]
+
+    def reference_names() -> list[tuple]:
+        reference = reference_data()
+        return [
+            (
+                line.track.name, line.track.album.title, reference.genres[line.track.genre_id],
+                reference.media_types[line.track.media_type_id]
+            )
+            for line in InvoiceLine.objects.select_related('track__album').order_by('id')
+        ]
+
+    def reloaded_name(genre_id: int) -> str:
+        bump_reference_data_version()
+        return reference_data().genres[genre_id]
+
+    line_rows, name_rows = [], []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale)
+            populate_invoice_lines(LINES_PER_INVOICE)
+            genre_id = Genre.objects.get().pk
+
+            assert joined_names() == reference_names()
+            joined_ms, reference_ms = measure(joined_names), measure(reference_names)
+            line_rows.append([f'{scale}x', InvoiceLine.objects.count(), joined_ms, reference_ms])
+
+            clear_reference_data()
+            genre_name = Genre.objects.values_list('name', flat=True)
+            query_us = measure(lambda: genre_name.get(pk=genre_id), repeat=1000) * 1000
+            loaded_us = measure(lambda: reference_data().genres[genre_id], repeat=1000) * 1000
+            reloaded_us = measure(lambda: reloaded_name(genre_id), repeat=100) * 1000
+            name_rows.append([f'{scale}x', query_us, loaded_us, reloaded_us])
+
+    print_table(['scale', 'invoice lines', 'names joined (ms)', 'reference data (ms)'], line_rows)
+    print()
+    print_table(['scale', 'query (us)', 'reference data (us)', 'reference data after a write (us)'], name_rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [10, 50])
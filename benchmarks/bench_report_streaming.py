@@ -0,0 +1,72 @@
+"""
+Streamed (NDJSON) against paginated JSON leaderboard responses.
+
+A monthly top 100 over many sales reps is read either as pages of JSON (at most 1000 rows each) or as one NDJSON stream.
+Reports the time to the first byte, the total time and the peak of memory allocated while producing the response.
+
+Usage:
+    python -m benchmarks.bench_report_streaming [scale ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import benchmark_database, populate_sales, print_table, setup_django
+
+SALES_REPS = 300
+CUSTOMERS = 3000
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.test import RequestFactory
+
+    from apps.sales.api.views import SalesRepLeaderboardAPIView
+    from apps.sales.cache import get_sellers_cache
+
+    view = SalesRepLeaderboardAPIView.as_view()
+    request_factory = RequestFactory()
+
+    def get(query: str):
+        return view(request_factory.get(f'/api/v1/sellers/leaderboard?period=month&top=100&{query}'))
+
+    def json_pages() -> tuple[float, int]:
+        start = time.perf_counter()
+        response = get('page_size=1000')
+        response.render()
+        first_byte = time.perf_counter() - start
+        rows = len(response.data['results'])
+        while response.data['next_cursor']:
+            response = get(f"page_size=1000&cursor={response.data['next_cursor']}")
+            response.render()
+            rows += len(response.data['results'])
+        return first_byte, rows
+
+    def ndjson_stream() -> tuple[float, int]:
+        start = time.perf_counter()
+        chunks = iter(get('format=ndjson').streaming_content)
+        next(chunks)
+        first_byte = time.perf_counter() - start
+        return first_byte, 1 + sum(1 for _ in chunks)
+
+    rows = []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale, sales_rep_count=SALES_REPS, customer_count=CUSTOMERS)
+
+            for name, read in [('json pages', json_pages), ('ndjson stream', ndjson_stream)]:
+                get_sellers_cache().clear()
+                tracemalloc.start()
+                start = time.perf_counter()
+                first_byte, row_count = read()
+                total_ms = (time.perf_counter() - start) * 1000
+                peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+                rows.append([f'{scale}x', name, row_count, first_byte * 1000, total_ms, peak_mb])
+
+    print_table(['scale', 'response', 'rows', 'first byte (ms)', 'total (ms)', 'peak memory (MiB)'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [10, 100])
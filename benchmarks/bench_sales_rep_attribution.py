@@ -0,0 +1,59 @@
+"""
+Join elimination gain of the sales rep attribution stored on Invoice.
+
+Compares the per sales rep aggregates computed through Invoice -> Customer -> SupportRepId (as before the
+`Invoice.sales_rep` column) with the same aggregates on `Invoice.sales_rep`, at several multiples of the Chinook data.
+
+Usage:
+    python -m benchmarks.bench_sales_rep_attribution [scale ...]
+"""
+import sys
+
+from benchmarks.utils import benchmark_database, measure, populate_sales, print_table, setup_django
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.db.models import Sum
+
+    from apps.sales.models import Invoice
+
+    # (period fields grouped on, lookups restricting the invoices)
+    queries = {
+        'per year': (('year',), {}),
+        'per month': (('year', 'month'), {}),
+        'one year per month': (('year', 'month'), {'year': 2011}),
+    }
+
+    rows = []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale)
+
+            for name, (period_fields, lookups) in queries.items():
+                def through_customer():
+                    list(
+                        Invoice.objects.filter(customer__support_representative__isnull=False, **lookups)
+                        .values('customer__support_representative', *period_fields)
+                        .annotate(total_sales=Sum('total'))
+                        .order_by()
+                    )
+
+                def on_invoice():
+                    list(
+                        Invoice.objects.filter(sales_rep__isnull=False, **lookups)
+                        .values('sales_rep', *period_fields)
+                        .annotate(total_sales=Sum('total'))
+                        .order_by()
+                    )
+
+                join_ms = measure(through_customer)
+                denormalized_ms = measure(on_invoice)
+                rows.append([f'{scale}x', name, join_ms, denormalized_ms, join_ms / denormalized_ms])
+
+    print_table(['scale', 'aggregate', 'customer join (ms)', 'Invoice.sales_rep (ms)', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [1, 10, 100])
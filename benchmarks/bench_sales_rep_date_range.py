@@ -0,0 +1,62 @@
+"""
+Top sales rep between two dates: running totals against aggregating the invoices of the range.
+
+Usage:
+    python -m benchmarks.bench_sales_rep_date_range [scale ...]
+"""
+import sys
+
+from datetime import date, datetime, time
+
+from benchmarks.utils import benchmark_database, measure, populate_sales, print_table, setup_django
+
+RANGES = [
+    (date(2011, 3, 1), date(2011, 3, 31)),
+    (date(2010, 7, 1), date(2011, 6, 30)),
+    (date(2009, 1, 1), date(2013, 12, 31)),
+]
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from apps.sales.models import Invoice
+    from apps.sales.ranking import top_sales_reps_between
+
+    rows = []
+    for scale in scales:
+        with benchmark_database():
+            populate_sales(scale)
+
+            for date_from, date_to in RANGES:
+                def invoice_aggregate():
+                    per_rep = (
+                        Invoice.objects.filter(
+                            sales_rep__isnull=False,
+                            invoice_date__gte=timezone.make_aware(datetime.combine(date_from, time.min)),
+                            invoice_date__lte=timezone.make_aware(datetime.combine(date_to, time.max)),
+                        )
+                        .values('sales_rep')
+                        .annotate(total_sales=Sum('total'))
+                        .order_by('-total_sales')
+                    )
+                    list(per_rep)
+
+                def running_totals():
+                    list(top_sales_reps_between(date_from, date_to))
+
+                aggregate_ms = measure(invoice_aggregate)
+                running_totals_ms = measure(running_totals)
+                rows.append([
+                    f'{scale}x', f'{date_from} - {date_to}', aggregate_ms, running_totals_ms,
+                    aggregate_ms / running_totals_ms
+                ])
+
+    print_table(['scale', 'range', 'invoice aggregate (ms)', 'running totals (ms)', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [1, 10, 100])
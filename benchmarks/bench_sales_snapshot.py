@@ -0,0 +1,51 @@
+"""
+Start-up cost of the numpy analytics engine in a worker: loading the invoices from the database against memory mapping
+the current snapshot.
+
+The private memory is what each worker holds on its own (the columns it loaded), the shared memory is the snapshot's,
+mapped from the page cache once for all the workers. Requires requirements/analytics.txt.
+
+Usage:
+    python -m benchmarks.bench_sales_snapshot [scale ...]
+"""
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import benchmark_database, populate_sales, print_table, setup_django
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.conf import settings
+
+    from apps.sales.analytics import InvoiceFacts, invoice_rewrites
+    from apps.sales.snapshot import write_snapshot
+
+    def load(facts: InvoiceFacts) -> list:
+        start = time.perf_counter()
+        snapshot_columns, columns = facts.refresh()
+        load_ms = (time.perf_counter() - start) * 1000
+        private_mb = sum(column.nbytes for column in columns) / 2 ** 20
+        shared_mb = sum(column.nbytes for column in snapshot_columns) / 2 ** 20
+        return [load_ms, private_mb, shared_mb]
+
+    rows = []
+    for scale in scales:
+        with benchmark_database(), tempfile.TemporaryDirectory() as snapshot_dir:
+            populate_sales(scale)
+            settings.SALES_SNAPSHOT_DIR = snapshot_dir
+
+            rows.append([f'{scale}x', 'database', *load(InvoiceFacts())])
+
+            start = time.perf_counter()
+            write_snapshot(invoice_rewrites())
+            write_ms = (time.perf_counter() - start) * 1000
+            rows.append([f'{scale}x', f'snapshot (written in {write_ms:.0f} ms)', *load(InvoiceFacts())])
+
+    print_table(['scale', 'engine loaded from', 'load (ms)', 'private (MiB)', 'shared (MiB)'], rows)
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [1, 100, 1000])
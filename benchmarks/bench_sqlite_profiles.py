@@ -0,0 +1,163 @@
+"""
+Read and write throughput of the SQLite connection profiles of `apps.core.sqlite`.
+
+For SQLite's defaults and each profile (with the write-ahead log), a file database is filled with `scale` times the
+Chinook invoices, then:
+- the sellers endpoints (by year, date range, overall and monthly leaderboard, without the response cache) are
+  requested in turn, alone and while another process writes invoices one at a time;
+- invoices are created one at a time (one transaction each, as the point of sale requests);
+- invoices are bulk ingested with `ingest_invoices`.
+The 'analytics' profile is read only: its writes are not measured, and the concurrent writer uses 'serving'.
+
+The writer is a process rather than a thread, so that it competes with the reads for the database and not for the GIL.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profiles [scale ...]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    populate_invoice_lines,
+    populate_sales,
+    print_table,
+    setup_django
+)
+
+READ_ROUNDS = 10
+SINGLE_WRITES = 300
+BULK_WRITES = 5000
+
+
+def main(scales: list[int]) -> None:
+    setup_django()
+
+    from django.db import connection
+    from django.test import RequestFactory
+
+    from apps.core.sqlite import PROFILES, apply_profile, sqlite_options
+    from apps.customers.models import Customer
+    from apps.music.models import Track
+    from apps.sales.api.views import (
+        SalesRepLeaderboardAPIView,
+        TopSalesRepBetweenDatesAPIView,
+        TopSalesRepByYearAPIView,
+        TopSalesRepsOverallAPIView
+    )
+    from apps.sales.cache import get_sellers_cache
+    from apps.sales.ingest import ingest_invoices
+
+    request_factory = RequestFactory()
+    requests = [
+        (TopSalesRepByYearAPIView.as_view(), '/api/v1/sellers/2011/top', {'year': '2011'}),
+        (TopSalesRepBetweenDatesAPIView.as_view(), '/api/v1/sellers/range/top?from=2010-03-01&to=2012-06-30', {}),
+        (TopSalesRepsOverallAPIView.as_view(), '/api/v1/sellers/top', {}),
+        (SalesRepLeaderboardAPIView.as_view(), '/api/v1/sellers/leaderboard?period=month&top=3', {}),
+    ]
+
+    def read_round() -> None:
+        for view, url, kwargs in requests:
+            get_sellers_cache().clear()
+            response = view(request_factory.get(url), **kwargs)
+            response.render()
+            assert response.status_code == 200, response.status_code
+
+    def read_rounds() -> float:
+        # median of the runs, the reads are short and their timings noisy
+        milliseconds = measure(lambda: [read_round() for _ in range(READ_ROUNDS)])
+        return READ_ROUNDS * len(requests) / milliseconds * 1000
+
+    def invoice_rows(count: int, customer_ids: list[int], track_ids: list[int]) -> list[dict]:
+        return [
+            {
+                'invoice_date': f'2013-{index % 12 + 1:02d}-{index % 28 + 1:02d}T10:00:00+00:00',
+                'customer': customer_ids[index % len(customer_ids)],
+                'billing_city': 'Lisbon',
+                'total': '1.98',
+                'lines': [{'track': track_ids[index % len(track_ids)], 'unit_price': '0.99', 'quantity': 2}],
+            }
+            for index in range(count)
+        ]
+
+    def single_writes(rows: list[dict]) -> float:
+        start = time.perf_counter()
+        for row in rows:
+            assert ingest_invoices([row]).invoice_ids
+        return len(rows) / (time.perf_counter() - start)
+
+    def bulk_writes(rows: list[dict]) -> float:
+        start = time.perf_counter()
+        assert not ingest_invoices(rows).errors
+        return len(rows) / (time.perf_counter() - start)
+
+    def write_until(stop, written, profile: str | None, rows: list[dict]) -> None:
+        # forked with the connection closed, the process opens its own
+        if profile == 'analytics':
+            apply_profile(connection, 'serving')
+        for row in rows:
+            if stop.is_set():
+                break
+            ingest_invoices([row])
+            written.value += 1
+        connection.close()
+
+    def reads_while_writing(profile: str | None, rows: list[dict]) -> tuple[float, float]:
+        """
+        Returns the reads per second, and the writes per second of the other process meanwhile.
+        """
+        context = multiprocessing.get_context('fork')
+        stop, written = context.Event(), context.Value('i', 0)
+        connection.close()
+        writer = context.Process(target=write_until, args=(stop, written, profile, rows))
+        writer.start()
+        start = time.perf_counter()
+        try:
+            reads = read_rounds()
+        finally:
+            stop.set()
+            seconds = time.perf_counter() - start
+            writer.join()
+        return reads, written.value / seconds
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_sqlite_profiles.db')
+
+        for scale in scales:
+            for profile in [None, *PROFILES]:
+                connection.settings_dict['OPTIONS'] = {}
+                with benchmark_database():
+                    populate_sales(scale)
+                    populate_invoice_lines(2)
+                    customer_ids = list(Customer.objects.values_list('id', flat=True))
+                    track_ids = list(Track.objects.values_list('id', flat=True))
+                    rows = invoice_rows(SINGLE_WRITES + BULK_WRITES, customer_ids, track_ids)
+                    # reconnect with the pragmas of the profile
+                    connection.settings_dict['OPTIONS'] = sqlite_options(profile, 'WAL') if profile else {}
+                    connection.close()
+
+                    reads = read_rounds()
+                    contended_reads, contended_writes = reads_while_writing(profile, rows)
+                    if profile == 'analytics':
+                        writes = bulk = '-'
+                    else:
+                        writes = single_writes(rows[:SINGLE_WRITES])
+                        bulk = bulk_writes(rows[SINGLE_WRITES:])
+                    results.append([
+                        f'{scale}x', profile or 'sqlite defaults', reads, contended_reads, contended_writes, writes,
+                        bulk
+                    ])
+
+    print_table(
+        ['scale', 'profile', 'reads/s', 'reads/s (1 writer)', 'writer writes/s', 'single writes/s', 'bulk invoices/s'],
+        results
+    )
+
+
+if __name__ == '__main__':
+    main([int(scale) for scale in sys.argv[1:]] or [10])
@@ -0,0 +1,139 @@
+"""
+Track listing from the `TrackCatalogEntry` read model against reading `Track` with its related rows.
+
+Fills a file database with a synthetic catalog (25 genres, 5 media types, one artist per 50 tracks and one album per
+10), then times a page of 100 tracks with their album, artist, genre and media type names, ordered by name:
+- with the ORM, following the foreign keys of each track (the N+1 queries of a naive serializer);
+- with the ORM and `select_related` (one five-table join), paginated with OFFSET;
+- from the read model, paginated with the keyset cursor of `GET api/v1/catalog/tracks`;
+each for the first page and a deep one, all the tracks and the tracks of one genre or artist.
+
+Usage:
+    python -m benchmarks.bench_track_catalog [track_count]
+"""
+import random
+import sys
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, measure, print_table, setup_django
+
+PAGE_SIZE = 100
+BATCH_SIZE = 10000
+
+
+def main(track_count: int) -> None:
+    setup_django()
+
+    from django.db import connection, reset_queries, transaction
+    from django.test import RequestFactory
+
+    from apps.music.api.views import TrackCatalogAPIView
+    from apps.music.models import Album, Artist, Genre, MediaType, Track
+
+    rng = random.Random(0)
+
+    def populate() -> None:
+        with transaction.atomic():
+            genres = Genre.objects.bulk_create(Genre(name=f'Genre {index}') for index in range(25))
+            media_types = MediaType.objects.bulk_create(MediaType(name=f'Media type {index}') for index in range(5))
+            artists = Artist.objects.bulk_create(
+                (Artist(name=f'Artist {index}') for index in range(max(track_count // 50, 1))), batch_size=BATCH_SIZE
+            )
+            albums = Album.objects.bulk_create(
+                (
+                    Album(title=f'Album {index}', artist=rng.choice(artists))
+                    for index in range(max(track_count // 10, 1))
+                ),
+                batch_size=BATCH_SIZE
+            )
+            for start in range(0, track_count, BATCH_SIZE):
+                Track.objects.bulk_create(
+                    Track(
+                        name=f'Track {rng.randrange(track_count):08d}', composer='Composer', milliseconds=240000,
+                        bytes=8000000, unit_price=Decimal('0.99'), album=rng.choice(albums),
+                        genre=rng.choice(genres), media_type=rng.choice(media_types)
+                    )
+                    for _ in range(min(BATCH_SIZE, track_count - start))
+                )
+
+    def track_rows(tracks) -> list[dict]:
+        return [
+            {
+                'Id': track.id, 'Name': track.name, 'Album': track.album.title, 'Artist': track.album.artist.name,
+                'Genre': track.genre.name, 'Media Type': track.media_type.name,
+            }
+            for track in tracks
+        ]
+
+    def naive_page(filters: dict, offset: int) -> list[dict]:
+        return track_rows(Track.objects.filter(**filters).order_by('name', 'id')[offset:offset + PAGE_SIZE])
+
+    def joined_page(filters: dict, offset: int) -> list[dict]:
+        tracks = Track.objects.filter(**filters).select_related('album__artist', 'genre', 'media_type')
+        return track_rows(tracks.order_by('name', 'id')[offset:offset + PAGE_SIZE])
+
+    view = TrackCatalogAPIView.as_view()
+    request_factory = RequestFactory()
+
+    def read_model_response(params: dict, cursor: str | None):
+        query = {**params, 'page_size': PAGE_SIZE, **({'cursor': cursor} if cursor else {})}
+        return view(request_factory.get('/', query))
+
+    def read_model_cursor(params: dict, offset: int) -> str | None:
+        # the cursor of the page starting at `offset`, found by following the pages
+        cursor = None
+        for _ in range(offset // PAGE_SIZE):
+            cursor = read_model_response(params, cursor).data['next_cursor']
+        return cursor
+
+    def read_model_page(params: dict, cursor: str | None) -> list[dict]:
+        return read_model_response(params, cursor).data['results']
+
+    def queries(func) -> int:
+        reset_queries()
+        func()
+        return len(connection.queries)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_track_catalog.db')
+
+        with benchmark_database():
+            populate()
+            connection.force_debug_cursor = True
+            listings = {
+                'all tracks': ({}, {}),
+                'one genre': ({'genre_id': Genre.objects.first().pk}, {'genre': Genre.objects.first().pk}),
+                'one artist': (
+                    {'album__artist_id': Artist.objects.first().pk}, {'artist': Artist.objects.first().pk}
+                ),
+            }
+
+            for name, (filters, params) in listings.items():
+                for page_name, offset in [('first page', 0), ('page 50', 49 * PAGE_SIZE)]:
+                    count = Track.objects.filter(**filters).count()
+                    if offset >= count:
+                        continue
+                    cursor = read_model_cursor(params, offset)
+                    assert [row['Id'] for row in read_model_page(params, cursor)] == [
+                        row['Id'] for row in joined_page(filters, offset)
+                    ]
+                    rows.append([
+                        name, page_name,
+                        measure(lambda: naive_page(filters, offset), repeat=3),
+                        queries(lambda: naive_page(filters, offset)),
+                        measure(lambda: joined_page(filters, offset)),
+                        measure(lambda: read_model_page(params, cursor)),
+                        queries(lambda: read_model_page(params, cursor)),
+                    ])
+            connection.force_debug_cursor = False
+
+    print_table(
+        ['listing', 'page', 'naive ORM (ms)', 'queries', 'select_related (ms)', 'read model (ms)', 'queries'], rows
+    )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
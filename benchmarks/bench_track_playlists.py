@@ -0,0 +1,122 @@
+"""
+Playlists of a track read from the (track, playlist) index of `PlaylistTrack` against the primary key alone and the
+former single column index on the track.
+
+Fills a file database with `track_count` tracks and 1000 playlists of 500 random tracks each, then times, with each
+index in turn (dropping and creating them):
+- the playlists of one track (`track_playlists`);
+- the playlists of a page of 100 tracks, in one query (`track_playlists`) or one query per track;
+- the PROTECT check of a track deletion, as run by Django.
+
+Usage:
+    python -m benchmarks.bench_track_playlists [track_count]
+"""
+import random
+import sys
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, measure, print_table, setup_django
+
+PLAYLIST_COUNT = 1000
+PLAYLIST_SIZE = 500
+PAGE_SIZE = 100
+
+INDEXES = {
+    'primary key only': None,
+    'TrackId': 'CREATE INDEX bench_track_idx ON PlaylistTrack (TrackId)',
+    'TrackId, PlaylistId': 'CREATE INDEX playlist_track_track_idx ON PlaylistTrack (TrackId, PlaylistId)',
+}
+
+
+def main(track_count: int) -> None:
+    setup_django()
+
+    from django.db import connection, transaction
+
+    from apps.music.models import Album, Artist, Genre, MediaType, Track
+    from apps.playlists.membership import track_playlists
+    from apps.playlists.models import Playlist, PlaylistTrack
+
+    rng = random.Random(0)
+
+    def populate() -> list[int]:
+        with transaction.atomic():
+            album = Album.objects.create(title='Album', artist=Artist.objects.create(name='Artist'))
+            genre = Genre.objects.create(name='Rock')
+            media_type = MediaType.objects.create(name='MPEG audio file')
+            tracks = Track.objects.bulk_create(
+                (
+                    Track(
+                        name=f'Track {index}', milliseconds=240000, bytes=8000000, unit_price=Decimal('0.99'),
+                        album=album, genre=genre, media_type=media_type
+                    )
+                    for index in range(track_count)
+                ),
+                batch_size=10000
+            )
+            track_ids = [track.pk for track in tracks]
+            playlists = Playlist.objects.bulk_create(
+                Playlist(name=f'Playlist {index}') for index in range(PLAYLIST_COUNT)
+            )
+            PlaylistTrack.objects.bulk_create(
+                (
+                    PlaylistTrack(playlist=playlist, track_id=track_id)
+                    for playlist in playlists
+                    for track_id in rng.sample(track_ids, PLAYLIST_SIZE)
+                ),
+                batch_size=10000
+            )
+        return track_ids
+
+    def per_track(track_ids: list[int]) -> dict:
+        playlists = {}
+        for page_track_id in track_ids:
+            playlists.update(track_playlists([page_track_id]))
+        return playlists
+
+    def protect_check(track_id: int) -> list:
+        # the query of the PROTECT collector of Track.delete()
+        return list(PlaylistTrack.objects.filter(track_id__in=[track_id]))
+
+    def execute(sql: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_track_playlists.db')
+
+        with benchmark_database():
+            track_ids = populate()
+            page = rng.sample(track_ids, PAGE_SIZE)
+            track_id = page[0]
+            execute('DROP INDEX playlist_track_track_idx')
+
+            for name, create_index in INDEXES.items():
+                if create_index:
+                    execute(create_index)
+                execute('ANALYZE')
+                assert per_track(page) == track_playlists(page)
+                rows.append([
+                    name,
+                    measure(lambda: track_playlists([track_id])),
+                    measure(lambda: track_playlists(page)),
+                    measure(lambda: per_track(page)),
+                    measure(lambda: protect_check(track_id)),
+                ])
+                if create_index:
+                    execute(f'DROP INDEX {create_index.split()[2]}')
+
+    print_table(
+        [
+            'index', 'one track (ms)', f'{PAGE_SIZE} tracks, one query (ms)', f'{PAGE_SIZE} tracks, per track (ms)',
+            'PROTECT check (ms)',
+        ],
+        rows
+    )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,97 @@
+"""
+Concurrent invoice writes with and without the group commit of the invoice write queue.
+
+Runs a number of threads that each create invoices one at a time, as point of sale requests would, either with
+`ingest_invoices` (one transaction per invoice, every thread competing for the SQLite write lock) or with
+`apps.sales.write_queue.write_invoices` (the invoices of the threads written together). Reports the invoices written
+per second, the writes that failed with `database is locked`, and the batch sizes and queue waits of the queue.
+
+The test database is a file here, as the in-memory one is not shared by the connections of the threads in the same
+way.
+
+Usage:
+    python -m benchmarks.bench_write_queue [threads ...]
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, populate_invoice_lines, populate_sales, print_table, setup_django
+
+INVOICES_PER_THREAD = 100
+
+
+def main(thread_counts: list[int]) -> None:
+    setup_django()
+
+    from django.db import OperationalError, connection
+
+    from apps.customers.models import Customer
+    from apps.music.models import Track
+    from apps.sales.ingest import ingest_invoices
+    from apps.sales.write_queue import invoice_write_queue, write_invoices
+
+    def run(write, rows: list[dict], thread_count: int) -> tuple[int, int, float]:
+        written, locked = [0] * thread_count, [0] * thread_count
+
+        def create_invoices(thread_index: int) -> None:
+            try:
+                for row in rows[thread_index::thread_count]:
+                    try:
+                        result = write([row])
+                    except OperationalError:
+                        locked[thread_index] += 1
+                    else:
+                        written[thread_index] += len(result.invoice_ids)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create_invoices, args=(index,)) for index in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(written), sum(locked), time.perf_counter() - start
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench_write_queue.db')
+
+        for thread_count in thread_counts:
+            with benchmark_database():
+                populate_sales(1)
+                populate_invoice_lines(0)
+                customer_ids = list(Customer.objects.values_list('id', flat=True))
+                track_ids = list(Track.objects.values_list('id', flat=True))
+                rows = [
+                    {
+                        'invoice_date': f'2013-{index % 12 + 1:02d}-{index % 28 + 1:02d}T10:00:00+00:00',
+                        'customer': customer_ids[index % len(customer_ids)],
+                        'billing_city': 'Lisbon',
+                        'total': '0.99',
+                        'lines': [{'track': track_ids[index % len(track_ids)], 'unit_price': '0.99', 'quantity': 1}],
+                    }
+                    for index in range(thread_count * INVOICES_PER_THREAD)
+                ]
+                # the threads open their own connections to the file
+                connection.close()
+
+                for name, write in [('ingest_invoices', ingest_invoices), ('write queue', write_invoices)]:
+                    invoice_write_queue.reset_stats()
+                    written, locked, seconds = run(write, rows, thread_count)
+                    stats = invoice_write_queue.stats()
+                    results.append([
+                        thread_count, name, written, locked, written / seconds,
+                        stats['average_batch_size'] or '-', stats['average_wait_ms'] or '-',
+                    ])
+
+    print_table(
+        ['threads', 'write', 'written', 'locked', 'invoices/s', 'avg batch', 'avg wait (ms)'], results
+    )
+
+
+if __name__ == '__main__':
+    main([int(thread_count) for thread_count in sys.argv[1:]] or [1, 8, 32])
@@ -0,0 +1,154 @@
+"""
+Helpers shared by the benchmarks.
+
+Benchmarks run against a throwaway test database (never `data.db`), filled with synthetic data shaped like the
+Chinook sample: 3 sales representatives, 59 customers and 412 invoices over 2009-2013 at scale 1.
+"""
+import os
+import random
+import statistics
+import time
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+CHINOOK_INVOICES = 412
+CHINOOK_CUSTOMERS = 59
+CHINOOK_SALES_REPS = 3
+
+
+def setup_django() -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'home_task.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmarks')
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Creates a test database for the default connection, migrated and empty, and destroys it on exit.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def populate_sales(
+        scale: int = 1,
+        seed: int = 0,
+        sales_rep_count: int = CHINOOK_SALES_REPS,
+        customer_count: int = CHINOOK_CUSTOMERS
+) -> None:
+    """
+    Bulk inserts `sales_rep_count` sales representatives, `customer_count` customers and `scale` times the Chinook number of
+    invoices.
+
+    Rows are bulk created, so the reporting tables maintained on save are rebuilt at the end.
+    """
+    from django.utils import timezone
+
+    from apps.customers.models import Customer
+    from apps.employees.models import Employee
+    from apps.sales.models import Invoice
+    from apps.sales.rollups import rebuild_sales_rep_daily_cumulative, rebuild_sales_rep_summary
+
+    rng = random.Random(seed)
+    hire_date = timezone.make_aware(datetime(2002, 4, 1))
+
+    sales_reps = Employee.objects.bulk_create(
+        Employee(
+            first_name=f'Rep{index}', last_name='Sales', title='Sales Support Agent', hire_date=hire_date,
+            city='Calgary', state='AB', country='Canada', phone=f'+1 (403) 262-{index:04d}',
+            email=f'rep{index}@example.com'
+        )
+        for index in range(sales_rep_count)
+    )
+    customers = Customer.objects.bulk_create(
+        Customer(
+            first_name=f'Customer{index}', last_name='Chinook', city='Lisbon', state='Lisbon', country='Portugal',
+            support_representative=sales_reps[index % len(sales_reps)]
+        )
+        for index in range(customer_count)
+    )
+
+    start = timezone.make_aware(datetime(2009, 1, 1))
+    days = (timezone.make_aware(datetime(2014, 1, 1)) - start).days
+    batch = []
+    for _ in range(CHINOOK_INVOICES * scale):
+        customer = rng.choice(customers)
+        invoice = Invoice(
+            invoice_date=start + timedelta(days=rng.randrange(days)),
+            total=Decimal(rng.randrange(99, 2500)) / 100,
+            customer=customer,
+            sales_rep_id=customer.support_representative_id,
+        )
+        invoice.set_date_parts()
+        batch.append(invoice)
+        if len(batch) == 5000:
+            Invoice.objects.bulk_create(batch)
+            batch = []
+    Invoice.objects.bulk_create(batch)
+
+    rebuild_sales_rep_summary()
+    rebuild_sales_rep_daily_cumulative()
+
+
+def populate_invoice_lines(lines_per_invoice: int = 4, track_count: int = 500, seed: int = 0) -> None:
+    """
+    Bulk inserts `track_count` tracks (with one artist, album, genre and media type) and `lines_per_invoice` lines for
+    every invoice.
+    """
+    from apps.music.models import Album, Artist, Genre, MediaType, Track
+    from apps.sales.models import Invoice, InvoiceLine
+
+    rng = random.Random(seed)
+
+    album = Album.objects.create(title='Chinook Hits', artist=Artist.objects.create(name='Chinook'))
+    genre = Genre.objects.create(name='Rock')
+    media_type = MediaType.objects.create(name='MPEG audio file')
+    tracks = Track.objects.bulk_create(
+        Track(
+            name=f'Track{index}', composer='Chinook', milliseconds=240000, bytes=8000000, unit_price=Decimal('0.99'),
+            album=album, genre=genre, media_type=media_type
+        )
+        for index in range(track_count)
+    )
+
+    batch = []
+    for invoice_id in Invoice.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=5000):
+        for _ in range(lines_per_invoice):
+            batch.append(InvoiceLine(
+                invoice_id=invoice_id, track=rng.choice(tracks), unit_price=Decimal('0.99'), quantity=rng.randint(1, 3)
+            ))
+        if len(batch) >= 5000:
+            InvoiceLine.objects.bulk_create(batch)
+            batch = []
+    InvoiceLine.objects.bulk_create(batch)
+
+
+def measure(func, repeat: int = 7) -> float:
+    """
+    Runs `func` `repeat` times (after one warm-up run) and returns the median duration in milliseconds.
+    """
+    func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    rows = [[f'{value:.2f}' if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, ['-' * width for width in widths], *rows]:
+        print('  '.join(str(cell).rjust(width) for cell, width in zip(row, widths)))
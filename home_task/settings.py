@@ -14,6 +14,8 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from apps.core.sqlite import sqlite_options
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -85,13 +87,77 @@ WSGI_APPLICATION = 'home_task.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Pragmas applied to the SQLite connections (see apps/core/sqlite.py): 'serving' for the web workers, 'ingest' for
+# bulk loads or 'analytics' (read only) for reports.
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'serving')
+# Journal mode the default database is switched to, e.g. 'WAL' (stored in the database file). Unset, the journal mode
+# of the file is left as it is, so that management commands don't rewrite the sample data.db.
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE') or None
+
+# Read-only copy of data.db the reports read from (see apps/core/replica.py), refreshed with
+# `python manage.py refresh_analytics_replica [--interval SECONDS]`. The reports read data.db until it exists.
+ANALYTICS_REPLICA_PATH = Path(os.getenv('ANALYTICS_REPLICA_PATH', BASE_DIR / 'analytics.db'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'data.db',
-    }
+        'OPTIONS': sqlite_options(SQLITE_PROFILE, SQLITE_JOURNAL_MODE),
+    },
+    'analytics': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{ANALYTICS_REPLICA_PATH}?mode=ro&immutable=1',
+        'OPTIONS': sqlite_options('analytics'),
+        # the tests read the test database, the replica is a copy of it
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['apps.core.routers.AnalyticsReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Responses of the sellers endpoints. Invalidations are kept in the database (`SalesCacheGeneration`) and seen by
+    # every worker, the local memory backend only keeps entries per process: switch to a shared backend (e.g. Redis or
+    # Memcached) for the workers to share them.
+    'sellers': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sellers',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
 }
 
+SELLERS_CACHE_ALIAS = 'sellers'
+# Entries are invalidated on writes, the timeout only bounds how long unused entries are kept.
+SELLERS_CACHE_TIMEOUT = 60 * 60
+
+# Engine computing the sellers rankings: 'sql' (the database), 'numpy' (columnar copy of the invoices kept in memory
+# by each process, see apps/sales/analytics.py, requires requirements/analytics.txt) or 'partitions' (invoice facts
+# partitioned by year, see apps/sales/partitions.py, rebuilt with `python manage.py partition_invoices` and read until
+# the sales data changes, the SQL rankings answering after that).
+SALES_ANALYTICS_ENGINE = os.getenv('SALES_ANALYTICS_ENGINE', 'sql')
+# Directory of the memory mapped snapshots of the sales facts used by the 'numpy' engine, written with
+# `python manage.py write_sales_snapshot` (see apps/sales/snapshot.py).
+SALES_SNAPSHOT_DIR = os.getenv('SALES_SNAPSHOT_DIR', BASE_DIR / 'snapshots')
+# Directory of the yearly partitions of the invoice facts used by the 'partitions' engine (invoices-<year>.db).
+SALES_PARTITION_DIR = os.getenv('SALES_PARTITION_DIR', BASE_DIR / 'partitions')
+
+# Group commit of the invoices written by the ingestion endpoints (see apps/sales/write_queue.py): the invoices of the
+# concurrent requests of a process are written together, in one transaction of at most
+# INVOICE_WRITE_QUEUE_MAX_BATCH_SIZE invoices, after waiting at most INVOICE_WRITE_QUEUE_MAX_DELAY seconds for them.
+INVOICE_WRITE_QUEUE_MAX_BATCH_SIZE = int(os.getenv('INVOICE_WRITE_QUEUE_MAX_BATCH_SIZE', 500))
+INVOICE_WRITE_QUEUE_MAX_DELAY = float(os.getenv('INVOICE_WRITE_QUEUE_MAX_DELAY', 0.005))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -20,4 +20,8 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('apps.sales.urls')),
+    path('', include('apps.customers.urls')),
+    path('', include('apps.employees.urls')),
+    path('', include('apps.music.urls')),
+    path('', include('apps.playlists.urls')),
 ]